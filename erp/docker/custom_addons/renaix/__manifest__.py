@@ -69,6 +69,7 @@
         # DATA (datos iniciales)
         # ================================
         'data/sequences.xml',
+        'data/cron.xml',
         'data/categorias_data.xml',
         'data/usuarios_data.xml',
         'data/etiquetas_data.xml',
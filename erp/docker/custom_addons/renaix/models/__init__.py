@@ -1,5 +1,9 @@
 # -*- coding: utf-8 -*-
 
+from . import imagen_procesable
+from . import imagen_checksum
+from . import indices_mixin
+
 from . import res_partner
 from . import res_company
 
@@ -12,3 +16,4 @@ from . import valoracion
 from . import comentario
 from . import mensaje
 from . import denuncia
+from . import chatter_outbox
@@ -12,7 +12,7 @@ class Categoria(models.Model):
     """
     _name = 'renaix.categoria'
     _description = 'Categoría de Producto'
-    _inherit = ['mail.thread', 'mail.activity.mixin']  # Chatter
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'renaix.imagen.checksum.mixin']  # Chatter
     _order = 'sequence, name'
     
     # Campos básicos
@@ -60,6 +60,13 @@ class Categoria(models.Model):
         help='Cantidad de productos en esta categoría'
     )
     
+    producto_disponible_count = fields.Integer(
+        string='Nº Productos Disponibles',
+        compute='_compute_producto_count',
+        store=True,
+        help='Cantidad de productos de esta categoría disponibles para la venta'
+    )
+    
     # Relaciones
     producto_ids = fields.One2many(
         'renaix.producto',
@@ -78,11 +85,29 @@ class Categoria(models.Model):
         ('name_unique', 'UNIQUE(name)', 'Ya existe una categoría con este nombre.')
     ]
     
-    @api.depends('producto_ids')
+    @api.depends('producto_ids', 'producto_ids.estado_venta', 'producto_ids.active')
     def _compute_producto_count(self):
-        """Calcula cuántos productos hay en cada categoría"""
+        """
+        Calcula cuántos productos hay en cada categoría (total y disponibles)
+        con una sola consulta agrupada para todo el lote.
+        """
+        totales = {}
+        disponibles = {}
+        categoria_ids = [cid for cid in self._origin.ids if cid]
+        if categoria_ids:
+            grupos = self.env['renaix.producto'].sudo()._read_group(
+                [('categoria_id', 'in', categoria_ids)],
+                ['categoria_id', 'estado_venta'],
+                ['__count'],
+            )
+            for categoria, estado_venta, count in grupos:
+                totales[categoria.id] = totales.get(categoria.id, 0) + count
+                if estado_venta == 'disponible':
+                    disponibles[categoria.id] = count
+        
         for categoria in self:
-            categoria.producto_count = len(categoria.producto_ids)
+            categoria.producto_count = totales.get(categoria._origin.id, 0)
+            categoria.producto_disponible_count = disponibles.get(categoria._origin.id, 0)
     
     @api.constrains('name')
     def _check_name(self):
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+
+import collections
+import logging
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+# Clave de contexto con la que una operación pide diferir el chatter
+CONTEXT_KEY = 'renaix_diferir_chatter'
+
+# Filas materializadas por ejecución del cron
+TAMANO_LOTE = 500
+
+
+class ChatterOutbox(models.Model):
+    """
+    Modelo: Cola de Chatter
+    Descripción: Mensajes y seguidores pendientes de crear en el chatter.
+                 Las operaciones lanzadas con el contexto renaix_diferir_chatter
+                 (la API móvil) encolan aquí su actividad de chatter en lugar
+                 de hacer message_post / message_subscribe dentro de la
+                 petición; un cron la materializa por lotes.
+    """
+    _name = 'renaix.chatter.outbox'
+    _description = 'Cola de Mensajes de Chatter'
+    _order = 'id'
+
+    tipo = fields.Selection([
+        ('mensaje', 'Mensaje'),
+        ('seguidores', 'Seguidores'),
+    ], string='Tipo', required=True, default='mensaje')
+
+    res_model = fields.Char(string='Modelo', required=True)
+
+    res_id = fields.Many2oneReference(
+        string='ID Registro',
+        model_field='res_model',
+        required=True
+    )
+
+    subject = fields.Char(string='Asunto')
+
+    body = fields.Text(string='Cuerpo')
+
+    # IDs de res.partner (destinatarios del mensaje o nuevos seguidores)
+    partner_ids = fields.Json(string='Partners')
+
+    author_id = fields.Many2one(
+        'res.partner',
+        string='Autor',
+        ondelete='set null'
+    )
+
+    estado = fields.Selection([
+        ('pendiente', 'Pendiente'),
+        ('error', 'Error'),
+    ], string='Estado', required=True, default='pendiente', index=True)
+
+    error = fields.Text(string='Error', readonly=True)
+
+    # ==================== ENCOLADO ====================
+
+    @api.model
+    def _diferir_activo(self):
+        """
+        Indica si la operación en curso debe diferir el chatter.
+
+        Returns:
+            bool: True si el contexto lleva renaix_diferir_chatter
+        """
+        return bool(self.env.context.get(CONTEXT_KEY))
+
+    @api.model
+    def _publicar(self, mensajes):
+        """
+        Publica mensajes en el chatter (o los encola si se difiere).
+
+        Args:
+            mensajes (list): Tuplas (registro, body, subject, partner_ids)
+
+        Returns:
+            bool: True
+        """
+        if not mensajes:
+            return True
+
+        if not self._diferir_activo():
+            for record, body, subject, partner_ids in mensajes:
+                record.message_post(body=body, subject=subject, partner_ids=partner_ids or [])
+            return True
+
+        author_id = self.env.user.partner_id.id
+        self._encolar([{
+            'tipo': 'mensaje',
+            'res_model': record._name,
+            'res_id': record.id,
+            'body': body,
+            'subject': subject,
+            'partner_ids': list(partner_ids or []),
+            'author_id': author_id,
+        } for record, body, subject, partner_ids in mensajes])
+        return True
+
+    @api.model
+    def _suscribir(self, records, partner_ids):
+        """
+        Añade seguidores a unos registros (o lo encola si se difiere).
+
+        Args:
+            records: Recordset al que suscribir
+            partner_ids (list): IDs de res.partner
+
+        Returns:
+            bool: True
+        """
+        partner_ids = [pid for pid in partner_ids if pid]
+        if not records or not partner_ids:
+            return True
+
+        if not self._diferir_activo():
+            records.message_subscribe(partner_ids=partner_ids)
+            return True
+
+        self._encolar([{
+            'tipo': 'seguidores',
+            'res_model': record._name,
+            'res_id': record.id,
+            'partner_ids': partner_ids,
+        } for record in records])
+        return True
+
+    @api.model
+    def _encolar(self, vals_list):
+        """
+        Inserta filas en la cola y programa el cron al confirmar la transacción.
+
+        Args:
+            vals_list (list): Valores de las filas
+        """
+        self.sudo().create(vals_list)
+
+        # Un único disparo del cron por transacción
+        precommit = self.env.cr.precommit
+        if not precommit.data.get('renaix.chatter_outbox.trigger'):
+            precommit.data['renaix.chatter_outbox.trigger'] = True
+            precommit.add(self._disparar_cron)
+
+    def _disparar_cron(self):
+        """Pide al cron que procese la cola lo antes posible."""
+        cron = self.env.ref('renaix.ir_cron_chatter_outbox', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
+
+    # ==================== MATERIALIZACIÓN ====================
+
+    @api.model
+    def _procesar_pendientes(self, limit=TAMANO_LOTE):
+        """
+        Materializa un lote de la cola (llamado desde el cron).
+
+        Primero se insertan los seguidores, agrupados por modelo y lista de
+        partners (una sola llamada a message_subscribe por grupo), y después
+        los mensajes en orden de llegada. Las notificaciones por email se
+        dejan en la cola de correo en lugar de enviarse en el momento.
+
+        Args:
+            limit (int): Máximo de filas a procesar
+
+        Returns:
+            int: Filas procesadas
+        """
+        # SKIP LOCKED: dos ejecuciones solapadas no procesan las mismas filas
+        self.env.cr.execute("""
+            SELECT id FROM renaix_chatter_outbox
+            WHERE estado = 'pendiente'
+            ORDER BY id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        """, [limit])
+        filas = self.browse([row[0] for row in self.env.cr.fetchall()])
+        if not filas:
+            return 0
+
+        filas.fetch(['tipo', 'res_model', 'res_id', 'subject', 'body', 'partner_ids', 'author_id'])
+        ok = self.browse()
+        errores = collections.defaultdict(lambda: self.browse())
+
+        # Seguidores: {(modelo, partners): filas}
+        grupos = collections.defaultdict(lambda: self.browse())
+        for fila in filas.filtered(lambda f: f.tipo == 'seguidores'):
+            grupos[(fila.res_model, tuple(sorted(fila.partner_ids or [])))] |= fila
+
+        for (res_model, partner_ids), grupo in grupos.items():
+            records = self.env[res_model].browse(grupo.mapped('res_id')).exists()
+            try:
+                with self.env.cr.savepoint():
+                    records.message_subscribe(partner_ids=list(partner_ids))
+                ok |= grupo
+            except Exception as e:
+                errores[str(e)] |= grupo
+
+        # Mensajes, en orden de llegada
+        mensajes = filas.filtered(lambda f: f.tipo == 'mensaje')
+        por_modelo = collections.defaultdict(list)
+        for fila in mensajes:
+            por_modelo[fila.res_model].append(fila.res_id)
+        existentes = {
+            res_model: set(self.env[res_model].browse(ids).exists().ids)
+            for res_model, ids in por_modelo.items()
+        }
+
+        for fila in mensajes:
+            if fila.res_id not in existentes[fila.res_model]:
+                ok |= fila  # El registro ya no existe: nada que publicar
+                continue
+            record = self.env[fila.res_model].browse(fila.res_id).with_context(
+                mail_notify_force_send=False,
+            )
+            try:
+                with self.env.cr.savepoint():
+                    record.message_post(
+                        body=fila.body,
+                        subject=fila.subject,
+                        partner_ids=fila.partner_ids or [],
+                        author_id=fila.author_id.id or None,
+                    )
+                ok |= fila
+            except Exception as e:
+                errores[str(e)] |= fila
+
+        for error, grupo in errores.items():
+            _logger.warning(f'Cola de chatter: {len(grupo)} filas con error: {error}')
+            grupo.write({'estado': 'error', 'error': error})
+        ok.unlink()
+
+        # Si el lote estaba lleno, quedan más filas: volver a disparar el cron
+        if len(filas) >= limit:
+            self._disparar_cron()
+
+        return len(filas)
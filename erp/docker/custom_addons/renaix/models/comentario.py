@@ -11,9 +11,14 @@ class Comentario(models.Model):
     """
     _name = 'renaix.comentario'
     _description = 'Comentario de Producto'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'renaix.indices.mixin']
     _order = 'fecha desc, id desc'
     
+    # Comentarios de un producto (los archivados no se listan)
+    _indices_renaix = {
+        'renaix_comentario_producto_fecha_idx': (['producto_id', 'fecha DESC'], 'active'),
+    }
+    
     # Relación con producto
     producto_id = fields.Many2one(
         'renaix.producto',
@@ -119,15 +124,16 @@ class Comentario(models.Model):
         propietario = comentario.producto_id.propietario_id
         
         if propietario and propietario != comentario.usuario_id:
-            comentario.producto_id.message_post(
-                body=f"""
+            self.env['renaix.chatter.outbox']._publicar([(
+                comentario.producto_id,
+                f"""
                     <h3>💬 Nuevo comentario en tu producto</h3>
                     <p><b>Usuario:</b> {comentario.usuario_id.name}</p>
                     <p><b>Comentario:</b> {comentario.texto}</p>
                 """,
-                subject=f'Nuevo comentario en: {comentario.producto_id.name}',
-                partner_ids=[propietario.id]
-            )
+                f'Nuevo comentario en: {comentario.producto_id.name}',
+                [propietario.id],
+            )])
         
         return comentario
     
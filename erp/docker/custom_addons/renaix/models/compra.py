@@ -12,9 +12,15 @@ class Compra(models.Model):
     """
     _name = 'renaix.compra'
     _description = 'Compra / Transacción'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'renaix.indices.mixin']
     _order = 'fecha_compra desc, id desc'
     
+    # Compras y ventas de un usuario
+    _indices_renaix = {
+        'renaix_compra_comprador_fecha_idx': (['comprador_id', 'fecha_compra DESC'], None),
+        'renaix_compra_vendedor_fecha_idx': (['vendedor_id', 'fecha_compra DESC'], None),
+    }
+    
     # Código único de compra
     codigo = fields.Char(
         string='Código',
@@ -200,42 +206,43 @@ class Compra(models.Model):
             vals['precio_final'] = producto.precio
         
         compra = super(Compra, self).create(vals)
+        Outbox = self.env['renaix.chatter.outbox']
         
         # Añadir comprador y vendedor como seguidores
-        compra.message_subscribe(
-            partner_ids=[compra.comprador_id.id, compra.vendedor_id.id]
-        )
+        Outbox._suscribir(compra, [compra.comprador_id.id, compra.vendedor_id.id])
         
         # Marcar producto como reservado
         if compra.producto_id.estado_venta == 'disponible':
             compra.producto_id.estado_venta = 'reservado'
         
-        # Notificación al vendedor
-        compra.producto_id.message_post(
-            body=f"""
+        # Notificación al vendedor y al comprador
+        Outbox._publicar([
+            (
+                compra.producto_id,
+                f"""
                 <h3>🎉 ¡Alguien quiere comprar tu producto!</h3>
                 <p><b>Comprador:</b> {compra.comprador_id.name}</p>
                 <p><b>Email:</b> {compra.comprador_id.email}</p>
                 <p><b>Teléfono:</b> {compra.comprador_id.phone or 'No disponible'}</p>
                 <p><b>Precio:</b> {compra.precio_final}€</p>
                 <p>Ponte en contacto para acordar la entrega.</p>
-            """,
-            subject=f"Nueva compra: {compra.producto_id.name}",
-            partner_ids=[compra.vendedor_id.id]
-        )
-        
-        # Notificación al comprador
-        compra.message_post(
-            body=f"""
+                """,
+                f"Nueva compra: {compra.producto_id.name}",
+                [compra.vendedor_id.id],
+            ),
+            (
+                compra,
+                f"""
                 <h3>✅ Compra registrada con éxito</h3>
                 <p><b>Producto:</b> {compra.producto_id.name}</p>
                 <p><b>Precio:</b> {compra.precio_final}€</p>
                 <p><b>Vendedor:</b> {compra.vendedor_id.name}</p>
                 <p>El vendedor se pondrá en contacto contigo pronto.</p>
-            """,
-            subject=f"Confirmación de compra: {compra.producto_id.name}",
-            partner_ids=[compra.comprador_id.id]
-        )
+                """,
+                f"Confirmación de compra: {compra.producto_id.name}",
+                [compra.comprador_id.id],
+            ),
+        ])
         
         return compra
     
@@ -303,6 +310,12 @@ class Compra(models.Model):
                         partner_ids=[compra.vendedor_id.id]
                     )
     
+    def unlink(self):
+        """Al borrar: descontar las valoraciones que se eliminan en cascada"""
+        valoraciones = self.env['renaix.valoracion'].search([('compra_id', 'in', self.ids)])
+        valoraciones._aplicar_agregados(-1)
+        return super().unlink()
+    
     def name_get(self):
         """Personaliza cómo se muestra en selects"""
         result = []
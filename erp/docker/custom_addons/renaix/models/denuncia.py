@@ -12,9 +12,14 @@ class Denuncia(models.Model):
     """
     _name = 'renaix.denuncia'
     _description = 'Denuncia'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'renaix.indices.mixin']
     _order = 'fecha_denuncia desc, id desc'
     
+    # Denuncias enviadas por un usuario
+    _indices_renaix = {
+        'renaix_denuncia_reportante_fecha_idx': (['usuario_reportante_id', 'fecha_denuncia DESC'], None),
+    }
+    
     # Tipo de denuncia (qué se está denunciando)
     tipo = fields.Selection([
         ('producto', 'Producto'),
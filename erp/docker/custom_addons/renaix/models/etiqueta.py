@@ -1,7 +1,12 @@
 # -*- coding: utf-8 -*-
 
+import logging
+
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
+from odoo.tools import sql
+
+_logger = logging.getLogger(__name__)
 
 
 class Etiqueta(models.Model):
@@ -45,6 +50,13 @@ class Etiqueta(models.Model):
         help='Cantidad de productos con esta etiqueta'
     )
     
+    producto_disponible_count = fields.Integer(
+        string='Nº Productos Disponibles',
+        compute='_compute_producto_count',
+        store=True,
+        help='Cantidad de productos disponibles para la venta con esta etiqueta'
+    )
+    
     # Relación Many2many con productos
     producto_ids = fields.Many2many(
         'renaix.producto',
@@ -54,17 +66,53 @@ class Etiqueta(models.Model):
         string='Productos'
     )
     
-    # Constraints SQL
-    _sql_constraints = [
-        ('name_unique', 'UNIQUE(LOWER(name))', 
-         'Ya existe una etiqueta con este nombre (no distingue mayúsculas).')
-    ]
+    def init(self):
+        """
+        Índice único sobre el nombre normalizado.
+        
+        Sustituye a la antigua restricción UNIQUE(LOWER(name)), que
+        PostgreSQL no admite como constraint de tabla. Es el que usa
+        _insertar_nombres para resolver las inserciones concurrentes.
+        """
+        if sql.index_exists(self.env.cr, 'renaix_etiqueta_name_lower_uniq'):
+            return
+        self.env.cr.execute("""
+            SELECT lower(name) FROM renaix_etiqueta
+            GROUP BY lower(name) HAVING count(*) > 1
+        """)
+        duplicados = [row[0] for row in self.env.cr.fetchall()]
+        if duplicados:
+            _logger.warning(
+                'No se crea el índice único de etiquetas: nombres duplicados %s', duplicados
+            )
+            return
+        sql.create_unique_index(
+            self.env.cr, 'renaix_etiqueta_name_lower_uniq', 'renaix_etiqueta', ['lower(name)']
+        )
     
-    @api.depends('producto_ids')
+    @api.depends('producto_ids', 'producto_ids.estado_venta', 'producto_ids.active')
     def _compute_producto_count(self):
-        """Calcula cuántos productos tienen esta etiqueta"""
+        """
+        Calcula cuántos productos tienen esta etiqueta (total y disponibles)
+        con una sola consulta agrupada para todo el lote.
+        """
+        totales = {}
+        disponibles = {}
+        etiqueta_ids = [eid for eid in self._origin.ids if eid]
+        if etiqueta_ids:
+            grupos = self.env['renaix.producto'].sudo()._read_group(
+                [('etiqueta_ids', 'in', etiqueta_ids)],
+                ['etiqueta_ids', 'estado_venta'],
+                ['__count'],
+            )
+            for etiqueta, estado_venta, count in grupos:
+                totales[etiqueta.id] = totales.get(etiqueta.id, 0) + count
+                if estado_venta == 'disponible':
+                    disponibles[etiqueta.id] = count
+        
         for etiqueta in self:
-            etiqueta.producto_count = len(etiqueta.producto_ids)
+            etiqueta.producto_count = totales.get(etiqueta._origin.id, 0)
+            etiqueta.producto_disponible_count = disponibles.get(etiqueta._origin.id, 0)
     
     @api.model
     def create(self, vals):
@@ -118,6 +166,93 @@ class Etiqueta(models.Model):
                 if len(etiqueta.name) > 30:
                     raise ValidationError('El nombre de la etiqueta no puede superar 30 caracteres.')
     
+    @api.model
+    def _resolver_nombres(self, nombres):
+        """
+        Resuelve una lista de nombres a IDs de etiqueta, creando las que
+        falten.
+        
+        Los nombres se normalizan en memoria; las existentes se buscan con
+        una sola consulta y las nuevas se insertan en bloque (ver
+        _insertar_nombres).
+        
+        Args:
+            nombres (iterable): Nombres tal y como llegan del usuario
+        
+        Returns:
+            dict: {nombre normalizado: id}
+        
+        Raises:
+            ValidationError: Si algún nombre nuevo no es válido
+        """
+        normalizados = list(dict.fromkeys(
+            self._normalize_name(nombre) for nombre in nombres
+            if isinstance(nombre, str) and nombre.strip()
+        ))
+        if not normalizados:
+            return {}
+        
+        self.flush_model(['name'])
+        self.env.cr.execute(
+            'SELECT lower(name), id FROM renaix_etiqueta WHERE lower(name) = ANY(%s)',
+            [normalizados]
+        )
+        ids_por_nombre = dict(self.env.cr.fetchall())
+        
+        faltan = [nombre for nombre in normalizados if nombre not in ids_por_nombre]
+        if faltan:
+            ids_por_nombre.update(self._insertar_nombres(faltan))
+            # Las que otra transacción insertó entre medias
+            faltan = [nombre for nombre in faltan if nombre not in ids_por_nombre]
+            if faltan:
+                self.env.cr.execute(
+                    'SELECT lower(name), id FROM renaix_etiqueta WHERE lower(name) = ANY(%s)',
+                    [faltan]
+                )
+                ids_por_nombre.update(self.env.cr.fetchall())
+        
+        return ids_por_nombre
+    
+    @api.model
+    def _insertar_nombres(self, nombres):
+        """
+        Inserta etiquetas nuevas en bloque (INSERT ... ON CONFLICT DO NOTHING).
+        
+        Los nombres que ya existan se ignoran; los que otra transacción
+        inserte a la vez, gracias al índice único sobre lower(name).
+        
+        Args:
+            nombres (list): Nombres ya normalizados
+        
+        Returns:
+            dict: {nombre: id} de las etiquetas insertadas
+        
+        Raises:
+            ValidationError: Si algún nombre no es válido
+        """
+        for nombre in nombres:
+            if len(nombre) < 2:
+                raise ValidationError('El nombre de la etiqueta debe tener al menos 2 caracteres.')
+            if len(nombre) > 30:
+                raise ValidationError('El nombre de la etiqueta no puede superar 30 caracteres.')
+        
+        self.flush_model(['name'])
+        self.env.cr.execute("""
+            INSERT INTO renaix_etiqueta (
+                name, color, active, producto_count, producto_disponible_count,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT nombre, 0, TRUE, 0, 0,
+                   %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+            FROM unnest(%(nombres)s::varchar[]) AS nombre
+            WHERE NOT EXISTS (
+                SELECT 1 FROM renaix_etiqueta e WHERE lower(e.name) = nombre
+            )
+            ON CONFLICT DO NOTHING
+            RETURNING name, id
+        """, {'nombres': list(nombres), 'uid': self.env.uid})
+        return dict(self.env.cr.fetchall())
+    
     @api.model
     def name_create(self, name):
         """
@@ -171,10 +306,8 @@ class Etiqueta(models.Model):
         Método para obtener las etiquetas más populares.
         Útil para sugerencias en la app móvil.
         """
-        etiquetas = self.search([('active', '=', True)])
-        etiquetas_ordenadas = sorted(
-            etiquetas, 
-            key=lambda e: e.producto_count, 
-            reverse=True
+        return self.search(
+            [('active', '=', True)],
+            order='producto_disponible_count DESC, producto_count DESC, name',
+            limit=limit
         )
-        return etiquetas_ordenadas[:limit]
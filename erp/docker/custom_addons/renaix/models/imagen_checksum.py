@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+
+
+class ImagenChecksumMixin(models.AbstractModel):
+    """
+    Mixin: Presencia y versión de la imagen
+    Descripción: Guarda en columnas normales si el registro tiene imagen y
+                 el checksum de su adjunto, para que los listados puedan
+                 construir la URL (versionada) sin leer el binario.
+    """
+    _name = 'renaix.imagen.checksum.mixin'
+    _description = 'Presencia y versión de la imagen'
+
+    # Campo de imagen (attachment) que se vigila
+    _imagen_checksum_campo = 'image'
+
+    has_image = fields.Boolean(string='Tiene Imagen', readonly=True, copy=False)
+
+    image_checksum = fields.Char(
+        string='Checksum Imagen',
+        readonly=True,
+        copy=False,
+        help='SHA-1 del adjunto de la imagen; cambia con cada imagen nueva'
+    )
+
+    def init(self):
+        """Rellena los registros anteriores al mixin desde ir_attachment"""
+        super().init()
+        if self._abstract:
+            return
+        self.env.cr.execute(f"""
+            UPDATE "{self._table}" t
+            SET has_image = TRUE, image_checksum = a.checksum
+            FROM ir_attachment a
+            WHERE a.res_model = %s AND a.res_field = %s AND a.res_id = t.id
+              AND t.image_checksum IS NULL AND a.checksum IS NOT NULL
+        """, [self._name, self._imagen_checksum_campo])
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        if any(vals.get(self._imagen_checksum_campo) for vals in vals_list):
+            records._sincronizar_imagen_checksum()
+        return records
+
+    def write(self, vals):
+        result = super().write(vals)
+        if self._imagen_checksum_campo in vals:
+            self._sincronizar_imagen_checksum()
+        return result
+
+    def _sincronizar_imagen_checksum(self):
+        """Copia el checksum del adjunto de la imagen (sin leer el binario)"""
+        if not self:
+            return
+        self.env['ir.attachment'].flush_model(['res_model', 'res_field', 'res_id', 'checksum'])
+        self.env.cr.execute("""
+            SELECT res_id, checksum FROM ir_attachment
+            WHERE res_model = %s AND res_field = %s AND res_id = ANY(%s)
+        """, [self._name, self._imagen_checksum_campo, self.ids])
+        checksums = dict(self.env.cr.fetchall())
+        for record in self:
+            checksum = checksums.get(record.id)
+            valores = {'has_image': bool(checksum), 'image_checksum': checksum or False}
+            if record.has_image != valores['has_image'] or record.image_checksum != valores['image_checksum']:
+                record.write(valores)
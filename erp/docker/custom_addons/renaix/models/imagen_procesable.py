@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+
+import base64
+import logging
+
+from odoo import models, fields, api
+from ..tools import imagenes
+
+_logger = logging.getLogger(__name__)
+
+# Imágenes procesadas por ejecución del cron
+TAMANO_LOTE = 20
+
+# Minutos tras los que una imagen reclamada por un cron que no terminó
+# (caída del worker) se puede volver a reclamar. Un lote tarda como mucho
+# TAMANO_LOTE / imagenes.POOL_WORKERS * imagenes.TIMEOUT segundos
+RECLAMO_MINUTOS = 30
+
+
+class ImagenProcesableMixin(models.AbstractModel):
+    """
+    Mixin: Imagen procesada en segundo plano
+    Descripción: La imagen subida se guarda tal cual en imagen_original con
+                 estado 'procesando'; un cron la normaliza (orientación EXIF,
+                 sin metadatos, redimensionado, miniatura y WebP) en un pool
+                 de procesos y la escribe en los campos definitivos.
+    """
+    _name = 'renaix.imagen.procesable.mixin'
+    _description = 'Imagen procesada en segundo plano'
+
+    # Opciones de tools.imagenes.procesar() para este modelo
+    _imagen_opciones = {}
+
+    # Campo en el que _aplicar_imagen_procesada() guarda la imagen normalizada
+    _imagen_campo = 'imagen'
+
+    imagen_original = fields.Binary(
+        string='Imagen Original',
+        attachment=True,
+        copy=False,
+        help='Imagen tal y como se subió, pendiente de procesar'
+    )
+
+    estado_procesado = fields.Selection([
+        ('procesando', 'Procesando'),
+        ('lista', 'Lista'),
+        ('error', 'Error'),
+    ], string='Estado Imagen', default='lista', required=True, copy=False, index=True)
+
+    error_procesado = fields.Char(string='Error de Procesado', copy=False, readonly=True)
+
+    # Momento en que un cron tomó la imagen para procesarla (vacío si nadie)
+    procesado_reclamado = fields.Datetime(string='Procesado Iniciado', copy=False, readonly=True)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        if any(vals.get('estado_procesado') == 'procesando' for vals in vals_list):
+            self._disparar_procesado()
+        return records
+
+    def write(self, vals):
+        result = super().write(vals)
+        if vals.get('estado_procesado') == 'procesando':
+            self._disparar_procesado()
+        return result
+
+    @api.model
+    def _valores_imagen_original(self, data):
+        """
+        Valores para guardar una imagen subida y encolarla.
+
+        Args:
+            data (bytes | str): Imagen en bytes o en base64
+
+        Returns:
+            dict: Valores para create() / write()
+        """
+        if isinstance(data, bytes):
+            data = base64.b64encode(data)
+        return {
+            'imagen_original': data,
+            'estado_procesado': 'procesando',
+            'error_procesado': False,
+            'procesado_reclamado': False,
+        }
+
+    @api.model
+    def _disparar_procesado(self):
+        """Pide al cron que procese las imágenes pendientes."""
+        cron = self.env.ref('renaix.ir_cron_procesar_imagenes', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
+
+    def _aplicar_imagen_procesada(self, resultado):
+        """
+        Escribe el resultado del procesado en los campos definitivos.
+
+        Por defecto guarda la imagen principal en _imagen_campo; los modelos
+        que usan la miniatura o el WebP lo sobrescriben.
+
+        Args:
+            resultado (dict): Salida de tools.imagenes.procesar()
+        """
+        self.write({self._imagen_campo: base64.b64encode(resultado['imagen'])})
+
+    def _reutilizar_procesado(self):
+        """
+        Permite a cada modelo saltarse el procesado, p.ej. reutilizando las
+        variantes de una imagen idéntica ya procesada.
+
+        Returns:
+            bool: True si la imagen ya ha quedado aplicada
+        """
+        return False
+
+    def _checksums_originales(self):
+        """
+        Returns:
+            dict: {id: checksum del adjunto de imagen_original}
+        """
+        if not self.ids:
+            return {}
+        self.env.cr.execute("""
+            SELECT res_id, checksum FROM ir_attachment
+            WHERE res_model = %s AND res_field = 'imagen_original' AND res_id IN %s
+        """, [self._name, tuple(self.ids)])
+        return dict(self.env.cr.fetchall())
+
+    @api.model
+    def _reclamar_pendientes(self, limit):
+        """
+        Marca un lote de imágenes pendientes como tomadas por este cron.
+
+        Returns:
+            recordset: Imágenes reclamadas
+        """
+        self.env.cr.execute(f"""
+            UPDATE "{self._table}" SET procesado_reclamado = now() AT TIME ZONE 'UTC'
+            WHERE id IN (
+                SELECT id FROM "{self._table}"
+                WHERE estado_procesado = 'procesando'
+                  AND (procesado_reclamado IS NULL
+                       OR procesado_reclamado < now() AT TIME ZONE 'UTC' - %s * interval '1 minute')
+                ORDER BY id
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id
+        """, [RECLAMO_MINUTOS, limit])
+        records = self.browse(sorted(row[0] for row in self.env.cr.fetchall()))
+        records.invalidate_recordset(['procesado_reclamado'])
+        return records
+
+    @api.model
+    def _procesar_pendientes(self, limit=TAMANO_LOTE):
+        """
+        Procesa un lote de imágenes pendientes de este modelo.
+
+        Las filas no quedan bloqueadas mientras se procesan: se reclaman y se
+        confirma la transacción antes de llamar al pool (las peticiones que
+        escriben en el registro, p.ej. la última actividad del usuario, no
+        esperan al cron), y se vuelven a bloquear solo para escribir el
+        resultado. Si imagen_original ha cambiado entretanto, el resultado
+        se descarta. Hace commit: solo debe llamarse desde el cron.
+
+        Args:
+            limit (int): Máximo de imágenes
+
+        Returns:
+            int: Imágenes procesadas
+        """
+        records = self._reclamar_pendientes(limit)
+        if not records:
+            return 0
+
+        trabajos = {}
+        reutilizadas = set()
+        for record in records.with_context(bin_size=False):
+            if not record.imagen_original:
+                continue
+            try:
+                with self.env.cr.savepoint():
+                    if record._reutilizar_procesado():
+                        reutilizadas.add(record.id)
+                        continue
+            except Exception as e:
+                _logger.warning(f'No se pudo reutilizar el procesado de {record._name}({record.id}): {str(e)}')
+            trabajos[record.id] = (base64.b64decode(record.imagen_original), self._imagen_opciones)
+        checksums = records._checksums_originales()
+        self.env.cr.commit()
+
+        resultados = imagenes.procesar_lote(trabajos)
+
+        pendientes = records.filtered(lambda r: r.id not in reutilizadas)
+        vigentes = self.browse()
+        if pendientes:
+            self.env.cr.execute(f"""
+                SELECT id FROM "{self._table}"
+                WHERE id IN %s AND estado_procesado = 'procesando'
+                FOR UPDATE
+            """, [tuple(pendientes.ids)])
+            vigentes = self.browse([row[0] for row in self.env.cr.fetchall()])
+            pendientes.invalidate_recordset()
+        actuales = vigentes._checksums_originales()
+
+        for record in pendientes:
+            if record not in vigentes or actuales.get(record.id) != checksums.get(record.id):
+                _logger.info(f'La imagen de {record._name}({record.id}) ha cambiado mientras se procesaba')
+                continue
+            resultado = resultados.get(record.id)
+            if isinstance(resultado, dict):
+                try:
+                    with self.env.cr.savepoint():
+                        record._aplicar_imagen_procesada(resultado)
+                        record.write({
+                            'imagen_original': False,
+                            'estado_procesado': 'lista',
+                            'procesado_reclamado': False,
+                        })
+                    continue
+                except Exception as e:
+                    resultado = e
+            error = str(resultado) if resultado is not None else 'Imagen original vacía'
+            _logger.warning(f'Error al procesar imagen {record._name}({record.id}): {error}')
+            record.write({'estado_procesado': 'error', 'error_procesado': error[:250], 'procesado_reclamado': False})
+        self.env.cr.commit()
+
+        if len(records) >= limit:
+            self._disparar_procesado()
+
+        return len(records)
+
+    @api.model
+    def _cron_procesar_imagenes(self):
+        """Procesa las imágenes pendientes de todos los modelos con el mixin."""
+        for model_name in self.env.registry.descendants([self._name], '_inherit'):
+            model = self.env[model_name]
+            if model._abstract or model_name == self._name:
+                continue
+            model.sudo()._procesar_pendientes()
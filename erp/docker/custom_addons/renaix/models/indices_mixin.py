@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models
+from ..tools import indices
+
+
+class IndicesMixin(models.AbstractModel):
+    """
+    Mixin: Índices declarados
+    Descripción: Crea y mantiene al instalar o actualizar el módulo los
+                 índices compuestos y parciales que el modelo declara en
+                 _indices_renaix (ver tools/indices.py).
+    """
+    _name = 'renaix.indices.mixin'
+    _description = 'Índices declarados'
+
+    # {nombre: (expresiones, where)}; where es None si el índice no es parcial
+    _indices_renaix = {}
+
+    def init(self):
+        """Crea, recrea o borra los índices según _indices_renaix"""
+        super().init()
+        if self._abstract:
+            return
+        indices.sincronizar_indices(self.env.cr, self._table, self._indices_renaix)
@@ -12,8 +12,17 @@ class Mensaje(models.Model):
     """
     _name = 'renaix.mensaje'
     _description = 'Mensaje entre Usuarios'
+    _inherit = ['renaix.indices.mixin']
     _order = 'fecha desc, id desc'
     
+    # No leídos y conversaciones (emisor OR receptor: se combinan los dos
+    # índices por fecha)
+    _indices_renaix = {
+        'renaix_mensaje_receptor_leido_idx': (['receptor_id', 'leido'], None),
+        'renaix_mensaje_receptor_fecha_idx': (['receptor_id', 'fecha DESC'], None),
+        'renaix_mensaje_emisor_fecha_idx': (['emisor_id', 'fecha DESC'], None),
+    }
+    
     # Usuario emisor
     emisor_id = fields.Many2one(
         'res.partner',
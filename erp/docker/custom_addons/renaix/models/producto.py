@@ -3,6 +3,9 @@
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
 
+# Condición de los productos visibles en el catálogo (índices parciales)
+DISPONIBLE = "active AND estado_venta = 'disponible'"
+
 
 class Producto(models.Model):
     """
@@ -11,9 +14,19 @@ class Producto(models.Model):
     """
     _name = 'renaix.producto'
     _description = 'Producto de Segunda Mano'
-    _inherit = ['mail.thread', 'mail.activity.mixin', 'image.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'image.mixin', 'renaix.indices.mixin']
     _order = 'fecha_publicacion desc, id desc'
     
+    # Listado, búsqueda y productos de un usuario. Los parciales solo
+    # contienen los productos visibles en el catálogo
+    _indices_renaix = {
+        'renaix_producto_disponible_fecha_idx': (['fecha_publicacion DESC', 'id DESC'], DISPONIBLE),
+        'renaix_producto_disponible_precio_idx': (['precio', 'id'], DISPONIBLE),
+        'renaix_producto_disponible_categoria_idx': (['categoria_id', 'fecha_publicacion DESC'], DISPONIBLE),
+        'renaix_producto_estado_fecha_idx': (['active', 'estado_venta', 'fecha_publicacion DESC'], None),
+        'renaix_producto_propietario_estado_idx': (['propietario_id', 'estado_venta', 'fecha_publicacion DESC'], None),
+    }
+    
     # Campos básicos
     name = fields.Char(
         string='Nombre del Producto',
@@ -168,6 +181,13 @@ class Producto(models.Model):
         store=True  # ✅ Para poder filtrar
     )
     
+    posible_duplicado = fields.Boolean(
+        string='Posible Duplicado',
+        compute='_compute_posible_duplicado',
+        store=True,
+        help='Alguna imagen coincide con la de otro producto'
+    )
+    
     total_imagenes = fields.Integer(
         string='Nº Imágenes',
         compute='_compute_total_imagenes'
@@ -219,6 +239,12 @@ class Producto(models.Model):
         for producto in self:
             producto.total_imagenes = len(producto.imagen_ids)
     
+    @api.depends('imagen_ids.duplicado_de_id')
+    def _compute_posible_duplicado(self):
+        """Marca el producto si alguna imagen parece de otro anuncio"""
+        for producto in self:
+            producto.posible_duplicado = any(producto.imagen_ids.mapped('duplicado_de_id'))
+    
     @api.depends('fecha_publicacion')
     def _compute_dias_publicado(self):
         """Calcula días desde la publicación"""
@@ -255,37 +281,46 @@ class Producto(models.Model):
             if producto.precio > 1000000:
                 raise ValidationError('El precio parece demasiado alto. Por favor, verifica.')
     
-    @api.model
-    def create(self, vals):
+    @api.model_create_multi
+    def create(self, vals_list):
         """Al crear: añadir propietario como seguidor"""
-        producto = super(Producto, self).create(vals)
+        productos = super(Producto, self).create(vals_list)
+        Outbox = self.env['renaix.chatter.outbox']
         
         # Añadir propietario como seguidor para recibir notificaciones
-        if producto.propietario_id:
-            producto.message_subscribe(partner_ids=[producto.propietario_id.id])
+        # (una llamada por propietario, no por producto)
+        for propietario, del_propietario in productos.grouped('propietario_id').items():
+            Outbox._suscribir(del_propietario, [propietario.id])
         
         # Mensaje de creación
-        producto.message_post(
-            body=f'Producto "{producto.name}" creado por {producto.propietario_id.name}',
-            subject='Producto Creado'
-        )
+        Outbox._publicar([
+            (
+                producto,
+                f'Producto "{producto.name}" creado por {producto.propietario_id.name}',
+                'Producto Creado',
+                None,
+            )
+            for producto in productos
+        ])
         
-        return producto
+        return productos
     
     def write(self, vals):
         """Al actualizar: registrar cambios importantes"""
         # Detectar cambio de estado
         if 'estado_venta' in vals:
-            for producto in self:
-                estado_anterior = producto.estado_venta
-                estado_nuevo = vals['estado_venta']
-                
-                if estado_anterior != estado_nuevo:
-                    producto.message_post(
-                        body=f'Estado cambió de "{dict(producto._fields["estado_venta"].selection)[estado_anterior]}" '
-                             f'a "{dict(producto._fields["estado_venta"].selection)[estado_nuevo]}"',
-                        subject='Cambio de Estado'
-                    )
+            estados = dict(self._fields['estado_venta'].selection)
+            estado_nuevo = vals['estado_venta']
+            self.env['renaix.chatter.outbox']._publicar([
+                (
+                    producto,
+                    f'Estado cambió de "{estados[producto.estado_venta]}" a "{estados[estado_nuevo]}"',
+                    'Cambio de Estado',
+                    None,
+                )
+                for producto in self
+                if producto.estado_venta != estado_nuevo
+            ])
         
         # Actualizar fecha de modificación
         if 'fecha_actualizacion' not in vals:
@@ -1,15 +1,30 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api
+import base64
+
+from odoo import models, fields, api, tools
 from odoo.exceptions import ValidationError
+from odoo.tools import sql
+from ..tools import imagenes
+
+# Distancia de Hamming máxima (sobre 64 bits) para considerar que dos
+# imágenes son la misma foto (recomprimida, redimensionada...)
+UMBRAL_DUPLICADO = 3
+
+# El hash perceptual se indexa en 4 bandas de 16 bits: dos hashes a
+# distancia <= 3 coinciden por fuerza en al menos una banda
+BANDAS_PHASH = 4
 
 
 class ProductoImagen(models.Model):
     """
     Modelo: Imagen de Producto
     Descripción: Imágenes asociadas a productos (mínimo 1, máximo 10)
+                 Las imágenes subidas se procesan en segundo plano
+                 (ver renaix.imagen.procesable.mixin)
     """
     _name = 'renaix.producto.imagen'
+    _inherit = ['renaix.imagen.procesable.mixin']
     _description = 'Imagen de Producto'
     _order = 'secuencia, id'
     
@@ -22,22 +37,55 @@ class ProductoImagen(models.Model):
         help='Producto al que pertenece esta imagen'
     )
     
-    # La imagen en sí
+    # La imagen en sí (ya procesada: sin EXIF, máx 1920px)
     imagen = fields.Image(
         string='Imagen',
-        required=True,
         max_width=1920,
         max_height=1920,
         help='Imagen del producto (máx 1920x1920px)'
     )
     
-    # Miniatura para listados
+    # Miniatura para listados (la genera el procesado)
     imagen_small = fields.Image(
         string='Miniatura',
-        related='imagen',
         max_width=256,
         max_height=256,
-        store=True
+    )
+    
+    # Variante WebP (la genera el procesado)
+    imagen_webp = fields.Binary(
+        string='Imagen WebP',
+        attachment=True,
+        copy=False
+    )
+    
+    # Hash del archivo subido: bytes idénticos reutilizan el procesado
+    contenido_hash = fields.Char(
+        string='Hash del Contenido',
+        index=True,
+        copy=False,
+        readonly=True,
+        help='SHA-1 de la imagen subida'
+    )
+    
+    # Hash perceptual (dHash de 64 bits en hexadecimal)
+    phash = fields.Char(
+        string='Hash Perceptual',
+        size=16,
+        copy=False,
+        readonly=True,
+        help='Hash perceptual para detectar imágenes casi iguales'
+    )
+    
+    # Imagen casi igual de otro producto (posible anuncio duplicado)
+    duplicado_de_id = fields.Many2one(
+        'renaix.producto.imagen',
+        string='Posible Duplicado de',
+        ondelete='set null',
+        copy=False,
+        readonly=True,
+        index='btree_not_null',
+        help='Imagen de otro producto que parece la misma foto'
     )
     
     # Secuencia para ordenar las imágenes
@@ -67,48 +115,213 @@ class ProductoImagen(models.Model):
         help='URL pública de la imagen para la API'
     )
     
-    # Tamaño del archivo (informativo)
+    # Tamaño del archivo (informativo). Se guarda al subir y al procesar
     tamano_kb = fields.Integer(
         string='Tamaño (KB)',
-        compute='_compute_tamano',
-        help='Tamaño aproximado de la imagen en KB'
+        readonly=True,
+        copy=False,
+        help='Tamaño de la imagen en KB'
     )
     
-    @api.depends('imagen')
+    def init(self):
+        """
+        Índices por bandas del hash perceptual.
+        
+        La distancia de Hamming no se puede indexar directamente; buscando
+        primero por bandas exactas solo se compara bit a bit un puñado de
+        candidatas en lugar de toda la tabla.
+        """
+        for banda in range(BANDAS_PHASH):
+            nombre = f'renaix_producto_imagen_phash_b{banda}_idx'
+            if not sql.index_exists(self.env.cr, nombre):
+                sql.create_index(
+                    self.env.cr, nombre, self._table,
+                    [f'substr(phash, {banda * 4 + 1}, 4)'],
+                    where='phash IS NOT NULL',
+                )
+        
+        # Tamaño de las imágenes anteriores a tamano_kb almacenado
+        self.env.cr.execute("""
+            UPDATE renaix_producto_imagen i
+            SET tamano_kb = a.file_size / 1024
+            FROM ir_attachment a
+            WHERE a.res_model = 'renaix.producto.imagen' AND a.res_field = 'imagen'
+              AND a.res_id = i.id AND i.tamano_kb IS NULL
+        """)
+    
+    @api.model
+    @tools.ormcache()
+    def _prefijo_url_imagen(self):
+        """
+        Prefijo de las URL de imagen, cacheado por proceso.
+        
+        Se invalida solo: al escribir un ir.config_parameter (p.ej.
+        web.base.url) Odoo limpia la caché ormcache en todos los workers.
+        """
+        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
+        return f'{base_url}/web/image/renaix.producto.imagen/'
+    
+    @api.depends('estado_procesado')
     def _compute_url_imagen(self):
-        """Genera la URL de acceso a la imagen"""
+        """Genera la URL de acceso a la imagen (sin leer el binario)"""
+        prefijo = self._prefijo_url_imagen()
         for imagen in self:
-            if imagen.id and imagen.imagen:
-                base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
-                imagen.url_imagen = f'{base_url}/web/image/renaix.producto.imagen/{imagen.id}/imagen'
+            if imagen.id and imagen.estado_procesado == 'lista':
+                imagen.url_imagen = f'{prefijo}{imagen.id}/imagen'
             else:
                 imagen.url_imagen = False
     
-    @api.depends('imagen')
-    def _compute_tamano(self):
-        """Calcula el tamaño aproximado de la imagen"""
-        for imagen in self:
-            if imagen.imagen:
-                # Estimar tamaño en KB (base64 es ~33% más grande que binario)
-                imagen.tamano_kb = len(imagen.imagen) * 3 // 4 // 1024
-            else:
-                imagen.tamano_kb = 0
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Al crear: encolar el procesado y, si es la primera imagen, marcarla como principal"""
+        for vals in vals_list:
+            self._redirigir_imagen(vals)
+        imagenes = super(ProductoImagen, self).create(vals_list)
+        
+        # Si es la primera imagen del producto, marcarla como principal
+        for imagen in imagenes:
+            if imagen.producto_id:
+                imagenes_producto = self.search([
+                    ('producto_id', '=', imagen.producto_id.id),
+                    ('id', '!=', imagen.id)
+                ])
+                if not imagenes_producto:
+                    imagen.es_principal = True
+        
+        return imagenes
+    
+    def _redirigir_imagen(self, vals):
+        """
+        Las imágenes escritas directamente (backend, XML-RPC) pasan también
+        por el procesado en segundo plano en lugar de redimensionarse aquí.
+        """
+        if self.env.context.get('renaix_imagen_procesada') or 'imagen' not in vals:
+            return
+        imagen = vals.pop('imagen')
+        if imagen:
+            vals.update(self._valores_imagen_original(imagen))
+        else:
+            vals.update({'imagen': False, 'imagen_small': False, 'imagen_webp': False, 'tamano_kb': 0})
     
     @api.model
-    def create(self, vals):
-        """Al crear: si es la primera imagen, marcarla como principal"""
-        imagen = super(ProductoImagen, self).create(vals)
+    def _valores_imagen_original(self, data):
+        """Añade el hash del contenido para reutilizar el procesado"""
+        vals = super()._valores_imagen_original(data)
+        contenido = data if isinstance(data, bytes) else base64.b64decode(data)
+        vals.update({
+            'contenido_hash': imagenes.contenido_hash(contenido),
+            'tamano_kb': len(contenido) // 1024,
+            'phash': False,
+            'duplicado_de_id': False,
+        })
+        return vals
+    
+    def _aplicar_imagen_procesada(self, resultado):
+        """Guarda la imagen normalizada, la miniatura y la variante WebP"""
+        self.with_context(renaix_imagen_procesada=True).write({
+            'imagen': base64.b64encode(resultado['imagen']),
+            'imagen_small': base64.b64encode(resultado['miniatura']),
+            'imagen_webp': base64.b64encode(resultado['webp']),
+            'phash': resultado['phash'],
+            'tamano_kb': len(resultado['imagen']) // 1024,
+        })
+        self._detectar_duplicados()
+    
+    def _reutilizar_procesado(self):
+        """
+        Si ya hay una imagen procesada con los mismos bytes, copia sus
+        variantes en lugar de volver a procesarla. Los adjuntos se guardan
+        en el filestore por su SHA-1, así que las copias comparten archivo.
+        """
+        self.ensure_one()
+        if not self.contenido_hash:
+            return False
+        previa = self.search([
+            ('contenido_hash', '=', self.contenido_hash),
+            ('estado_procesado', '=', 'lista'),
+            ('id', '!=', self.id),
+        ], order='id', limit=1)
+        if not previa:
+            return False
         
-        # Si es la primera imagen del producto, marcarla como principal
-        if imagen.producto_id:
-            imagenes_producto = self.search([
-                ('producto_id', '=', imagen.producto_id.id),
-                ('id', '!=', imagen.id)
-            ])
-            if not imagenes_producto:
-                imagen.es_principal = True
+        previa = previa.with_context(bin_size=False)
+        self.with_context(renaix_imagen_procesada=True).write({
+            'imagen': previa.imagen,
+            'imagen_small': previa.imagen_small,
+            'imagen_webp': previa.imagen_webp,
+            'phash': previa.phash,
+            'tamano_kb': previa.tamano_kb,
+            'imagen_original': False,
+            'estado_procesado': 'lista',
+        })
+        self._detectar_duplicados()
+        return True
+    
+    def _buscar_similares(self, max_distancia=UMBRAL_DUPLICADO, limit=10):
+        """
+        Imágenes de otros productos casi iguales a esta.
+        
+        Hasta UMBRAL_DUPLICADO usa los índices por bandas; con distancias
+        mayores (revisión manual) compara contra todas las imágenes.
         
-        return imagen
+        Args:
+            max_distancia (int): Distancia de Hamming máxima (0-64)
+            limit (int): Máximo de resultados
+        
+        Returns:
+            list: [(imagen, distancia)] de la más parecida a la menos
+        """
+        self.ensure_one()
+        if not self.phash:
+            return []
+        
+        filtro_bandas = ''
+        params = [self.phash, self.id, self.producto_id.id]
+        if max_distancia < BANDAS_PHASH:
+            bandas = [self.phash[i * 4:i * 4 + 4] for i in range(BANDAS_PHASH)]
+            filtro_bandas = 'AND (' + ' OR '.join(
+                f'substr(phash, {i * 4 + 1}, 4) = %s' for i in range(BANDAS_PHASH)
+            ) + ')'
+            params += bandas
+        
+        self.env.flush_all()
+        self.env.cr.execute(f"""
+            SELECT id, distancia FROM (
+                SELECT id, bit_count(('x' || phash)::bit(64) # ('x' || %s)::bit(64)) AS distancia
+                FROM renaix_producto_imagen
+                WHERE phash IS NOT NULL AND id != %s AND producto_id != %s
+                {filtro_bandas}
+            ) candidatas
+            WHERE distancia <= %s
+            ORDER BY distancia, id
+            LIMIT %s
+        """, params + [max_distancia, limit])
+        return [(self.browse(image_id), distancia) for image_id, distancia in self.env.cr.fetchall()]
+    
+    def _detectar_duplicados(self):
+        """Marca las imágenes que coinciden con la de otro producto"""
+        for imagen in self:
+            similares = imagen._buscar_similares(limit=1)
+            imagen.duplicado_de_id = similares[0][0] if similares else False
+    
+    def action_ver_similares(self):
+        """Abre las imágenes de otros productos parecidas a esta"""
+        self.ensure_one()
+        similares = self._buscar_similares(max_distancia=10, limit=50)
+        return {
+            'name': 'Imágenes Similares',
+            'type': 'ir.actions.act_window',
+            'res_model': 'renaix.producto.imagen',
+            'view_mode': 'list,form',
+            'domain': [('id', 'in', [imagen.id for imagen, _distancia in similares])],
+        }
+    
+    @api.constrains('imagen', 'imagen_original')
+    def _check_imagen(self):
+        """Toda imagen debe tener contenido (procesado o pendiente)"""
+        for imagen in self.with_context(bin_size=True):
+            if not imagen.imagen and not imagen.imagen_original:
+                raise ValidationError('La imagen no puede estar vacía.')
     
     @api.constrains('producto_id')
     def _check_max_imagenes_producto(self):
@@ -123,6 +336,8 @@ class ProductoImagen(models.Model):
     
     def write(self, vals):
         """Al marcar como principal, desmarcar las demás"""
+        self._redirigir_imagen(vals)
+        
         if vals.get('es_principal', False):
             for imagen in self:
                 # Desmarcar otras imágenes como principal
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from odoo import models, fields, api
+from odoo.tools import sql
 
 
 class ResPartner(models.Model):
@@ -9,7 +10,13 @@ class ResPartner(models.Model):
     Descripción: Hereda de res.partner (Contactos) para añadir campos
                  específicos de usuarios de la app móvil Renaix
     """
-    _inherit = 'res.partner'
+    _inherit = ['res.partner', 'renaix.imagen.procesable.mixin', 'renaix.imagen.checksum.mixin']
+    
+    # La foto de perfil solo necesita la imagen principal: Odoo genera
+    # sus propias variantes (image_1024, image_512...) a partir de image_1920
+    _imagen_opciones = {'thumb_size': 0, 'webp': False}
+    _imagen_campo = 'image_1920'
+    _imagen_checksum_campo = 'image_1920'
     
     # ========================================
     # CAMPO GID (Global ID)
@@ -45,6 +52,28 @@ class ResPartner(models.Model):
         help='Media de valoraciones recibidas como vendedor (0-5 estrellas)'
     )
     
+    # Agregados de valoraciones recibidas (mantenidos por renaix.valoracion)
+    valoracion_suma = fields.Integer(
+        string='Suma de Puntuaciones',
+        default=0,
+        readonly=True,
+        help='Suma de las puntuaciones recibidas'
+    )
+    
+    valoracion_count = fields.Integer(
+        string='Nº Valoraciones',
+        default=0,
+        readonly=True,
+        help='Número de valoraciones recibidas'
+    )
+    
+    # Distribución de estrellas (histograma del perfil público)
+    valoraciones_1 = fields.Integer(string='Valoraciones 1⭐', default=0, readonly=True)
+    valoraciones_2 = fields.Integer(string='Valoraciones 2⭐', default=0, readonly=True)
+    valoraciones_3 = fields.Integer(string='Valoraciones 3⭐', default=0, readonly=True)
+    valoraciones_4 = fields.Integer(string='Valoraciones 4⭐', default=0, readonly=True)
+    valoraciones_5 = fields.Integer(string='Valoraciones 5⭐', default=0, readonly=True)
+    
     # Estadísticas del usuario (campos computados)
     productos_en_venta = fields.Integer(
         string='Productos en Venta',
@@ -165,45 +194,185 @@ class ResPartner(models.Model):
         help='Hash de la contraseña del usuario de la app'
     )
 
-    @api.depends('valoracion_ids.puntuacion')
+    @api.depends('valoracion_suma', 'valoracion_count')
     def _compute_valoracion_promedio(self):
-        """Calcula la valoración promedio del usuario como vendedor"""
+        """Calcula la valoración promedio a partir de la suma y el número de valoraciones"""
         for partner in self:
-            valoraciones = partner.valoracion_ids.filtered(lambda v: v.puntuacion > 0)
-            if valoraciones:
-                total = sum(valoraciones.mapped('puntuacion'))
-                partner.valoracion_promedio = total / len(valoraciones)
+            if partner.valoracion_count:
+                partner.valoracion_promedio = partner.valoracion_suma / partner.valoracion_count
             else:
                 partner.valoracion_promedio = 0.0
     
-    @api.depends('producto_ids', 'producto_ids.estado_venta', 
-                 'compra_comprador_ids', 'compra_vendedor_ids')
+    def init(self):
+        """
+        Recalcula los agregados de valoraciones con una sola consulta
+        agrupada (instalación y actualización del módulo).
+        """
+        super().init()
+        cr = self.env.cr
+        if not sql.table_exists(cr, 'renaix_valoracion') or \
+                not sql.column_exists(cr, 'res_partner', 'valoracion_suma'):
+            return
+        cr.execute("""
+            WITH agregados AS (
+                SELECT
+                    p.id,
+                    COALESCE(sum(v.puntuacion), 0) AS suma,
+                    count(v.id) AS total,
+                    count(v.id) FILTER (WHERE v.puntuacion = 1) AS e1,
+                    count(v.id) FILTER (WHERE v.puntuacion = 2) AS e2,
+                    count(v.id) FILTER (WHERE v.puntuacion = 3) AS e3,
+                    count(v.id) FILTER (WHERE v.puntuacion = 4) AS e4,
+                    count(v.id) FILTER (WHERE v.puntuacion = 5) AS e5
+                FROM res_partner p
+                LEFT JOIN renaix_valoracion v ON v.usuario_valorado_id = p.id
+                GROUP BY p.id
+            )
+            UPDATE res_partner p SET
+                valoracion_suma = a.suma,
+                valoracion_count = a.total,
+                valoraciones_1 = a.e1,
+                valoraciones_2 = a.e2,
+                valoraciones_3 = a.e3,
+                valoraciones_4 = a.e4,
+                valoraciones_5 = a.e5,
+                valoracion_promedio = CASE WHEN a.total > 0 THEN a.suma::float / a.total ELSE 0 END
+            FROM agregados a
+            WHERE p.id = a.id
+              AND (p.valoracion_suma, p.valoracion_count, p.valoraciones_1, p.valoraciones_2,
+                   p.valoraciones_3, p.valoraciones_4, p.valoraciones_5)
+                  IS DISTINCT FROM (a.suma, a.total, a.e1, a.e2, a.e3, a.e4, a.e5)
+        """)
+    
+    def _contar_por_partner(self, model_name, partner_field, domain=None):
+        """
+        Cuenta registros de un modelo agrupados por partner (una sola query).
+        
+        Args:
+            model_name (str): Modelo a contar (ej: 'renaix.producto')
+            partner_field (str): Campo Many2one a res.partner
+            domain (list): Filtro adicional
+        
+        Returns:
+            dict: {partner_id: cantidad}
+        """
+        partner_ids = [pid for pid in self._origin.ids if pid]
+        if not partner_ids:
+            return {}
+        grupos = self.env[model_name].sudo()._read_group(
+            [(partner_field, 'in', partner_ids)] + (domain or []),
+            [partner_field],
+            ['__count'],
+        )
+        return {partner.id: count for partner, count in grupos}
+    
+    @api.depends('producto_ids', 'producto_ids.estado_venta', 'producto_ids.active',
+                 'compra_comprador_ids', 'compra_vendedor_ids', 'compra_vendedor_ids.estado')
     def _compute_estadisticas_productos(self):
-        """Calcula estadísticas de productos del usuario"""
+        """
+        Calcula estadísticas de productos del usuario.
+        
+        Se calculan con tres consultas agrupadas para todo el lote de
+        partners, sin cargar sus productos ni sus compras.
+        """
+        en_venta = self._contar_por_partner(
+            'renaix.producto', 'propietario_id', [('estado_venta', '=', 'disponible')]
+        )
+        vendidos = self._contar_por_partner(
+            'renaix.compra', 'vendedor_id', [('estado', '=', 'completada')]
+        )
+        comprados = self._contar_por_partner('renaix.compra', 'comprador_id')
+        
         for partner in self:
-            # Productos en venta (disponibles actualmente)
-            partner.productos_en_venta = len(
-                partner.producto_ids.filtered(
-                    lambda p: p.estado_venta == 'disponible' and p.active
-                )
-            )
-            
-            # Productos vendidos (con compra completada)
-            partner.productos_vendidos = len(
-                partner.compra_vendedor_ids.filtered(
-                    lambda c: c.estado == 'completada'
-                )
-            )
-            
-            # Productos comprados
-            partner.productos_comprados = len(partner.compra_comprador_ids)
+            partner_id = partner._origin.id
+            partner.productos_en_venta = en_venta.get(partner_id, 0)
+            partner.productos_vendidos = vendidos.get(partner_id, 0)
+            partner.productos_comprados = comprados.get(partner_id, 0)
     
-    @api.depends('comentario_ids', 'denuncia_ids')
+    @api.depends('comentario_ids', 'comentario_ids.active', 'denuncia_ids')
     def _compute_estadisticas_actividad(self):
-        """Calcula estadísticas de actividad del usuario"""
+        """Calcula estadísticas de actividad del usuario (consultas agrupadas)"""
+        comentarios = self._contar_por_partner('renaix.comentario', 'usuario_id')
+        denuncias = self._contar_por_partner('renaix.denuncia', 'usuario_reportante_id')
+        
         for partner in self:
-            partner.total_comentarios = len(partner.comentario_ids)
-            partner.total_denuncias_realizadas = len(partner.denuncia_ids)
+            partner_id = partner._origin.id
+            partner.total_comentarios = comentarios.get(partner_id, 0)
+            partner.total_denuncias_realizadas = denuncias.get(partner_id, 0)
+    
+    @api.model
+    def _backfill_estadisticas_mercado(self, partner_ids=None):
+        """
+        Recalcula en bloque (SQL) las estadísticas de marketplace.
+        
+        Pensado para la carga inicial o para reparar contadores tras
+        importaciones masivas. Solo escribe las filas que cambian.
+        
+        Uso desde odoo shell:
+            env['res.partner']._backfill_estadisticas_mercado()
+        
+        Args:
+            partner_ids (list): Partners a recalcular (None = todos los usuarios app)
+        
+        Returns:
+            int: Número de partners actualizados
+        """
+        self.env.flush_all()
+        
+        where = 'p.es_usuario_app' if partner_ids is None else 'p.id = ANY(%(ids)s)'
+        self.env.cr.execute(f"""
+            WITH stats AS (
+                SELECT
+                    p.id,
+                    (SELECT count(*) FROM renaix_producto pr
+                      WHERE pr.propietario_id = p.id AND pr.active
+                        AND pr.estado_venta = 'disponible') AS productos_en_venta,
+                    (SELECT count(*) FROM renaix_compra c
+                      WHERE c.vendedor_id = p.id AND c.estado = 'completada') AS productos_vendidos,
+                    (SELECT count(*) FROM renaix_compra c
+                      WHERE c.comprador_id = p.id) AS productos_comprados,
+                    (SELECT count(*) FROM renaix_comentario co
+                      WHERE co.usuario_id = p.id AND co.active) AS total_comentarios,
+                    (SELECT count(*) FROM renaix_denuncia d
+                      WHERE d.usuario_reportante_id = p.id) AS total_denuncias_realizadas
+                FROM res_partner p
+                WHERE {where}
+            )
+            UPDATE res_partner p SET
+                productos_en_venta = s.productos_en_venta,
+                productos_vendidos = s.productos_vendidos,
+                productos_comprados = s.productos_comprados,
+                total_comentarios = s.total_comentarios,
+                total_denuncias_realizadas = s.total_denuncias_realizadas
+            FROM stats s
+            WHERE p.id = s.id
+              AND (p.productos_en_venta, p.productos_vendidos, p.productos_comprados,
+                   p.total_comentarios, p.total_denuncias_realizadas)
+                  IS DISTINCT FROM
+                  (s.productos_en_venta, s.productos_vendidos, s.productos_comprados,
+                   s.total_comentarios, s.total_denuncias_realizadas)
+        """, {'ids': list(partner_ids or [])})
+        actualizados = self.env.cr.rowcount
+        
+        self.invalidate_model([
+            'productos_en_venta', 'productos_vendidos', 'productos_comprados',
+            'total_comentarios', 'total_denuncias_realizadas',
+        ])
+        return actualizados
+    
+    def action_recalcular_estadisticas(self):
+        """Acción: recalcula las estadísticas de los usuarios seleccionados"""
+        actualizados = self._backfill_estadisticas_mercado(self.ids)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'Estadísticas recalculadas',
+                'message': f'{actualizados} usuarios actualizados',
+                'type': 'success',
+                'sticky': False,
+            },
+        }
     
     @api.model_create_multi
     def create(self, vals_list):
@@ -347,3 +516,4 @@ class ResPartner(models.Model):
             return partner
 
         return False
+    
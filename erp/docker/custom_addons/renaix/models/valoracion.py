@@ -1,8 +1,16 @@
 # -*- coding: utf-8 -*-
 
+from collections import defaultdict
+
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
 
+# Campos de res.partner mantenidos por las valoraciones
+CAMPOS_AGREGADOS = [
+    'valoracion_suma', 'valoracion_count',
+    'valoraciones_1', 'valoraciones_2', 'valoraciones_3', 'valoraciones_4', 'valoraciones_5',
+]
+
 
 class Valoracion(models.Model):
     """
@@ -11,9 +19,14 @@ class Valoracion(models.Model):
     """
     _name = 'renaix.valoracion'
     _description = 'Valoración de Usuario'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'renaix.indices.mixin']
     _order = 'fecha desc, id desc'
     
+    # Valoraciones recibidas por un usuario
+    _indices_renaix = {
+        'renaix_valoracion_valorado_fecha_idx': (['usuario_valorado_id', 'fecha DESC'], None),
+    }
+    
     # Relación con la compra (obligatoria)
     compra_id = fields.Many2one(
         'renaix.compra',
@@ -163,32 +176,98 @@ class Valoracion(models.Model):
                     'Solo puedes valorar una compra que haya sido completada.'
                 )
     
+    def _aplicar_agregados(self, signo):
+        """
+        Suma (signo=1) o resta (signo=-1) estas valoraciones de los
+        agregados de los usuarios valorados, con un único UPDATE.
+        
+        Args:
+            signo (int): 1 al crear, -1 al borrar
+        """
+        # suma, total, 1⭐, 2⭐, 3⭐, 4⭐, 5⭐ por usuario valorado
+        deltas = defaultdict(lambda: [0] * 7)
+        for valoracion in self:
+            partner_id = valoracion.usuario_valorado_id.id
+            puntuacion = valoracion.puntuacion
+            if not partner_id or not 1 <= puntuacion <= 5:
+                continue
+            delta = deltas[partner_id]
+            delta[0] += signo * puntuacion
+            delta[1] += signo
+            delta[1 + puntuacion] += signo
+        
+        if not deltas:
+            return
+        
+        Partner = self.env['res.partner']
+        Partner.flush_model(CAMPOS_AGREGADOS)
+        partner_ids = list(deltas)
+        columnas = [partner_ids] + [[deltas[pid][i] for pid in partner_ids] for i in range(7)]
+        self.env.cr.execute("""
+            UPDATE res_partner p SET
+                valoracion_suma = COALESCE(p.valoracion_suma, 0) + d.suma,
+                valoracion_count = COALESCE(p.valoracion_count, 0) + d.total,
+                valoraciones_1 = COALESCE(p.valoraciones_1, 0) + d.e1,
+                valoraciones_2 = COALESCE(p.valoraciones_2, 0) + d.e2,
+                valoraciones_3 = COALESCE(p.valoraciones_3, 0) + d.e3,
+                valoraciones_4 = COALESCE(p.valoraciones_4, 0) + d.e4,
+                valoraciones_5 = COALESCE(p.valoraciones_5, 0) + d.e5
+            FROM unnest(%s::int[], %s::int[], %s::int[], %s::int[], %s::int[],
+                        %s::int[], %s::int[], %s::int[])
+                 AS d(id, suma, total, e1, e2, e3, e4, e5)
+            WHERE p.id = d.id
+        """, columnas)
+        
+        # Refrescar la caché y recalcular valoracion_promedio
+        partners = Partner.browse(partner_ids)
+        partners.invalidate_recordset(CAMPOS_AGREGADOS)
+        partners.modified(CAMPOS_AGREGADOS)
+    
     @api.model
     def create(self, vals):
         """Al crear: notificar al usuario valorado"""
         valoracion = super(Valoracion, self).create(vals)
+        valoracion._aplicar_agregados(1)
         
         # Notificar al usuario valorado
         estrellas = '⭐' * valoracion.puntuacion
-        valoracion.message_post(
-            body=f"""
+        self.env['renaix.chatter.outbox']._publicar([
+            (
+                valoracion,
+                f"""
                 <h3>✨ Nueva valoración recibida</h3>
                 <p><b>De:</b> {valoracion.usuario_valorador_id.name}</p>
                 <p><b>Puntuación:</b> {estrellas} ({valoracion.puntuacion}/5)</p>
                 <p><b>Comentario:</b> {valoracion.comentario or 'Sin comentario'}</p>
-            """,
-            subject='Nueva Valoración',
-            partner_ids=[valoracion.usuario_valorado_id.id]
-        )
-        
-        # Notificar en la compra
-        valoracion.compra_id.message_post(
-            body=f'{valoracion.usuario_valorador_id.name} ha valorado con {estrellas}',
-            subject='Nueva Valoración'
-        )
+                """,
+                'Nueva Valoración',
+                [valoracion.usuario_valorado_id.id],
+            ),
+            # Notificar en la compra
+            (
+                valoracion.compra_id,
+                f'{valoracion.usuario_valorador_id.name} ha valorado con {estrellas}',
+                'Nueva Valoración',
+                None,
+            ),
+        ])
         
         return valoracion
     
+    def write(self, vals):
+        """Si cambia la puntuación o el valorado, ajustar los agregados"""
+        if not {'puntuacion', 'usuario_valorado_id'} & set(vals):
+            return super().write(vals)
+        self._aplicar_agregados(-1)
+        result = super().write(vals)
+        self._aplicar_agregados(1)
+        return result
+    
+    def unlink(self):
+        """Al borrar: descontar de los agregados del valorado"""
+        self._aplicar_agregados(-1)
+        return super().unlink()
+    
     def name_get(self):
         """Personaliza cómo se muestra en selects"""
         result = []
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+from . import imagenes
+from . import indices
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+Procesado de imágenes subidas por los usuarios
+
+Funciones puras (solo Pillow, sin ORM) para poder ejecutarlas en un pool
+de procesos: corrección de la orientación EXIF, eliminación de metadatos,
+redimensionado, miniatura y variante WebP. También calcula el hash del
+contenido (para reutilizar el procesado de bytes idénticos) y un hash
+perceptual (dHash) para detectar imágenes casi iguales.
+"""
+
+import hashlib
+import io
+import logging
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from PIL import Image, ImageOps
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+_logger = logging.getLogger(__name__)
+
+# Tamaño máximo de la imagen principal y de la miniatura (px)
+MAX_SIZE = 1920
+THUMB_SIZE = 256
+
+# Calidad de los formatos con pérdida
+JPEG_QUALITY = 85
+WEBP_QUALITY = 80
+
+# Procesos del pool (por worker de Odoo que procese imágenes)
+POOL_WORKERS = 2
+
+# Segundos máximos por imagen
+TIMEOUT = 60
+
+# Lado de la cuadrícula del hash perceptual (8x8 = 64 bits)
+HASH_SIZE = 8
+
+# Píxeles máximos de una imagen subida (protección frente a "bombas de
+# descompresión"). Se comprueba en procesar() en lugar de cambiar
+# Image.MAX_IMAGE_PIXELS, que afectaría a todo el proceso de Odoo
+MAX_PIXELES = 50_000_000
+
+
+def detectar_mimetype(data):
+    """
+    Deduce el tipo MIME a partir de los primeros bytes.
+
+    Args:
+        data (bytes): Contenido de la imagen
+
+    Returns:
+        str: Tipo MIME (image/jpeg por defecto)
+    """
+    if data[:8] == b'\x89PNG\r\n\x1a\n':
+        return 'image/png'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return 'image/gif'
+    return 'image/jpeg'
+
+
+def contenido_hash(data):
+    """
+    Hash del contenido exacto de una imagen.
+
+    Args:
+        data (bytes): Imagen
+
+    Returns:
+        str: SHA-1 en hexadecimal (el mismo que usa el filestore de Odoo)
+    """
+    return hashlib.sha1(data).hexdigest()
+
+
+def dhash(img, hash_size=HASH_SIZE):
+    """
+    Hash perceptual por diferencias (dHash).
+
+    Reduce la imagen a escala de grises de (hash_size + 1) x hash_size y
+    compara cada píxel con el de su derecha. Las recompresiones, cambios de
+    tamaño y pequeños retoques cambian pocos bits, así que la distancia de
+    Hamming entre dos hashes mide lo parecidas que son las imágenes.
+
+    Args:
+        img (PIL.Image.Image): Imagen ya orientada
+        hash_size (int): Lado de la cuadrícula
+
+    Returns:
+        str: Hash en hexadecimal (hash_size² bits)
+    """
+    gris = img.convert('L').resize((hash_size + 1, hash_size), Image.LANCZOS)
+    if numpy is not None:
+        pixeles = numpy.asarray(gris, dtype=numpy.int16)
+        bits = (pixeles[:, 1:] > pixeles[:, :-1]).flatten()
+        return numpy.packbits(bits).tobytes().hex()
+
+    pixeles = list(gris.getdata())
+    valor = 0
+    for fila in range(hash_size):
+        inicio = fila * (hash_size + 1)
+        for col in range(hash_size):
+            valor = (valor << 1) | (pixeles[inicio + col + 1] > pixeles[inicio + col])
+    return f'{valor:0{hash_size * hash_size // 4}x}'
+
+
+def distancia_hamming(hash_a, hash_b):
+    """
+    Bits distintos entre dos hashes perceptuales en hexadecimal.
+
+    Returns:
+        int: Distancia de Hamming (0 = misma imagen)
+    """
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count('1')
+
+
+def _guardar(img, formato, **opciones):
+    buffer = io.BytesIO()
+    img.save(buffer, format=formato, **opciones)
+    return buffer.getvalue()
+
+
+def procesar(data, max_size=MAX_SIZE, thumb_size=THUMB_SIZE, webp=True):
+    """
+    Normaliza una imagen subida.
+
+    Aplica la orientación EXIF, elimina los metadatos (al volver a
+    codificar sin ellos), la reduce a max_size y genera la miniatura y la
+    variante WebP. Las imágenes con transparencia se guardan en PNG; el
+    resto en JPEG.
+
+    Args:
+        data (bytes): Imagen original
+        max_size (int): Lado máximo de la imagen principal
+        thumb_size (int): Lado máximo de la miniatura (0 = sin miniatura)
+        webp (bool): Generar variante WebP
+
+    Returns:
+        dict: {'imagen', 'miniatura', 'webp'} en bytes (None si no se generan),
+              más 'ancho' y 'alto' de la imagen principal y su 'phash'
+
+    Raises:
+        ValueError: Si la imagen supera MAX_PIXELES
+    """
+    with Image.open(io.BytesIO(data)) as original:
+        # Image.open solo lee la cabecera: se comprueba antes de decodificar
+        ancho, alto = original.size
+        if ancho * alto > MAX_PIXELES:
+            raise ValueError(f'La imagen es demasiado grande ({ancho}x{alto} píxeles)')
+        original.load()
+        img = ImageOps.exif_transpose(original)
+
+    phash = dhash(img)
+    transparente = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+    img = img.convert('RGBA' if transparente else 'RGB')
+    img.thumbnail((max_size, max_size), Image.LANCZOS)
+
+    if transparente:
+        principal = _guardar(img, 'PNG', optimize=True)
+    else:
+        principal = _guardar(img, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+
+    miniatura = None
+    if thumb_size:
+        thumb = img.copy()
+        thumb.thumbnail((thumb_size, thumb_size), Image.LANCZOS)
+        miniatura = _guardar(thumb, 'PNG' if transparente else 'JPEG', quality=JPEG_QUALITY)
+
+    return {
+        'imagen': principal,
+        'miniatura': miniatura,
+        'webp': _guardar(img, 'WEBP', quality=WEBP_QUALITY, method=4) if webp else None,
+        'ancho': img.width,
+        'alto': img.height,
+        'phash': phash,
+    }
+
+
+# ==================== POOL DE PROCESOS ====================
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+# Código que ejecuta cada hijo al arrancar: los hijos son intérpretes
+# nuevos y necesitan las rutas de addons del padre para importar este
+# módulo (odoo.addons.renaix.tools.imagenes) al recibir cada trabajo
+_ARRANQUE_HIJO = 'import odoo.addons; odoo.addons.__path__.extend(r for r in rutas if r not in odoo.addons.__path__)'
+
+
+def get_pool():
+    """
+    Pool de procesos acotado, uno por proceso de Odoo.
+
+    Los hijos se crean con 'forkserver' y no con 'fork': el servidor de
+    Odoo es multihilo y un fork desde el hilo del cron puede copiar un lock
+    (logging, imports) tomado por otro hilo y bloquear al hijo para siempre.
+
+    Returns:
+        ProcessPoolExecutor: Pool (o None si no se puede crear)
+    """
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            import odoo.addons
+            try:
+                _pool = ProcessPoolExecutor(
+                    max_workers=POOL_WORKERS,
+                    mp_context=multiprocessing.get_context('forkserver'),
+                    initializer=exec,
+                    initargs=(_ARRANQUE_HIJO, {'rutas': list(odoo.addons.__path__)}),
+                )
+                _pool_pid = os.getpid()
+            except (OSError, ValueError) as e:
+                _logger.warning(f'No se puede crear el pool de imágenes, se procesará en línea: {str(e)}')
+                _pool = None
+        return _pool
+
+
+def _descartar_pool(pool):
+    """
+    Cierra un pool roto o con hijos colgados y termina sus procesos; la
+    próxima llamada a get_pool() crea uno nuevo.
+
+    Args:
+        pool (ProcessPoolExecutor): Pool a descartar
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    # _processes es privado, pero shutdown() no termina a los hijos que
+    # siguen ejecutando un trabajo
+    procesos = list((pool._processes or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for proceso in procesos:
+        if proceso.is_alive():
+            proceso.terminate()
+
+
+def procesar_lote(trabajos):
+    """
+    Procesa varias imágenes en paralelo en el pool.
+
+    El lote entero tiene un plazo de TIMEOUT segundos por cada imagen que
+    le toca a cada proceso del pool. Si vence, o si un hijo muere, el pool
+    se descarta (terminando los hijos) y las imágenes sin terminar se
+    devuelven con el error.
+
+    Args:
+        trabajos (dict): {clave: (data, opciones)} con las opciones de procesar()
+
+    Returns:
+        dict: {clave: resultado de procesar() o la excepción producida}
+    """
+    pool = get_pool()
+    if pool is None:
+        resultados = {}
+        for clave, (data, opciones) in trabajos.items():
+            try:
+                resultados[clave] = procesar(data, **opciones)
+            except Exception as e:
+                resultados[clave] = e
+        return resultados
+
+    futuros = {
+        clave: pool.submit(procesar, data, **opciones)
+        for clave, (data, opciones) in trabajos.items()
+    }
+    plazo = TIMEOUT * math.ceil(len(futuros) / POOL_WORKERS)
+    _hechos, pendientes = wait(futuros.values(), timeout=plazo)
+
+    resultados = {}
+    descartar = bool(pendientes)
+    for clave, futuro in futuros.items():
+        if futuro in pendientes:
+            resultados[clave] = TimeoutError(f'El procesado de la imagen superó {plazo} segundos')
+            continue
+        error = futuro.exception()
+        resultados[clave] = error if error is not None else futuro.result()
+        # Un hijo murió (p.ej. por memoria)
+        descartar = descartar or isinstance(error, BrokenProcessPool)
+
+    if descartar:
+        _logger.warning('Pool de imágenes roto o con procesos colgados: se recreará')
+        _descartar_pool(pool)
+    return resultados
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Índices compuestos y parciales de las consultas más frecuentes
+
+Los modelos heredan renaix.indices.mixin y declaran sus índices en
+`_indices_renaix`; el init() del mixin los sincroniza al instalar y
+actualizar el módulo:
+
+    _inherit = ['renaix.indices.mixin']
+
+    _indices_renaix = {
+        'renaix_producto_disponible_fecha_idx': (
+            ['fecha_publicacion DESC', 'id DESC'],
+            "active AND estado_venta = 'disponible'",
+        ),
+    }
+
+Cada índice creado lleva un comentario con la huella de su definición. Al
+sincronizar se crean los que faltan, se recrean los que han cambiado y se
+borran los que ya no están declarados. Solo se tocan los índices con ese
+comentario: los de Odoo (index=True) y los creados a mano se respetan.
+
+Un índice parcial solo se usa si el WHERE de la consulta implica el suyo
+con los valores ya sustituidos (como hace el ORM). Los planes genéricos de
+sentencias preparadas con parámetros no lo aprovechan.
+"""
+
+import hashlib
+import logging
+
+from odoo.tools import sql
+
+_logger = logging.getLogger(__name__)
+
+# Prefijo del comentario de los índices gestionados
+MARCA = 'renaix:'
+
+
+def huella(expresiones, where=None):
+    """
+    Args:
+        expresiones (list): Columnas o expresiones del índice
+        where (str): Condición del índice parcial
+
+    Returns:
+        str: Comentario que identifica la definición del índice
+    """
+    definicion = f"{', '.join(expresiones)} WHERE {where or ''}"
+    return MARCA + hashlib.sha1(definicion.encode()).hexdigest()[:12]
+
+
+def indices_gestionados(cr, tabla):
+    """
+    Returns:
+        dict: {nombre: huella} de los índices de la tabla creados por este módulo
+    """
+    cr.execute("""
+        SELECT c.relname, obj_description(c.oid, 'pg_class')
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_class t ON t.oid = i.indrelid
+        WHERE t.relname = %s
+          AND t.relnamespace = current_schema()::regnamespace
+          AND obj_description(c.oid, 'pg_class') LIKE %s
+    """, [tabla, MARCA + '%'])
+    return dict(cr.fetchall())
+
+
+def sincronizar_indices(cr, tabla, indices):
+    """
+    Deja en la tabla exactamente los índices declarados.
+
+    Args:
+        cr: Cursor de base de datos
+        tabla (str): Tabla del modelo
+        indices (dict): {nombre: (expresiones, where)}; where puede ser None
+    """
+    existentes = indices_gestionados(cr, tabla)
+
+    for nombre in sorted(set(existentes) - set(indices)):
+        _logger.info('Borrando el índice obsoleto %s', nombre)
+        sql.drop_index(cr, nombre, tabla)
+
+    for nombre, (expresiones, where) in indices.items():
+        marca = huella(expresiones, where)
+        if existentes.get(nombre) == marca:
+            continue
+        if sql.index_exists(cr, nombre):
+            sql.drop_index(cr, nombre, tabla)
+        _logger.info('Creando el índice %s en %s', nombre, tabla)
+        sql.create_index(cr, nombre, tabla, expresiones, where=where or '')
+        cr.execute(f'COMMENT ON INDEX "{nombre}" IS %s', [marca])
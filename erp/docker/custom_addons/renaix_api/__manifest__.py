@@ -29,7 +29,10 @@
     ],
     
     # Archivos del módulo
-    'data': [],  # No necesitamos vistas ni datos, solo API
+    'data': [
+        'security/ir.model.access.csv',
+        'views/perfil_views.xml',  # Perfiles de peticiones (backend)
+    ],
     
     # Configuración
     'installable': True,
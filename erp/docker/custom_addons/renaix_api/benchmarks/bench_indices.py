@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Efecto de los índices compuestos y parciales en las consultas frecuentes.
+
+Ejecuta EXPLAIN (ANALYZE, BUFFERS) de las consultas más frecuentes de la
+API, tal como las genera el ORM (mismos dominios y órdenes que los
+controladores), con y sin los índices declarados en `_indices_renaix` de
+los modelos de renaix (ver renaix/tools/indices.py), y compara tiempos,
+bloques leídos y el plan elegido.
+
+- Todo ocurre en una transacción que se deshace al final: los índices que
+  falten se crean para medir y los existentes se borran para medir sin
+  ellos, pero la base de datos queda como estaba.
+- DROP INDEX bloquea la tabla hasta el final de la transacción: ejecutarlo
+  sobre la base de datos de los benchmarks, no en producción.
+- Los parámetros (usuario, categoría, producto) son los que más filas tienen
+  en el conjunto de datos: el peor caso de cada consulta.
+
+Uso (dentro del contenedor de Odoo, con datos de benchmarks/generar_datos.py):
+    python benchmarks/bench_indices.py -c /etc/odoo/odoo.conf -d renaix
+    python benchmarks/bench_indices.py -c /etc/odoo/odoo.conf -d renaix --planes --json indices.json
+"""
+
+import argparse
+import json
+
+from consultas_lentas import nodos, texto_plan
+
+# Modelos con índices declarados
+MODELOS = [
+    'renaix.producto', 'renaix.mensaje', 'renaix.valoracion',
+    'renaix.comentario', 'renaix.compra', 'renaix.denuncia',
+]
+
+# Parámetros de las consultas: el valor con más filas
+PARAMETROS = {
+    'categoria': 'SELECT categoria_id FROM renaix_producto WHERE categoria_id IS NOT NULL '
+                 'GROUP BY 1 ORDER BY count(*) DESC LIMIT 1',
+    'propietario': 'SELECT propietario_id FROM renaix_producto GROUP BY 1 ORDER BY count(*) DESC LIMIT 1',
+    'receptor': 'SELECT receptor_id FROM renaix_mensaje GROUP BY 1 ORDER BY count(*) DESC LIMIT 1',
+    'valorado': 'SELECT usuario_valorado_id FROM renaix_valoracion GROUP BY 1 ORDER BY count(*) DESC LIMIT 1',
+    'producto': 'SELECT producto_id FROM renaix_comentario GROUP BY 1 ORDER BY count(*) DESC LIMIT 1',
+    'comprador': 'SELECT comprador_id FROM renaix_compra GROUP BY 1 ORDER BY count(*) DESC LIMIT 1',
+    'vendedor': 'SELECT vendedor_id FROM renaix_compra GROUP BY 1 ORDER BY count(*) DESC LIMIT 1',
+    'reportante': 'SELECT usuario_reportante_id FROM renaix_denuncia GROUP BY 1 ORDER BY count(*) DESC LIMIT 1',
+}
+
+DISPONIBLE = [('active', '=', True), ('estado_venta', '=', 'disponible')]
+
+# (nombre, modelo, dominio(parámetros), orden, límite) como en los controladores
+CONSULTAS = [
+    ('GET /productos', 'renaix.producto',
+     lambda p: DISPONIBLE, 'fecha_publicacion DESC', None),
+    ('GET /productos?estado_venta=vendido', 'renaix.producto',
+     lambda p: [('active', '=', True), ('estado_venta', '=', 'vendido')], 'fecha_publicacion DESC', None),
+    ('GET /productos/buscar (categoría)', 'renaix.producto',
+     lambda p: DISPONIBLE + [('categoria_id', '=', p['categoria'])], 'fecha_publicacion DESC', 'busqueda'),
+    ('GET /productos/buscar (precio_asc)', 'renaix.producto',
+     lambda p: DISPONIBLE + [('precio', '<=', 50)], 'precio ASC', 'busqueda'),
+    ('GET /productos/buscar (precio_desc)', 'renaix.producto',
+     lambda p: DISPONIBLE, 'precio DESC', 'busqueda'),
+    ('GET /usuarios/me/productos', 'renaix.producto',
+     lambda p: [('propietario_id', '=', p['propietario'])], 'fecha_publicacion DESC', None),
+    ('GET /usuarios/<id>/productos', 'renaix.producto',
+     lambda p: [('propietario_id', '=', p['propietario'])] + DISPONIBLE, 'fecha_publicacion DESC', None),
+    ('GET /mensajes (conversaciones)', 'renaix.mensaje',
+     lambda p: ['|', ('emisor_id', '=', p['receptor']), ('receptor_id', '=', p['receptor'])], 'fecha DESC', None),
+    ('GET /mensajes/no-leidos', 'renaix.mensaje',
+     lambda p: [('receptor_id', '=', p['receptor']), ('leido', '=', False)], 'fecha desc', None),
+    ('GET /usuarios/<id>/valoraciones', 'renaix.valoracion',
+     lambda p: [('usuario_valorado_id', '=', p['valorado'])], 'fecha DESC', None),
+    ('GET /productos/<id>/comentarios', 'renaix.comentario',
+     lambda p: [('producto_id', '=', p['producto']), ('active', '=', True)], 'fecha DESC', None),
+    ('GET /usuarios/me/compras', 'renaix.compra',
+     lambda p: [('comprador_id', '=', p['comprador'])], 'fecha_compra DESC', None),
+    ('GET /usuarios/me/ventas', 'renaix.compra',
+     lambda p: [('vendedor_id', '=', p['vendedor'])], 'fecha_compra DESC', None),
+    ('GET /denuncias', 'renaix.denuncia',
+     lambda p: [('usuario_reportante_id', '=', p['reportante'])], 'fecha_denuncia DESC', None),
+]
+
+
+# ==================== MEDICIÓN ====================
+
+def leer_parametros(cr):
+    """
+    Returns:
+        dict: {parámetro: id} (0 si la tabla está vacía)
+    """
+    parametros = {}
+    for nombre, consulta in PARAMETROS.items():
+        cr.execute(consulta)
+        fila = cr.fetchone()
+        parametros[nombre] = fila[0] if fila else 0
+    return parametros
+
+
+def explain_analyze(env, modelo, dominio, orden, limite, repeticiones):
+    """
+    Ejecuta la consulta del ORM con EXPLAIN ANALYZE y se queda con la más rápida.
+
+    Returns:
+        dict: Plan en JSON (raíz, con 'Execution Time')
+    """
+    from odoo.tools import SQL
+
+    sentencia = env[modelo].sudo()._search(dominio, order=orden, limit=limite).select()
+    mejor = None
+    for _i in range(repeticiones):
+        env.cr.execute(SQL('EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) %s', sentencia))
+        plan = env.cr.fetchone()[0][0]
+        if mejor is None or plan['Execution Time'] < mejor['Execution Time']:
+            mejor = plan
+    return mejor
+
+
+def resumen_plan(plan):
+    """
+    Returns:
+        dict: Tiempo, coste, bloques y accesos a tabla del plan
+    """
+    raiz = plan['Plan']
+    accesos = []
+    for nodo in nodos(raiz):
+        if nodo.get('Relation Name') or nodo.get('Index Name'):
+            acceso = nodo['Node Type']
+            if nodo.get('Index Name'):
+                acceso += f' {nodo["Index Name"]}'
+            elif nodo.get('Relation Name'):
+                acceso += f' {nodo["Relation Name"]}'
+            accesos.append(acceso)
+    return {
+        'ms': plan['Execution Time'],
+        'coste': raiz['Total Cost'],
+        'filas': raiz.get('Actual Rows', 0),
+        'bloques': raiz.get('Shared Hit Blocks', 0) + raiz.get('Shared Read Blocks', 0),
+        'ordena': any(nodo['Node Type'] in ('Sort', 'Incremental Sort') for nodo in nodos(raiz)),
+        'accesos': accesos,
+        'plan': raiz,
+    }
+
+
+def medir(env, parametros, limites, repeticiones):
+    """
+    Returns:
+        dict: {consulta: resumen del plan}
+    """
+    resultados = {}
+    for nombre, modelo, dominio, orden, limite in CONSULTAS:
+        plan = explain_analyze(env, modelo, dominio(parametros), orden, limites.get(limite, limite), repeticiones)
+        resultados[nombre] = resumen_plan(plan)
+    return resultados
+
+
+def indices_declarados(env):
+    """
+    Returns:
+        list: [(modelo, tabla, {nombre: (expresiones, where)})]
+    """
+    return [
+        (modelo, env[modelo]._table, env[modelo]._indices_renaix)
+        for modelo in MODELOS if getattr(env[modelo], '_indices_renaix', None)
+    ]
+
+
+def comparar(env, args):
+    """
+    Mide las consultas con los índices y sin ellos (dentro de la transacción).
+
+    Returns:
+        dict: {'parametros', 'indices', 'consultas': [{nombre, con, sin}]}
+    """
+    from odoo.addons.renaix.tools import indices
+    from odoo.addons.renaix_api.config import settings
+
+    cr = env.cr
+    declarados = indices_declarados(env)
+    limites = {'busqueda': settings.MAX_SEARCH_RESULTS}
+
+    for _modelo, tabla, _indices in declarados:
+        cr.execute(f'ANALYZE "{tabla}"')
+    parametros = leer_parametros(cr)
+
+    faltaban = []
+    for _modelo, tabla, declarados_tabla in declarados:
+        existentes = indices.indices_gestionados(cr, tabla)
+        faltaban += [nombre for nombre in declarados_tabla if nombre not in existentes]
+        indices.sincronizar_indices(cr, tabla, declarados_tabla)
+
+    # Calentamiento: la primera pasada carga la caché de PostgreSQL
+    medir(env, parametros, limites, 1)
+    con = medir(env, parametros, limites, args.repeticiones)
+
+    for _modelo, tabla, declarados_tabla in declarados:
+        for nombre in declarados_tabla:
+            cr.execute(f'DROP INDEX "{nombre}"')
+    medir(env, parametros, limites, 1)
+    sin = medir(env, parametros, limites, args.repeticiones)
+
+    return {
+        'parametros': parametros,
+        'indices': [nombre for _m, _t, declarados_tabla in declarados for nombre in declarados_tabla],
+        'faltaban': faltaban,
+        'consultas': [{'nombre': nombre, 'con': con[nombre], 'sin': sin[nombre]} for nombre in con],
+    }
+
+
+# ==================== INFORME ====================
+
+def imprimir(informe, planes=False):
+    if informe['faltaban']:
+        print(f'Índices que aún no existen (creados solo para medir): {", ".join(informe["faltaban"])}')
+        print('Actualiza el módulo renaix para crearlos.\n')
+
+    print(f'{"consulta":40s} {"sin (ms)":>10s} {"con (ms)":>10s} {"mejora":>8s} '
+          f'{"bloques sin":>12s} {"bloques con":>12s}')
+    for consulta in informe['consultas']:
+        sin, con = consulta['sin'], consulta['con']
+        mejora = sin['ms'] / con['ms'] if con['ms'] else 0
+        print(f'{consulta["nombre"][:40]:40s} {sin["ms"]:10.2f} {con["ms"]:10.2f} {mejora:7.1f}x '
+              f'{sin["bloques"]:12d} {con["bloques"]:12d}')
+
+    print()
+    for consulta in informe['consultas']:
+        sin, con = consulta['sin'], consulta['con']
+        if sin['accesos'] == con['accesos'] and sin['ordena'] == con['ordena'] and not planes:
+            continue
+        print(consulta['nombre'])
+        for etiqueta, resumen in (('sin', sin), ('con', con)):
+            orden = ' + Sort' if resumen['ordena'] else ''
+            print(f'  {etiqueta}: {", ".join(resumen["accesos"])}{orden}  (cost={resumen["coste"]:.0f})')
+            if planes:
+                print(texto_plan(resumen['plan']))
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Planes de las consultas frecuentes con y sin índices')
+    parser.add_argument('-c', '--config', default=None, help='Fichero de configuración de Odoo')
+    parser.add_argument('-d', '--database', required=True, help='Base de datos')
+    parser.add_argument('--repeticiones', type=int, default=3,
+                        help='Ejecuciones de cada consulta (se toma la más rápida)')
+    parser.add_argument('--planes', action='store_true', help='Mostrar los planes completos')
+    parser.add_argument('--json', dest='json_path', default=None, help='Guardar el informe en JSON')
+    args = parser.parse_args()
+
+    import odoo
+    from odoo import SUPERUSER_ID
+    from odoo.modules.registry import Registry
+
+    odoo.tools.config.parse_config(['-d', args.database] + (['-c', args.config] if args.config else []))
+
+    with Registry(args.database).cursor() as cr:
+        env = odoo.api.Environment(cr, SUPERUSER_ID, {})
+        try:
+            informe = comparar(env, args)
+        finally:
+            cr.rollback()
+
+    imprimir(informe, planes=args.planes)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False, default=str)
+        print(f'Informe guardado en {args.json_path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Benchmark de codificación JSON y compresión de respuestas de la API.
+
+Mide, para payloads con la forma de los endpoints más pesados, el tiempo de
+codificación con json (stdlib) y orjson, y los bytes que viajan por la red
+sin comprimir, con gzip y con brotli.
+
+No necesita Odoo: carga models/utils/json_encoder.py directamente.
+
+Uso:
+    python benchmarks/bench_response_encoding.py
+    python benchmarks/bench_response_encoding.py --repeat 500 --json resultados.json
+"""
+
+import argparse
+import gzip
+import importlib.util
+import json
+import os
+import random
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_json_encoder():
+    """Carga json_encoder.py sin importar el addon (que requiere Odoo)."""
+    path = os.path.join(BASE_DIR, 'models', 'utils', 'json_encoder.py')
+    spec = importlib.util.spec_from_file_location('renaix_json_encoder', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# ==================== PAYLOADS SINTÉTICOS ====================
+
+LOREM = (
+    'Producto en muy buen estado, apenas usado. Incluye caja original, '
+    'cargador y todos los accesorios. Entrega en mano o envío a cargo del comprador. '
+)
+
+
+def fake_partner(rng, full=False):
+    partner_id = rng.randint(1, 5000)
+    data = {
+        'id': partner_id,
+        'name': f'Usuario {partner_id}',
+        'email': f'usuario{partner_id}@example.com',
+    }
+    if full:
+        data.update({
+            'phone': '612345678',
+            'mobile': '',
+            'partner_gid': '3f2b8c1e-6a4d-4f3e-9b2a-%012d' % partner_id,
+            'valoracion_promedio': round(rng.uniform(3, 5), 2),
+            'productos_en_venta': rng.randint(0, 40),
+            'productos_vendidos': rng.randint(0, 200),
+            'productos_comprados': rng.randint(0, 80),
+            'total_comentarios': rng.randint(0, 300),
+            'fecha_registro_app': '2025-10-01T10:00:00',
+            'image_url': f'/api/v1/usuarios/{partner_id}/imagen',
+        })
+    return data
+
+
+def fake_producto(rng, n_images=4, n_comments=0, full_owner=False):
+    producto_id = rng.randint(1, 10 ** 6)
+    data = {
+        'id': producto_id,
+        'nombre': f'Producto de segunda mano {producto_id}',
+        'descripcion': LOREM * rng.randint(1, 4),
+        'precio': round(rng.uniform(5, 1500), 2),
+        'estado_producto': 'buen_estado',
+        'estado_venta': 'disponible',
+        'antiguedad': '2 años',
+        'ubicacion': 'Valencia',
+        'fecha_publicacion': '2026-01-15T12:30:00',
+        'fecha_actualizacion': '2026-01-16T09:10:00',
+        'dias_publicado': rng.randint(0, 90),
+        'total_comentarios': n_comments,
+        'total_denuncias': 0,
+        'propietario': fake_partner(rng, full=full_owner),
+        'categoria': {
+            'id': 3,
+            'nombre': 'Electrónica',
+            'descripcion': 'Móviles, ordenadores, consolas y accesorios',
+            'producto_count': 1234,
+            'imagen_url': '/web/image/renaix.categoria/3/image',
+        },
+        'etiquetas': [
+            {'id': i, 'nombre': f'etiqueta{i}', 'producto_count': rng.randint(1, 999), 'color': i % 11}
+            for i in range(rng.randint(1, 5))
+        ],
+        'imagenes': [
+            {
+                'id': producto_id * 10 + i,
+                'url_imagen': f'/api/v1/imagenes/{producto_id * 10 + i}',
+                'es_principal': i == 0,
+                'descripcion': f'Vista {i}',
+                'secuencia': (i + 1) * 10,
+            }
+            for i in range(n_images)
+        ],
+    }
+    if n_comments:
+        data['comentarios'] = [
+            {
+                'id': producto_id * 100 + i,
+                'texto': '¿Sigue disponible? ¿Aceptarías una oferta?',
+                'fecha': '2026-01-17T18:00:00',
+                'usuario': fake_partner(rng),
+                'producto_id': producto_id,
+                'producto_nombre': data['nombre'],
+            }
+            for i in range(n_comments)
+        ]
+    return data
+
+
+def paginated(items):
+    return {
+        'success': True,
+        'message': 'Productos recuperados',
+        'data': items,
+        'pagination': {'total': 5000, 'page': 1, 'limit': len(items), 'total_pages': 50,
+                       'has_next': True, 'has_prev': False},
+    }
+
+
+def build_payloads(seed=42):
+    rng = random.Random(seed)
+    return {
+        'GET /productos?limit=20': paginated([fake_producto(rng) for _ in range(20)]),
+        'GET /productos?limit=100': paginated([fake_producto(rng) for _ in range(100)]),
+        'GET /productos/<id>': {
+            'success': True, 'message': 'Producto encontrado',
+            'data': fake_producto(rng, n_images=10, n_comments=50, full_owner=True),
+        },
+        'GET /mensajes/conversaciones': {
+            'success': True, 'message': 'Conversaciones recuperadas',
+            'data': [
+                {
+                    'hilo_id': f'hilo_1_{i}_0',
+                    'participantes': [fake_partner(rng), fake_partner(rng)],
+                    'producto': fake_producto(rng, n_images=0),
+                    'total_mensajes': 30,
+                    'mensajes': [
+                        {'id': i * 100 + j, 'texto': 'Hola, ¿cuándo podemos quedar?',
+                         'fecha': '2026-01-17T18:00:00', 'leido': True, 'fecha_lectura': None,
+                         'emisor': fake_partner(rng), 'receptor': fake_partner(rng),
+                         'producto_id': 1, 'producto_nombre': 'Producto', 'hilo_id': f'hilo_1_{i}_0',
+                         'message_type': 'text'}
+                        for j in range(30)
+                    ],
+                }
+                for i in range(20)
+            ],
+        },
+    }
+
+
+# ==================== MEDICIÓN ====================
+
+def timeit(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def run(repeat):
+    encoder = load_json_encoder()
+    results = []
+
+    for name, payload in build_payloads().items():
+        row = {'endpoint': name}
+
+        row['json_ms'], raw = timeit(
+            lambda: json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8'),
+            repeat,
+        )
+        if encoder.orjson is not None:
+            row['orjson_ms'], _ = timeit(lambda: encoder.orjson.dumps(payload), repeat)
+        else:
+            row['orjson_ms'] = None
+
+        row['raw_bytes'] = len(raw)
+        row['gzip_ms'], gz = timeit(lambda: gzip.compress(raw, compresslevel=6), max(1, repeat // 5))
+        row['gzip_bytes'] = len(gz)
+        if encoder.brotli is not None:
+            row['br_ms'], br = timeit(lambda: encoder.brotli.compress(raw, quality=4), max(1, repeat // 5))
+            row['br_bytes'] = len(br)
+        else:
+            row['br_ms'] = row['br_bytes'] = None
+
+        results.append(row)
+    return results
+
+
+def fmt(value, pattern):
+    return pattern % value if value is not None else '-'
+
+
+def print_table(results):
+    header = ('Endpoint', 'json ms', 'orjson ms', 'bytes', 'gzip bytes', 'gzip ms', 'br bytes', 'br ms')
+    print('%-30s %9s %10s %10s %11s %8s %10s %8s' % header)
+    print('-' * 104)
+    for r in results:
+        print('%-30s %9s %10s %10d %11d %8s %10s %8s' % (
+            r['endpoint'],
+            fmt(r['json_ms'], '%.3f'),
+            fmt(r['orjson_ms'], '%.3f'),
+            r['raw_bytes'],
+            r['gzip_bytes'],
+            fmt(r['gzip_ms'], '%.3f'),
+            fmt(r['br_bytes'], '%d'),
+            fmt(r['br_ms'], '%.3f'),
+        ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de codificación JSON y compresión')
+    parser.add_argument('--repeat', type=int, default=200, help='Repeticiones por medición')
+    parser.add_argument('--json', dest='json_path', default=None, help='Guardar resultados en JSON')
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    print_table(results)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'\nResultados guardados en {args.json_path}')
+
+
+if __name__ == '__main__':
+    main()
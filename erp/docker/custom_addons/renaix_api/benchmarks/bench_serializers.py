@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+Benchmark de los serializers de la API.
+
+Mide serialize_productos, serialize_producto (detalle), serialize_compra y
+serialize_conversacion: tiempo por elemento, memoria (tracemalloc) y, contra
+una base de datos real, número de consultas SQL.
+
+Dos modos:
+- Sin Odoo (por defecto): carga models/utils/serializers.py directamente y
+  lo ejecuta sobre recordsets falsos en memoria. Mide solo el coste Python
+  del serializer, sin ORM ni SQL.
+- Con Odoo (--odoo): abre la base de datos indicada y serializa recordsets
+  reales, vaciando la caché del ORM antes de cada llamada (como en una
+  petición nueva). Aquí sí se cuentan las consultas.
+
+Los resultados se pueden guardar como línea base en JSON y comparar en
+ejecuciones posteriores; con --baseline el script termina con código 1 si
+algún caso empeora más de la tolerancia.
+
+Uso:
+    python benchmarks/bench_serializers.py
+    python benchmarks/bench_serializers.py --save-baseline benchmarks/baselines/serializers_offline.json
+    python benchmarks/bench_serializers.py --baseline benchmarks/baselines/serializers_offline.json
+    python benchmarks/bench_serializers.py --odoo -c /etc/odoo/odoo.conf -d renaix --repeat 20
+"""
+
+import argparse
+import datetime
+import importlib.util
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_serializers():
+    """Carga serializers.py sin importar el addon (que requiere Odoo)."""
+    path = os.path.join(BASE_DIR, 'models', 'utils', 'serializers.py')
+    spec = importlib.util.spec_from_file_location('renaix_serializers', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# ==================== RECORDSETS FALSOS ====================
+
+class FakeRecordset:
+    """
+    Imitación mínima de un recordset de Odoo para los serializers.
+
+    Cada registro es un dict; los campos relacionales guardan otro
+    FakeRecordset. Sobre un solo registro devuelve el valor del campo; sobre
+    varios, los relacionales se unen (como productos.propietario_id).
+    """
+
+    __slots__ = ('_records',)
+
+    def __init__(self, records=()):
+        self._records = list(records)
+
+    def __bool__(self):
+        return bool(self._records)
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        for record in self._records:
+            yield FakeRecordset((record,))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return FakeRecordset(self._records[key])
+        return FakeRecordset((self._records[key],))
+
+    def __or__(self, other):
+        return self._union([self, other])
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        records = self._records
+        if not records:
+            return False
+        if len(records) == 1:
+            return records[0][name]
+        values = [record[name] for record in records]
+        if values and isinstance(values[0], FakeRecordset):
+            return self._union(values)
+        raise ValueError(f'Expected singleton: {name} sobre {len(records)} registros')
+
+    @staticmethod
+    def _union(recordsets):
+        seen = {}
+        for recordset in recordsets:
+            for record in recordset._records:
+                seen.setdefault(record['id'], record)
+        return FakeRecordset(seen.values())
+
+    @property
+    def ids(self):
+        return [record['id'] for record in self._records]
+
+    def fetch(self, fnames):
+        return None
+
+    def with_prefetch(self, prefetch_ids=None):
+        return self
+
+    def sorted(self, key=None, reverse=False):
+        if isinstance(key, str):
+            field = key
+            key = lambda record: record[field]
+        elif key is not None:
+            func = key
+            key = lambda record: func(FakeRecordset((record,)))
+        else:
+            key = lambda record: record['id']
+        return FakeRecordset(sorted(self._records, key=key, reverse=reverse))
+
+    def filtered(self, func):
+        if isinstance(func, str):
+            field = func
+            return FakeRecordset(r for r in self._records if r[field])
+        return FakeRecordset(r for r in self._records if func(FakeRecordset((r,))))
+
+    def mapped(self, field):
+        return [record[field] for record in self._records]
+
+
+def build_dataset(seed=42, n_productos=100):
+    """
+    Genera un conjunto de datos en memoria con la forma de los modelos reales.
+
+    Returns:
+        dict: {'productos', 'compras', 'conversaciones'} como FakeRecordset
+    """
+    rng = random.Random(seed)
+    base_date = datetime.datetime(2026, 1, 15, 12, 30)
+    next_id = iter(range(1, 10 ** 7))
+
+    def fecha():
+        return base_date - datetime.timedelta(minutes=rng.randint(0, 90 * 24 * 60))
+
+    partners = []
+    for _ in range(60):
+        pid = next(next_id)
+        partners.append(FakeRecordset(({
+            'id': pid, 'name': f'Usuario {pid}', 'email': f'usuario{pid}@example.com',
+            'phone': '612345678', 'mobile': False, 'partner_gid': f'gid-{pid:012d}',
+            'valoracion_promedio': rng.uniform(3, 5), 'valoracion_count': rng.randint(0, 50),
+            'valoraciones_1': 1, 'valoraciones_2': 2, 'valoraciones_3': 3,
+            'valoraciones_4': 4, 'valoraciones_5': 5,
+            'productos_en_venta': rng.randint(0, 40), 'productos_vendidos': rng.randint(0, 200),
+            'productos_comprados': rng.randint(0, 80), 'total_comentarios': rng.randint(0, 300),
+            'fecha_registro_app': fecha(), 'estado_procesado': 'lista',
+            'has_image': True, 'image_checksum': f'{pid:040x}',
+        },)))
+
+    categorias = [
+        FakeRecordset(({
+            'id': next(next_id), 'name': nombre, 'descripcion': f'Productos de {nombre.lower()}',
+            'producto_count': rng.randint(10, 2000), 'producto_disponible_count': rng.randint(0, 1000),
+            'has_image': True, 'image_checksum': 'a' * 40,
+        },))
+        for nombre in ('Electrónica', 'Ropa', 'Muebles', 'Deportes', 'Libros', 'Hogar')
+    ]
+
+    etiquetas = [
+        FakeRecordset(({
+            'id': next(next_id), 'name': f'etiqueta{i}', 'producto_count': rng.randint(1, 999),
+            'producto_disponible_count': rng.randint(0, 500), 'color': i % 11,
+        },))
+        for i in range(40)
+    ]
+
+    productos = []
+    for _ in range(n_productos):
+        pid = next(next_id)
+        producto = {
+            'id': pid, 'name': f'Producto de segunda mano {pid}',
+            'descripcion': 'Producto en muy buen estado, apenas usado. ' * rng.randint(1, 4),
+            'precio': round(rng.uniform(5, 1500), 2), 'estado_producto': 'buen_estado',
+            'estado_venta': 'disponible', 'antiguedad': '2 años', 'ubicacion': 'Valencia',
+            'fecha_publicacion': fecha(), 'fecha_actualizacion': fecha(),
+            'dias_publicado': rng.randint(0, 90), 'total_denuncias': 0,
+            'propietario_id': rng.choice(partners),
+            'categoria_id': rng.choice(categorias),
+            'etiqueta_ids': FakeRecordset._union(rng.sample(etiquetas, rng.randint(1, 5))),
+        }
+        producto['imagen_ids'] = FakeRecordset(
+            {'id': next(next_id), 'es_principal': i == 0, 'descripcion': False,
+             'secuencia': (i + 1) * 10, 'estado_procesado': 'lista'}
+            for i in range(rng.randint(1, 10))
+        )
+        producto['comentario_ids'] = FakeRecordset(
+            {'id': next(next_id), 'texto': '¿Sigue disponible?', 'fecha': fecha(), 'active': True,
+             'usuario_id': rng.choice(partners), 'producto_id': FakeRecordset((producto,)),
+             'producto_nombre': producto['name']}
+            for _ in range(rng.randint(0, 20))
+        )
+        producto['total_comentarios'] = len(producto['comentario_ids'])
+        productos.append(producto)
+    productos = FakeRecordset(productos)
+
+    compras = []
+    for producto in list(productos)[:20]:
+        compra = {
+            'id': next(next_id), 'codigo': f'CMP{len(compras):05d}', 'fecha_compra': fecha(),
+            'precio_final': producto.precio, 'estado': 'completada', 'notas': False,
+            'producto_id': producto, 'comprador_id': rng.choice(partners),
+            'vendedor_id': producto.propietario_id,
+            'comprador_valoro': True, 'vendedor_valoro': True,
+        }
+        compra_rs = FakeRecordset((compra,))
+        valoracion = lambda de, a, tipo: FakeRecordset(({
+            'id': next(next_id), 'puntuacion': rng.randint(1, 5), 'comentario': 'Todo correcto',
+            'fecha': fecha(), 'tipo_valoracion': tipo, 'usuario_valorador_id': de,
+            'usuario_valorado_id': a, 'compra_id': compra_rs,
+        },))
+        compra['valoracion_comprador_ids'] = valoracion(compra['comprador_id'], compra['vendedor_id'], 'comprador_a_vendedor')
+        compra['valoracion_vendedor_ids'] = valoracion(compra['vendedor_id'], compra['comprador_id'], 'vendedor_a_comprador')
+        compras.append(compra)
+    compras = FakeRecordset(compras)
+
+    conversaciones = []
+    for i, producto in enumerate(list(productos)[:20]):
+        a, b = producto.propietario_id, rng.choice(partners)
+        mensajes = []
+        for j in range(30):
+            emisor, receptor = (a, b) if j % 2 else (b, a)
+            tipo = 'offer' if j == 5 else 'text'
+            mensajes.append({
+                'id': next(next_id), 'texto': 'Hola, ¿cuándo podemos quedar?', 'fecha': fecha(),
+                'leido': j < 25, 'fecha_lectura': fecha() if j < 25 else False,
+                'emisor_id': emisor, 'receptor_id': receptor, 'producto_id': producto,
+                'producto_nombre': producto.name, 'hilo_id': f'hilo_{a.id}_{b.id}_{producto.id}',
+                'tipo_mensaje': tipo, 'precio_original': producto.precio,
+                'precio_ofertado': round(producto.precio * 0.8, 2),
+            })
+        conversaciones.append(FakeRecordset(mensajes))
+
+    return {'productos': productos, 'compras': compras, 'conversaciones': conversaciones}
+
+
+# ==================== CASOS ====================
+
+def build_cases(serializers, productos, compras, conversaciones):
+    """
+    Casos de benchmark: nombre -> (función, elementos serializados por llamada).
+
+    Los mismos casos sirven para los recordsets falsos y los reales.
+    """
+    pagina = productos[:20]
+    lote = productos[:100]
+    detalle = productos.sorted(key=lambda p: -len(p.comentario_ids))[:1]
+    compra = compras[:1]
+    conversacion = max(conversaciones, key=len) if conversaciones else None
+
+    cases = {
+        'serialize_productos (20)': (lambda: serializers.serialize_productos(pagina), len(pagina)),
+        'serialize_productos (100)': (lambda: serializers.serialize_productos(lote), len(lote)),
+        'serialize_productos fields=id,nombre,precio (100)': (
+            lambda: serializers.serialize_productos(lote, fields=['id', 'nombre', 'precio']), len(lote)),
+        'serialize_producto (detalle)': (
+            lambda: serializers.serialize_producto(detalle, include_comentarios=True, include_propietario_full=True), 1),
+    }
+    if compra:
+        cases['serialize_compra (con valoraciones)'] = (
+            lambda: serializers.serialize_compra(compra, include_valoraciones=True), 1)
+    if conversacion:
+        cases['serialize_conversacion'] = (
+            lambda: serializers.serialize_conversacion(conversacion), len(conversacion))
+    return cases
+
+
+# ==================== MEDICIÓN ====================
+
+def measure(func, items, repeat, before_call=None, query_count=None):
+    """
+    Mide un caso: tiempo medio por elemento, memoria y consultas SQL.
+
+    Args:
+        func: Función a medir
+        items (int): Elementos que serializa cada llamada
+        repeat (int): Repeticiones para el tiempo
+        before_call: Se llama antes de cada ejecución (p.ej. vaciar la caché del ORM)
+        query_count: Devuelve el contador de consultas del cursor (None = sin SQL)
+
+    Returns:
+        dict: {us_por_elemento, kb_pico, bloques, consultas}
+    """
+    items = max(items, 1)
+
+    # Memoria y consultas en una ejecución aparte (tracemalloc ralentiza)
+    if before_call:
+        before_call()
+    queries_before = query_count() if query_count else None
+    tracemalloc.start()
+    snapshot_before = tracemalloc.take_snapshot()
+    result = func()
+    snapshot_after = tracemalloc.take_snapshot()
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    queries = query_count() - queries_before if query_count else None
+    blocks = sum(stat.count_diff for stat in snapshot_after.compare_to(snapshot_before, 'filename'))
+    del result
+
+    elapsed = 0.0
+    for _ in range(repeat):
+        if before_call:
+            before_call()
+        start = time.perf_counter()
+        func()
+        elapsed += time.perf_counter() - start
+
+    return {
+        'us_por_elemento': round(elapsed / repeat / items * 1e6, 2),
+        'kb_pico': round(peak / 1024, 1),
+        'bloques': blocks,
+        'consultas': queries,
+    }
+
+
+def run_offline(repeat, seed):
+    serializers = load_serializers()
+    data = build_dataset(seed)
+    cases = build_cases(serializers, data['productos'], data['compras'], data['conversaciones'])
+    return {name: measure(func, items, repeat) for name, (func, items) in cases.items()}
+
+
+def run_odoo(repeat, config_path, dbname):
+    """Ejecuta los casos contra recordsets reales de la base de datos indicada."""
+    import odoo
+    from odoo.modules.registry import Registry
+
+    args = ['-d', dbname] + (['-c', config_path] if config_path else [])
+    odoo.tools.config.parse_config(args)
+    from odoo.addons.renaix_api.models.utils import serializers
+
+    with Registry(dbname).cursor() as cr:
+        env = odoo.api.Environment(cr, odoo.SUPERUSER_ID, {})
+        productos = env['renaix.producto'].search([('estado_venta', '=', 'disponible')], limit=100)
+        compras = env['renaix.compra'].search([], limit=20)
+        hilos = env['renaix.mensaje']._read_group(
+            [('hilo_id', '!=', False)], ['hilo_id'], ['__count'], order='__count desc', limit=20)
+        conversaciones = [
+            env['renaix.mensaje'].search([('hilo_id', '=', hilo_id)], order='fecha asc')
+            for hilo_id, _count in hilos
+        ]
+        cases = build_cases(serializers, productos, compras, conversaciones)
+        results = {
+            name: measure(func, items, repeat, before_call=env.invalidate_all,
+                          query_count=lambda: cr.sql_log_count)
+            for name, (func, items) in cases.items()
+        }
+        cr.rollback()
+    return results
+
+
+# ==================== LÍNEA BASE ====================
+
+def compare(results, baseline, tolerance):
+    """
+    Compara con una línea base.
+
+    El tiempo y la memoria pueden subir hasta la tolerancia (ruido de la
+    máquina); las consultas SQL no pueden subir en absoluto.
+
+    Returns:
+        list: Regresiones encontradas (texto)
+    """
+    regressions = []
+    for name, row in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for key in ('us_por_elemento', 'kb_pico', 'bloques'):
+            if base.get(key) and row[key] > base[key] * (1 + tolerance):
+                regressions.append(f'{name}: {key} {base[key]} -> {row[key]}')
+        if base.get('consultas') is not None and row['consultas'] is not None \
+                and row['consultas'] > base['consultas']:
+            regressions.append(f'{name}: consultas {base["consultas"]} -> {row["consultas"]}')
+    return regressions
+
+
+def print_table(results, baseline=None):
+    header = ('Caso', 'µs/elem', 'KB pico', 'bloques', 'SQL', 'base µs/elem')
+    print('%-52s %9s %9s %8s %5s %13s' % header)
+    print('-' * 101)
+    for name, r in results.items():
+        base = (baseline or {}).get(name, {})
+        print('%-52s %9.2f %9.1f %8d %5s %13s' % (
+            name, r['us_por_elemento'], r['kb_pico'], r['bloques'],
+            '-' if r['consultas'] is None else r['consultas'],
+            base.get('us_por_elemento', '-'),
+        ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de los serializers de la API')
+    parser.add_argument('--repeat', type=int, default=200, help='Repeticiones por caso')
+    parser.add_argument('--seed', type=int, default=42, help='Semilla de los datos falsos')
+    parser.add_argument('--odoo', action='store_true', help='Usar recordsets reales')
+    parser.add_argument('-c', '--config', default=None, help='Fichero de configuración de Odoo')
+    parser.add_argument('-d', '--database', default=None, help='Base de datos (con --odoo)')
+    parser.add_argument('--baseline', default=None, help='Comparar con esta línea base JSON')
+    parser.add_argument('--save-baseline', default=None, help='Guardar los resultados como línea base')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Empeoramiento admitido en tiempo y memoria (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    if args.odoo:
+        if not args.database:
+            parser.error('--odoo requiere -d/--database')
+        results = run_odoo(args.repeat, args.config, args.database)
+    else:
+        results = run_offline(args.repeat, args.seed)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['resultados']
+
+    print_table(results, baseline)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, 'w') as f:
+            json.dump({
+                'modo': 'odoo' if args.odoo else 'offline',
+                'python': sys.version.split()[0],
+                'repeat': args.repeat,
+                'resultados': results,
+            }, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        print(f'\nLínea base guardada en {args.save_baseline}')
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print('\nRegresiones respecto a la línea base:')
+            for line in regressions:
+                print(f'  - {line}')
+            sys.exit(1)
+        print('\nSin regresiones respecto a la línea base')
+
+
+if __name__ == '__main__':
+    main()
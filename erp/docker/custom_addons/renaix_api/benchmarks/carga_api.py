@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga de la API /api/v1 con recorridos de usuario ponderados.
+
+Cada usuario virtual (un hilo con su propia conexión keep-alive) inicia
+sesión con un usuario generado por benchmarks/generar_datos.py y repite
+recorridos elegidos al azar según su peso:
+
+- explorar: listado de productos, detalle de 1-3 productos y sus imágenes
+- buscar:   búsqueda por texto y detalle de un resultado
+- chat:     conversaciones, envío de un mensaje y consulta de no leídos
+- oferta:   oferta por un producto y aceptación por el vendedor
+- sesion:   refresco del token y perfil
+
+Al terminar muestra, por ruta, p50/p95/p99 de latencia, peticiones por
+segundo y tasa de error, y las compara con los presupuestos de
+benchmarks/presupuestos_carga.json: termina con código 1 si se supera
+alguno. Solo usa la librería estándar.
+
+Antes de lanzarla:
+- Odoo arrancado (docker compose up, o odoo-bin) con una única base de
+  datos visible (--db-filter) y datos de generar_datos.py.
+- RATE_LIMIT_ENABLED = False en config/settings.py (si no, la mayoría de
+  peticiones acabarán en 429 y contarán como error).
+
+Uso:
+    python benchmarks/carga_api.py --url http://localhost:8069 --vus 20 --duracion 120
+    python benchmarks/carga_api.py --pesos explorar=60,buscar=30,chat=10 --json carga.json
+"""
+
+import argparse
+import gzip
+import http.client
+import json
+import os
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Peso relativo de cada recorrido
+PESOS = {
+    'explorar': 40,
+    'buscar': 20,
+    'chat': 20,
+    'oferta': 5,
+    'sesion': 15,
+}
+
+TERMINOS = ['iphone', 'bicicleta', 'sofá', 'chaqueta', 'playstation', 'mesa', 'zapatillas',
+            'cámara', 'portátil', 'patinete', 'guitarra', 'lámpara', 'tablet', 'reloj']
+ORDENES = ['fecha_desc', 'precio_asc', 'precio_desc']
+MENSAJES = ['Hola, ¿sigue disponible?', '¿Podemos quedar mañana?', '¿Me haces descuento?']
+
+
+class ErrorPeticion(Exception):
+
+    def __init__(self, message, status=0):
+        super().__init__(message)
+        self.status = status
+
+
+# ==================== ESTADÍSTICAS ====================
+
+class Estadisticas:
+    """Latencias y códigos por ruta (una instancia por hilo; se combinan al final)."""
+
+    def __init__(self):
+        self.latencias = {}
+        self.errores = {}
+        self.codigos = {}
+
+    def registrar(self, ruta, ms, status):
+        # Los 4xx de negocio (producto ya vendido, etc.) no cuentan como error
+        self.latencias.setdefault(ruta, []).append(ms)
+        codigos = self.codigos.setdefault(ruta, {})
+        codigos[status] = codigos.get(status, 0) + 1
+        if status == 0 or status >= 500 or status == 429:
+            self.errores[ruta] = self.errores.get(ruta, 0) + 1
+
+    def combinar(self, otra):
+        for ruta, valores in otra.latencias.items():
+            self.latencias.setdefault(ruta, []).extend(valores)
+        for ruta, total in otra.errores.items():
+            self.errores[ruta] = self.errores.get(ruta, 0) + total
+        for ruta, codigos in otra.codigos.items():
+            destino = self.codigos.setdefault(ruta, {})
+            for status, total in codigos.items():
+                destino[status] = destino.get(status, 0) + total
+
+
+def percentil(ordenados, p):
+    """Percentil por rango más cercano de una lista ya ordenada."""
+    if not ordenados:
+        return 0.0
+    indice = max(0, min(len(ordenados) - 1, int(round(p / 100 * len(ordenados) + 0.5)) - 1))
+    return ordenados[indice]
+
+
+def resumen(estadisticas, segundos):
+    filas = {}
+    for ruta, valores in sorted(estadisticas.latencias.items()):
+        ordenados = sorted(valores)
+        total = len(ordenados)
+        filas[ruta] = {
+            'peticiones': total,
+            'rps': round(total / segundos, 2),
+            'p50': round(percentil(ordenados, 50), 1),
+            'p95': round(percentil(ordenados, 95), 1),
+            'p99': round(percentil(ordenados, 99), 1),
+            'error_rate': round(estadisticas.errores.get(ruta, 0) / total, 4),
+            'codigos': {str(k): v for k, v in sorted(estadisticas.codigos[ruta].items())},
+        }
+    return filas
+
+
+# ==================== CLIENTE HTTP ====================
+
+class Cliente:
+    """Conexión keep-alive a la API que mide cada petición."""
+
+    def __init__(self, url, estadisticas, timeout, medir):
+        partes = urlsplit(url)
+        self.https = partes.scheme == 'https'
+        self.host = partes.hostname
+        self.port = partes.port or (443 if self.https else 80)
+        self.timeout = timeout
+        self.estadisticas = estadisticas
+        self.medir = medir
+        self.conexion = None
+
+    def _conectar(self):
+        clase = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        self.conexion = clase(self.host, self.port, timeout=self.timeout)
+
+    def peticion(self, metodo, path, ruta, body=None, token=None, json_response=True):
+        """
+        Lanza una petición y registra su latencia bajo `ruta` (plantilla sin ids).
+
+        Returns:
+            tuple: (status, JSON o bytes)
+
+        Raises:
+            ErrorPeticion: Si la petición falla o devuelve un error
+        """
+        headers = {'Accept-Encoding': 'gzip'}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+
+        inicio = time.perf_counter()
+        status = 0
+        try:
+            if self.conexion is None:
+                self._conectar()
+            self.conexion.request(metodo, path, body=data, headers=headers)
+            respuesta = self.conexion.getresponse()
+            contenido = respuesta.read()
+            status = respuesta.status
+            if respuesta.getheader('Content-Encoding') == 'gzip':
+                contenido = gzip.decompress(contenido)
+        except (OSError, http.client.HTTPException) as e:
+            self.conexion = None
+            raise ErrorPeticion(f'{ruta}: {e}')
+        finally:
+            if self.medir():
+                self.estadisticas.registrar(ruta, (time.perf_counter() - inicio) * 1000, status)
+
+        if status >= 400:
+            raise ErrorPeticion(f'{ruta}: HTTP {status}', status)
+        if json_response and contenido:
+            return status, json.loads(contenido)
+        return status, contenido
+
+
+# ==================== USUARIO VIRTUAL ====================
+
+class Sesiones:
+    """Tokens de los usuarios ya autenticados (compartidos entre hilos)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tokens = {}
+
+    def get(self, email):
+        with self.lock:
+            return self.tokens.get(email)
+
+    def set(self, email, tokens):
+        with self.lock:
+            self.tokens[email] = tokens
+
+
+class UsuarioVirtual(threading.Thread):
+
+    def __init__(self, numero, args, sesiones, fin, medir):
+        super().__init__(daemon=True)
+        self.args = args
+        self.rng = random.Random(args.seed * 1000 + numero)
+        self.estadisticas = Estadisticas()
+        self.cliente = Cliente(args.url, self.estadisticas, args.timeout, medir)
+        self.sesiones = sesiones
+        self.fin = fin
+        self.email = args.email.format(seed=args.seed, n=self.rng.randrange(args.num_usuarios))
+        self.tokens = None
+        self.partner_id = None
+        self.recorridos = [nombre for nombre, peso in args.pesos.items() for _ in range(peso)]
+
+    # -------------------- sesión --------------------
+
+    def login(self, email):
+        _status, respuesta = self.cliente.peticion(
+            'POST', '/api/v1/auth/login', 'POST /auth/login',
+            body={'email': email, 'password': self.args.password},
+        )
+        data = respuesta['data']
+        self.sesiones.set(email, data)
+        return data
+
+    def token_de(self, email):
+        return (self.sesiones.get(email) or self.login(email))['access_token']
+
+    def get(self, path, ruta, params=None, token=None, json_response=True):
+        if params:
+            path = f'{path}?{urlencode(params)}'
+        return self.cliente.peticion('GET', path, ruta, token=token, json_response=json_response)[1]
+
+    def post(self, path, ruta, body, token):
+        return self.cliente.peticion('POST', path, ruta, body=body, token=token)[1]
+
+    # -------------------- recorridos --------------------
+
+    def _detalle(self, producto_id):
+        detalle = self.get(f'/api/v1/productos/{producto_id}', 'GET /productos/<id>')['data']
+        for imagen in (detalle.get('imagenes') or [])[:self.rng.randint(1, 3)]:
+            variante = self.rng.choice([None, 'small', 'webp'])
+            self.get(f'/api/v1/imagenes/{imagen["id"]}', 'GET /imagenes/<id>',
+                     params={'variante': variante} if variante else None, json_response=False)
+        return detalle
+
+    def explorar(self):
+        pagina = 1 + min(int(self.rng.expovariate(0.5)), 50)
+        productos = self.get('/api/v1/productos', 'GET /productos',
+                             params={'page': pagina, 'limit': 20})['data']
+        for producto in self.rng.sample(productos, min(len(productos), self.rng.randint(1, 3))):
+            self._detalle(producto['id'])
+
+    def buscar(self):
+        params = {'query': self.rng.choice(TERMINOS), 'orden': self.rng.choice(ORDENES), 'limit': 20}
+        productos = self.get('/api/v1/productos/buscar', 'GET /productos/buscar', params=params)['data']
+        if productos:
+            self._detalle(self.rng.choice(productos)['id'])
+
+    def chat(self):
+        token = self.tokens['access_token']
+        conversaciones = self.get('/api/v1/mensajes/conversaciones', 'GET /mensajes/conversaciones',
+                                  token=token)['data'] or []
+        if conversaciones:
+            conversacion = self.rng.choice(conversaciones)
+            otros = [p for p in conversacion['participantes'] if p['id'] != self.partner_id]
+            producto = conversacion.get('producto') or {}
+            if otros:
+                self.post('/api/v1/mensajes', 'POST /mensajes', {
+                    'receptor_id': otros[0]['id'],
+                    'texto': self.rng.choice(MENSAJES),
+                    'producto_id': producto.get('id'),
+                }, token)
+        self.get('/api/v1/mensajes/no-leidos', 'GET /mensajes/no-leidos', token=token)
+
+    def oferta(self):
+        productos = self.get('/api/v1/productos', 'GET /productos',
+                             params={'page': self.rng.randint(1, 20), 'limit': 20})['data']
+        candidatos = [p for p in productos if (p.get('propietario') or {}).get('id') != self.partner_id]
+        if not candidatos:
+            return
+        producto = self.rng.choice(candidatos)
+        oferta = self.post('/api/v1/mensajes/oferta', 'POST /mensajes/oferta', {
+            'producto_id': producto['id'],
+            'precio_ofertado': round(producto['precio'] * self.rng.uniform(0.7, 0.95), 2),
+        }, self.tokens['access_token'])['data']
+        # Algunos vendedores aceptan en el momento
+        vendedor = producto.get('propietario') or {}
+        if vendedor.get('email') and self.rng.random() < 0.3:
+            self.post(f'/api/v1/mensajes/oferta/{oferta["id"]}/aceptar',
+                      'POST /mensajes/oferta/<id>/aceptar', {}, self.token_de(vendedor['email']))
+
+    def sesion(self):
+        data = self.post('/api/v1/auth/refresh', 'POST /auth/refresh',
+                         {'refresh_token': self.tokens['refresh_token']}, None)['data']
+        self.tokens['access_token'] = data['access_token']
+        self.get('/api/v1/usuarios/perfil', 'GET /usuarios/perfil', token=self.tokens['access_token'])
+
+    def run(self):
+        while not self.fin.is_set():
+            try:
+                if self.tokens is None:
+                    self.tokens = dict(self.login(self.email))
+                    self.partner_id = (self.tokens.get('user') or {}).get('id')
+                getattr(self, self.rng.choice(self.recorridos))()
+            except ErrorPeticion as e:
+                # Ya registrada; tras un 401 se vuelve a iniciar sesión
+                if e.status == 401:
+                    self.tokens = None
+                time.sleep(0.05)
+            except (KeyError, TypeError, ValueError):
+                self.tokens = None
+            if self.args.pausa:
+                time.sleep(self.rng.expovariate(1 / self.args.pausa))
+
+
+# ==================== PRESUPUESTOS ====================
+
+def comprobar_presupuestos(filas, presupuestos):
+    """
+    Returns:
+        list: Presupuestos superados (texto)
+    """
+    fallos = []
+    defecto = presupuestos.get('_defecto', {})
+    for ruta, fila in filas.items():
+        presupuesto = dict(defecto, **presupuestos.get(ruta, {}))
+        for clave in ('p50', 'p95', 'p99', 'error_rate'):
+            limite = presupuesto.get(clave)
+            if limite is not None and fila[clave] > limite:
+                fallos.append(f'{ruta}: {clave} {fila[clave]} > {limite}')
+    return fallos
+
+
+def imprimir(filas, total_segundos, presupuestos):
+    print('%-38s %8s %7s %8s %8s %8s %7s %s' % (
+        'Ruta', 'n', 'rps', 'p50 ms', 'p95 ms', 'p99 ms', 'error', 'presupuesto p95/p99'))
+    print('-' * 112)
+    for ruta, f in filas.items():
+        p = dict(presupuestos.get('_defecto', {}), **presupuestos.get(ruta, {}))
+        print('%-38s %8d %7.1f %8.1f %8.1f %8.1f %6.2f%% %s' % (
+            ruta, f['peticiones'], f['rps'], f['p50'], f['p95'], f['p99'], f['error_rate'] * 100,
+            f'{p.get("p95", "-")}/{p.get("p99", "-")}'))
+    total = sum(f['peticiones'] for f in filas.values())
+    print(f'\nTotal: {total} peticiones en {total_segundos:.0f}s ({total / total_segundos:.1f} req/s)')
+
+
+def parse_pesos(texto):
+    pesos = dict(PESOS)
+    if texto:
+        pesos = {nombre: 0 for nombre in PESOS}
+        for parte in texto.split(','):
+            nombre, _, peso = parte.partition('=')
+            if nombre.strip() not in PESOS:
+                raise argparse.ArgumentTypeError(f'Recorrido desconocido: {nombre}')
+            pesos[nombre.strip()] = int(peso)
+    return {nombre: peso for nombre, peso in pesos.items() if peso > 0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prueba de carga de la API de Renaix')
+    parser.add_argument('--url', default='http://localhost:8069', help='URL de Odoo')
+    parser.add_argument('--vus', type=int, default=20, help='Usuarios virtuales concurrentes')
+    parser.add_argument('--duracion', type=float, default=60, help='Segundos de medición')
+    parser.add_argument('--calentamiento', type=float, default=10, help='Segundos iniciales sin medir')
+    parser.add_argument('--pausa', type=float, default=0.0, help='Pausa media entre recorridos (s)')
+    parser.add_argument('--timeout', type=float, default=30, help='Timeout por petición (s)')
+    parser.add_argument('--pesos', type=parse_pesos, default=dict(PESOS),
+                        help='Pesos de los recorridos (ej: explorar=60,buscar=30,chat=10)')
+    parser.add_argument('--seed', type=int, default=42, help='Semilla usada en generar_datos.py')
+    parser.add_argument('--num-usuarios', type=int, default=1000,
+                        help='Usuarios generados entre los que elegir')
+    parser.add_argument('--email', default='bench{seed}.{n}@example.com', help='Plantilla de email')
+    parser.add_argument('--password', default='Bench1234!', help='Contraseña de los usuarios')
+    parser.add_argument('--presupuestos', default=os.path.join(BASE_DIR, 'presupuestos_carga.json'),
+                        help='JSON con los presupuestos por ruta')
+    parser.add_argument('--json', dest='json_path', default=None, help='Guardar resultados en JSON')
+    args = parser.parse_args()
+
+    with open(args.presupuestos) as f:
+        presupuestos = json.load(f)
+
+    fin = threading.Event()
+    medicion = {'activa': False}
+    sesiones = Sesiones()
+    usuarios = [UsuarioVirtual(n, args, sesiones, fin, lambda: medicion['activa']) for n in range(args.vus)]
+
+    for usuario in usuarios:
+        usuario.start()
+        time.sleep(min(0.1, args.calentamiento / max(args.vus, 1)))
+
+    time.sleep(args.calentamiento)
+    medicion['activa'] = True
+    inicio = time.perf_counter()
+    time.sleep(args.duracion)
+    medicion['activa'] = False
+    segundos = time.perf_counter() - inicio
+    fin.set()
+    for usuario in usuarios:
+        usuario.join(timeout=args.timeout)
+
+    estadisticas = Estadisticas()
+    for usuario in usuarios:
+        estadisticas.combinar(usuario.estadisticas)
+    filas = resumen(estadisticas, segundos)
+
+    imprimir(filas, segundos, presupuestos)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'vus': args.vus, 'duracion': segundos, 'pesos': args.pesos, 'rutas': filas},
+                      f, indent=2, ensure_ascii=False)
+        print(f'Resultados guardados en {args.json_path}')
+
+    fallos = comprobar_presupuestos(filas, presupuestos)
+    if fallos:
+        print('\nPresupuestos superados:')
+        for fallo in fallos:
+            print(f'  - {fallo}')
+        sys.exit(1)
+    print('\nTodas las rutas dentro de presupuesto')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Informe de consultas lentas por ruta de la API (pg_stat_statements).
+
+Cruza pg_stat_statements con la tabla renaix_api_sql_route, donde la API
+anota por muestreo qué sentencias ejecuta cada ruta (ver
+models/utils/sql_tagging.py). Las dos fuentes se relacionan por el texto
+normalizado de la sentencia. Para cada ruta muestra sus sentencias más
+costosas con las estadísticas de PostgreSQL (llamadas, media, máximo,
+aciertos de caché) y el plan de ejecución. Al final añade las sentencias
+sobre tablas renaix_* que no vienen de la API (backend, crons) y los
+candidatos a índice.
+
+- El plan es el genérico: la sentencia se prepara con
+  plan_cache_mode = force_generic_plan y se ejecuta EXPLAIN sin ANALYZE
+  (no se ejecuta nada). Todo se hace en una transacción que se deshace.
+- Candidatos a índice: Seq Scan con filtro sobre tablas renaix_* de más de
+  --min-filas filas, cuando ningún índice empieza por las columnas del
+  filtro.
+
+Requiere la extensión pg_stat_statements (docker-compose.yml la carga en
+shared_preload_libraries; el script la crea en la base de datos si falta).
+
+Uso (dentro del contenedor de Odoo):
+    python benchmarks/consultas_lentas.py -c /etc/odoo/odoo.conf -d renaix
+    python benchmarks/consultas_lentas.py -c /etc/odoo/odoo.conf -d renaix --ruta productos --json informe.json
+    python benchmarks/consultas_lentas.py -c /etc/odoo/odoo.conf -d renaix --reset
+"""
+
+import argparse
+import json
+import re
+import sys
+
+# Sentencias que tiene sentido pasar por EXPLAIN
+EXPLICABLES = ('select', 'with', 'update', 'delete', 'insert')
+
+# Nodos del plan que leen una tabla entera
+NODOS_SECUENCIALES = ('Seq Scan', 'Parallel Seq Scan')
+
+_PARAMETRO = re.compile(r'\$(\d+)')
+_IDENTIFICADOR = re.compile(r'"?([a-z_][a-z0-9_]*)"?')
+
+
+# ==================== FUENTES ====================
+
+def asegurar_extension(cr):
+    """
+    Returns:
+        bool: True si pg_stat_statements está disponible
+    """
+    cr.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'")
+    if not cr.fetchone():
+        try:
+            cr.execute('CREATE EXTENSION IF NOT EXISTS pg_stat_statements')
+        except Exception as e:
+            print(f'No se puede crear pg_stat_statements: {e}', file=sys.stderr)
+            cr.rollback()
+            return False
+    try:
+        cr.execute('SELECT 1 FROM pg_stat_statements LIMIT 1')
+    except Exception as e:
+        print(f'pg_stat_statements no está cargado (shared_preload_libraries): {e}', file=sys.stderr)
+        cr.rollback()
+        return False
+    return True
+
+
+def leer_pg_stat_statements(cr, normalize_sql):
+    """
+    Sentencias de la base de datos actual que tocan tablas renaix_*.
+
+    Returns:
+        dict: {sentencia_normalizada: estadísticas}
+    """
+    cr.execute("""
+        SELECT s.queryid, s.query, s.calls, s.total_exec_time, s.mean_exec_time,
+               s.max_exec_time, s.rows, s.shared_blks_hit, s.shared_blks_read
+        FROM pg_stat_statements s
+        JOIN pg_database d ON d.oid = s.dbid
+        WHERE d.datname = current_database() AND s.query ~* 'renaix_'
+    """)
+    resultado = {}
+    for queryid, query, calls, total, mean, maximo, rows, hit, read in cr.fetchall():
+        clave = normalize_sql(query)
+        actual = resultado.get(clave)
+        if actual and actual['total_ms'] >= total:
+            continue
+        resultado[clave] = {
+            'queryid': queryid,
+            'query': query,
+            'calls': calls,
+            'total_ms': round(total, 2),
+            'mean_ms': round(mean, 3),
+            'max_ms': round(maximo, 2),
+            'rows': rows,
+            'cache_hit': round(hit / (hit + read), 4) if hit + read else None,
+        }
+    return resultado
+
+
+def leer_rutas(cr, table):
+    """
+    Returns:
+        list: [(ruta, sentencia, llamadas, total_ms, max_ms)] muestreadas por la API
+    """
+    cr.execute('SELECT to_regclass(%s)', [table])
+    if not cr.fetchone()[0]:
+        return []
+    cr.execute(f'SELECT route, statement, calls, total_ms, max_ms FROM {table}')
+    return cr.fetchall()
+
+
+# ==================== EXPLAIN ====================
+
+def explain(cr, query):
+    """
+    Plan genérico (sin ejecutar la sentencia) de un texto de pg_stat_statements.
+
+    Returns:
+        dict: Plan en JSON (nodo raíz) o {'error': ...}
+    """
+    if not query.lstrip().lower().startswith(EXPLICABLES):
+        return {'error': 'Sentencia no explicable'}
+    parametros = max((int(n) for n in _PARAMETRO.findall(query)), default=0)
+    cr.execute('SAVEPOINT renaix_explain')
+    try:
+        cr.execute("SET LOCAL plan_cache_mode = force_generic_plan")
+        cr.execute(f'PREPARE renaix_explain AS {query}')
+        argumentos = f"({', '.join(['NULL'] * parametros)})" if parametros else ''
+        cr.execute(f'EXPLAIN (FORMAT JSON) EXECUTE renaix_explain{argumentos}')
+        plan = cr.fetchone()[0][0]['Plan']
+    except Exception as e:
+        plan = {'error': str(e).strip().splitlines()[0]}
+    cr.execute('ROLLBACK TO SAVEPOINT renaix_explain')
+    cr.execute('DEALLOCATE ALL')
+    return plan
+
+
+def texto_plan(nodo, nivel=0):
+    """Plan en texto compacto (un nodo por línea)"""
+    if 'error' in nodo:
+        return f'  (sin plan: {nodo["error"]})'
+    linea = f'{"  " * (nivel + 1)}-> {nodo["Node Type"]}'
+    if nodo.get('Relation Name'):
+        linea += f' on {nodo["Relation Name"]}'
+    if nodo.get('Index Name'):
+        linea += f' using {nodo["Index Name"]}'
+    linea += f'  (cost={nodo["Total Cost"]:.0f} rows={nodo["Plan Rows"]})'
+    for clave in ('Index Cond', 'Filter', 'Sort Key'):
+        if nodo.get(clave):
+            linea += f'  {clave}: {nodo[clave]}'
+    lineas = [linea]
+    for hijo in nodo.get('Plans', []):
+        lineas.append(texto_plan(hijo, nivel + 1))
+    return '\n'.join(lineas)
+
+
+def nodos(plan):
+    yield plan
+    for hijo in plan.get('Plans', []):
+        yield from nodos(hijo)
+
+
+# ==================== ÍNDICES ====================
+
+def cargar_tablas(cr):
+    """
+    Returns:
+        dict: {tabla: {'filas', 'columnas', 'indices' (columnas de cada índice)}}
+    """
+    cr.execute("""
+        SELECT c.relname, c.reltuples::bigint
+        FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'public' AND c.relkind = 'r' AND c.relname LIKE 'renaix%'
+    """)
+    tablas = {nombre: {'filas': filas, 'columnas': set(), 'indices': []} for nombre, filas in cr.fetchall()}
+    cr.execute("""
+        SELECT table_name, column_name FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name LIKE 'renaix%'
+    """)
+    for tabla, columna in cr.fetchall():
+        if tabla in tablas:
+            tablas[tabla]['columnas'].add(columna)
+    cr.execute("""
+        SELECT t.relname, array_agg(a.attname ORDER BY k.pos)
+        FROM pg_index i
+        JOIN pg_class t ON t.oid = i.indrelid
+        CROSS JOIN LATERAL unnest(i.indkey) WITH ORDINALITY AS k(attnum, pos)
+        LEFT JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = k.attnum
+        WHERE t.relname LIKE 'renaix%'
+        GROUP BY i.indexrelid, t.relname
+    """)
+    for tabla, columnas in cr.fetchall():
+        if tabla in tablas:
+            tablas[tabla]['indices'].append([c for c in columnas if c])
+    return tablas
+
+
+def candidatos_indice(plan, tablas, min_filas):
+    """
+    Seq Scan con filtro sobre tablas grandes sin un índice que empiece por
+    alguna de las columnas filtradas.
+
+    Returns:
+        list: [{'tabla', 'columnas', 'filtro', 'sql'}]
+    """
+    candidatos = []
+    for nodo in nodos(plan):
+        tabla = nodo.get('Relation Name')
+        if nodo.get('Node Type') not in NODOS_SECUENCIALES or not nodo.get('Filter') or tabla not in tablas:
+            continue
+        info = tablas[tabla]
+        if info['filas'] < min_filas:
+            continue
+        columnas = []
+        for nombre in _IDENTIFICADOR.findall(nodo['Filter']):
+            if nombre in info['columnas'] and nombre not in columnas:
+                columnas.append(nombre)
+        if not columnas:
+            continue
+        primeras = {indice[0] for indice in info['indices'] if indice}
+        if primeras & set(columnas):
+            continue
+        candidatos.append({
+            'tabla': tabla,
+            'columnas': columnas,
+            'filtro': nodo['Filter'],
+            'sql': f'CREATE INDEX CONCURRENTLY ON {tabla} ({", ".join(columnas)})',
+        })
+    return candidatos
+
+
+# ==================== INFORME ====================
+
+def construir_informe(cr, normalize_sql, table, args):
+    estadisticas = leer_pg_stat_statements(cr, normalize_sql)
+    tablas = cargar_tablas(cr)
+    planes = {}
+
+    def analizar(clave):
+        if clave not in planes:
+            plan = explain(cr, estadisticas[clave]['query']) if not args.sin_explain else {'error': 'omitido'}
+            planes[clave] = (plan, candidatos_indice(plan, tablas, args.min_filas) if 'error' not in plan else [])
+        return planes[clave]
+
+    rutas = {}
+    atribuidas = set()
+    for ruta, sentencia, llamadas, total_ms, max_ms in leer_rutas(cr, table):
+        if args.ruta and args.ruta not in ruta:
+            continue
+        rutas.setdefault(ruta, []).append({
+            'sentencia': sentencia,
+            'llamadas_muestra': llamadas,
+            'total_ms_muestra': round(total_ms, 2),
+            'max_ms_muestra': round(max_ms, 2),
+            'pg': estadisticas.get(sentencia),
+        })
+        atribuidas.add(sentencia)
+
+    informe = {'rutas': {}, 'sin_ruta': [], 'candidatos': {}}
+    for ruta, sentencias in sorted(rutas.items()):
+        sentencias.sort(key=lambda s: -s['total_ms_muestra'])
+        for sentencia in sentencias[:args.limite]:
+            if sentencia['pg']:
+                plan, candidatos = analizar(sentencia['sentencia'])
+                sentencia['plan'] = plan
+                sentencia['candidatos'] = candidatos
+        informe['rutas'][ruta] = sentencias[:args.limite]
+
+    if not args.ruta:
+        restantes = sorted(
+            (clave for clave in estadisticas if clave not in atribuidas),
+            key=lambda clave: -estadisticas[clave]['total_ms'],
+        )
+        for clave in restantes[:args.limite]:
+            plan, candidatos = analizar(clave)
+            informe['sin_ruta'].append({'sentencia': clave, 'pg': estadisticas[clave],
+                                        'plan': plan, 'candidatos': candidatos})
+
+    for _plan, candidatos in planes.values():
+        for candidato in candidatos:
+            informe['candidatos'][candidato['sql']] = candidato
+    informe['candidatos'] = list(informe['candidatos'].values())
+    return informe
+
+
+def _imprimir_sentencia(sentencia):
+    pg = sentencia.get('pg')
+    if pg:
+        hit = f'{pg["cache_hit"] * 100:.0f}%' if pg['cache_hit'] is not None else '-'
+        print(f'  {pg["calls"]:>8} llamadas  media {pg["mean_ms"]:.2f} ms  máx {pg["max_ms"]:.1f} ms  '
+              f'total {pg["total_ms"]:.0f} ms  caché {hit}')
+    else:
+        print('  (sin estadísticas en pg_stat_statements)')
+    print(f'  {sentencia["sentencia"][:300]}')
+    if sentencia.get('plan'):
+        print(texto_plan(sentencia['plan']))
+    for candidato in sentencia.get('candidatos', []):
+        print(f'  ! índice candidato: {candidato["sql"]}')
+    print()
+
+
+def imprimir(informe):
+    for ruta, sentencias in informe['rutas'].items():
+        print('=' * 100)
+        print(ruta)
+        print('=' * 100)
+        for sentencia in sentencias:
+            print(f'  muestra: {sentencia["llamadas_muestra"]} llamadas, {sentencia["total_ms_muestra"]:.1f} ms, '
+                  f'máx {sentencia["max_ms_muestra"]:.1f} ms')
+            _imprimir_sentencia(sentencia)
+
+    if informe['sin_ruta']:
+        print('=' * 100)
+        print('Sin ruta de la API (backend, crons...)')
+        print('=' * 100)
+        for sentencia in informe['sin_ruta']:
+            _imprimir_sentencia(sentencia)
+
+    print('=' * 100)
+    print('Índices candidatos')
+    print('=' * 100)
+    for candidato in informe['candidatos'] or [{'sql': '(ninguno)', 'filtro': ''}]:
+        print(f'  {candidato["sql"]}')
+        if candidato['filtro']:
+            print(f'      filtro: {candidato["filtro"]}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Consultas lentas por ruta de la API de Renaix')
+    parser.add_argument('-c', '--config', default=None, help='Fichero de configuración de Odoo')
+    parser.add_argument('-d', '--database', required=True, help='Base de datos')
+    parser.add_argument('--ruta', default=None, help='Solo las rutas que contengan este texto')
+    parser.add_argument('--limite', type=int, default=5, help='Sentencias por ruta')
+    parser.add_argument('--min-filas', type=int, default=10000,
+                        help='Filas mínimas de la tabla para proponer un índice')
+    parser.add_argument('--sin-explain', action='store_true', help='No calcular los planes')
+    parser.add_argument('--json', dest='json_path', default=None, help='Guardar el informe en JSON')
+    parser.add_argument('--reset', action='store_true',
+                        help='Vaciar pg_stat_statements y las sentencias por ruta, y salir')
+    args = parser.parse_args()
+
+    import odoo
+    from odoo.modules.registry import Registry
+
+    odoo.tools.config.parse_config(['-d', args.database] + (['-c', args.config] if args.config else []))
+    from odoo.addons.renaix_api.models.utils import sql_tagging
+    from odoo.addons.renaix_api.models.utils.sql_normalize import normalize_sql
+
+    with Registry(args.database).cursor() as cr:
+        if not asegurar_extension(cr):
+            sys.exit(2)
+        cr.commit()
+
+        if args.reset:
+            cr.execute('SELECT pg_stat_statements_reset()')
+            cr.execute('SELECT to_regclass(%s)', [sql_tagging.TABLE_NAME])
+            if cr.fetchone()[0]:
+                cr.execute(f'TRUNCATE {sql_tagging.TABLE_NAME}')
+            cr.commit()
+            print('Estadísticas vaciadas')
+            return
+
+        informe = construir_informe(cr, normalize_sql, sql_tagging.TABLE_NAME, args)
+        cr.rollback()
+
+    imprimir(informe)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False, default=str)
+        print(f'\nInforme guardado en {args.json_path}')
+
+
+if __name__ == '__main__':
+    main()
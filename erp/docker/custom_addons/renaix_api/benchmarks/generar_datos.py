@@ -0,0 +1,558 @@
+#!/usr/bin/env python3
+"""
+Generador de datos sintéticos del marketplace a gran escala.
+
+Crea usuarios, productos con etiquetas, imágenes y comentarios, compras con
+valoraciones e hilos de mensajes con distribuciones sesgadas (pocos usuarios
+publican y compran mucho, pocos productos concentran casi todos los
+comentarios y conversaciones), como en un marketplace real. Es el conjunto
+de datos de referencia para los benchmarks y para ajustar índices.
+
+- Reproducible: los mismos argumentos y --seed generan los mismos datos.
+- Los usuarios se crean con el ORM (model_create_multi) porque res.partner
+  tiene demasiada lógica para saltársela; el resto de tablas se cargan con
+  COPY reservando antes los ids de sus secuencias, y al final se recalculan
+  los campos almacenados (contadores, valoraciones) con el ORM.
+- Las imágenes no se suben una a una: se escriben unas pocas imágenes
+  plantilla en el filestore y cada imagen de producto es un adjunto que
+  apunta a una de ellas (el filestore deduplica por SHA-1 igualmente).
+
+Todos los usuarios generados comparten la contraseña --password, para poder
+usarlos en las pruebas de carga (benchmarks/carga_api.py).
+
+Uso (dentro del contenedor de Odoo, con la base de datos ya creada y los
+módulos renaix y renaix_api instalados):
+    python benchmarks/generar_datos.py -c /etc/odoo/odoo.conf -d renaix \\
+        --usuarios 20000 --productos 500000 --seed 1
+"""
+
+import argparse
+import bisect
+import datetime
+import io
+import itertools
+import logging
+import random
+import time
+
+_logger = logging.getLogger('renaix.generar_datos')
+
+# Filas por COPY y productos por transacción
+COPY_BATCH = 50000
+CHUNK_PRODUCTOS = 20000
+BATCH_USUARIOS = 2000
+
+ODOO_UID = 1
+
+NOMBRES = ['Ana', 'Luis', 'Marta', 'Jordi', 'Laura', 'Pablo', 'Núria', 'Sergio', 'Lucía', 'Carlos',
+           'Elena', 'Javier', 'Paula', 'Álex', 'Irene', 'Marc', 'Sara', 'David', 'Clara', 'Hugo']
+APELLIDOS = ['García', 'Martínez', 'López', 'Sánchez', 'Pérez', 'Gómez', 'Ferrer', 'Puig', 'Vidal',
+             'Romero', 'Navarro', 'Torres', 'Ruiz', 'Serra', 'Molina', 'Castro', 'Ortega', 'Soler']
+CIUDADES = ['Valencia', 'Madrid', 'Barcelona', 'Sevilla', 'Alicante', 'Castellón', 'Bilbao',
+            'Zaragoza', 'Málaga', 'Murcia', 'Palma', 'Granada', 'Gandia', 'Elche', 'Sagunto']
+ARTICULOS = ['iPhone 12', 'Bicicleta de montaña', 'Sofá de tres plazas', 'Chaqueta de cuero',
+             'PlayStation 5', 'Mesa de escritorio', 'Zapatillas de running', 'Cámara réflex',
+             'Portátil', 'Patinete eléctrico', 'Guitarra acústica', 'Lámpara de pie', 'Silla gaming',
+             'Tablet', 'Reloj inteligente', 'Cafetera', 'Colección de cómics', 'Tienda de campaña',
+             'Monitor 27 pulgadas', 'Carrito de bebé', 'Auriculares inalámbricos', 'Estantería']
+ADJETIVOS = ['como nuevo', 'poco uso', 'con caja', 'impecable', 'con garantía', 'negociable',
+             'urgente', 'edición limitada', 'perfecto estado', 'con accesorios']
+ETIQUETAS = ['vintage', 'urgente', 'negociable', 'envio', 'regalo', 'coleccion', 'gaming', 'apple',
+             'samsung', 'ikea', 'retro', 'deporte', 'bebe', 'invierno', 'verano', 'madera', 'cuero',
+             'electrico', 'bluetooth', 'original', 'precintado', 'garantia', 'oferta', 'lote',
+             'segunda-mano', 'reacondicionado', 'hecho-a-mano', 'ecologico', 'premium', 'barato']
+COMENTARIOS = ['¿Sigue disponible?', '¿Aceptarías una oferta?', '¿Haces envíos?',
+               '¿Tiene algún defecto?', '¿Dónde se puede recoger?', 'Me interesa, te escribo.',
+               '¿Incluye factura?', '¿Cuánto tiempo de uso tiene?']
+MENSAJES = ['Hola, ¿sigue disponible?', 'Sí, aún lo tengo.', '¿Podemos quedar esta tarde?',
+            'Perfecto, ¿dónde te viene bien?', 'Te lo dejo un poco más barato.', 'Trato hecho.',
+            '¿Me mandas más fotos?', 'Ahora te las envío.', 'Gracias!']
+ESTADOS_PRODUCTO = ['nuevo', 'como_nuevo', 'buen_estado', 'aceptable', 'para_reparar']
+PESOS_PUNTUACION = [2, 3, 8, 25, 62]
+
+
+# ==================== UTILIDADES ====================
+
+class Pesos:
+    """
+    Elección ponderada en O(log n) con pesos de ley de potencias.
+
+    El elemento de rango r (empezando en 1) tiene peso 1 / r**exponente.
+    """
+
+    def __init__(self, elementos, exponente, rng):
+        self.elementos = list(elementos)
+        rng.shuffle(self.elementos)
+        self.acumulados = list(itertools.accumulate(
+            1.0 / (rango ** exponente) for rango in range(1, len(self.elementos) + 1)
+        ))
+        self.rng = rng
+
+    def elegir(self):
+        x = self.rng.random() * self.acumulados[-1]
+        return self.elementos[bisect.bisect_right(self.acumulados, x)]
+
+
+def pareto(rng, media, maximo, alpha=2.0):
+    """Entero >= 0 con cola larga y media aproximada `media`."""
+    return min(maximo, round(media * (alpha - 1) * (rng.paretovariate(alpha) - 1)))
+
+
+def _copy_value(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, datetime.datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, str):
+        return value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+    return str(value)
+
+
+def copy_rows(cr, table, columns, rows):
+    """
+    Carga filas con COPY ... FROM STDIN, en bloques de COPY_BATCH.
+
+    Args:
+        cr: Cursor de Odoo
+        table (str): Tabla
+        columns (list): Columnas
+        rows (iterable): Tuplas en el orden de columns
+
+    Returns:
+        int: Filas cargadas
+    """
+    total = 0
+    sql = f'COPY "{table}" ({", ".join(columns)}) FROM STDIN'
+    rows = iter(rows)
+    while True:
+        bloque = list(itertools.islice(rows, COPY_BATCH))
+        if not bloque:
+            return total
+        buffer = io.StringIO()
+        for row in bloque:
+            buffer.write('\t'.join(_copy_value(v) for v in row))
+            buffer.write('\n')
+        buffer.seek(0)
+        cr.copy_expert(sql, buffer)
+        total += len(bloque)
+
+
+def reservar_ids(cr, table, n):
+    """Reserva n ids de la secuencia de la tabla (para referenciarlos antes del COPY)."""
+    if not n:
+        return []
+    cr.execute('SELECT nextval(%s) FROM generate_series(1, %s)', [f'{table}_id_seq', n])
+    return [row[0] for row in cr.fetchall()]
+
+
+def meta(fecha):
+    """create_uid, create_date, write_uid, write_date"""
+    return (ODOO_UID, fecha, ODOO_UID, fecha)
+
+
+META_COLUMNS = ['create_uid', 'create_date', 'write_uid', 'write_date']
+
+
+# ==================== GENERADOR ====================
+
+class Generador:
+
+    def __init__(self, env, args):
+        self.env = env
+        self.cr = env.cr
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.ahora = datetime.datetime(2026, 6, 1, 12, 0)
+        self.inicio = self.ahora - datetime.timedelta(days=args.dias)
+        self.contexto = {
+            'tracking_disable': True,
+            'mail_create_nolog': True,
+            'mail_create_nosubscribe': True,
+            'mail_notrack': True,
+        }
+        self.conteo = {}
+
+    def fecha_entre(self, desde, hasta=None):
+        hasta = hasta or self.ahora
+        segundos = max(1, int((hasta - desde).total_seconds()))
+        return desde + datetime.timedelta(seconds=self.rng.randrange(segundos))
+
+    def _contar(self, tabla, n):
+        self.conteo[tabla] = self.conteo.get(tabla, 0) + n
+
+    # -------------------- usuarios --------------------
+
+    def crear_usuarios(self):
+        from werkzeug.security import generate_password_hash
+
+        password_hash = generate_password_hash(self.args.password)
+        Partner = self.env['res.partner'].with_context(**self.contexto)
+        prefijo = f'bench{self.args.seed}'
+        self.usuarios = {}
+
+        for inicio in range(0, self.args.usuarios, BATCH_USUARIOS):
+            vals_list = []
+            for i in range(inicio, min(inicio + BATCH_USUARIOS, self.args.usuarios)):
+                nombre = f'{self.rng.choice(NOMBRES)} {self.rng.choice(APELLIDOS)}'
+                vals_list.append({
+                    'name': nombre,
+                    'email': f'{prefijo}.{i}@example.com',
+                    'phone': f'6{self.rng.randrange(10 ** 8):08d}',
+                    'es_usuario_app': True,
+                    'password_hash': password_hash,
+                    'fecha_registro_app': self.fecha_entre(self.inicio),
+                })
+            partners = Partner.create(vals_list)
+            for partner, vals in zip(partners, vals_list):
+                self.usuarios[partner.id] = (vals['name'], vals['email'], vals['phone'])
+            self.env.cr.commit()
+            self.env.invalidate_all()
+            _logger.info('Usuarios: %s/%s', len(self.usuarios), self.args.usuarios)
+
+        self._contar('res_partner', len(self.usuarios))
+        # Vendedores y compradores muy activos frente a una mayoría casi inactiva
+        self.vendedores = Pesos(self.usuarios, 1.1, self.rng)
+        self.compradores = Pesos(self.usuarios, 0.9, self.rng)
+
+    # -------------------- catálogo --------------------
+
+    def preparar_catalogo(self):
+        categorias = self.env['renaix.categoria'].search([])
+        if not categorias:
+            raise SystemExit('No hay categorías: instala renaix con sus datos antes de generar')
+        self.categorias = Pesos(categorias.ids, 0.8, self.rng)
+
+        nombres = list(ETIQUETAS) + [f'{a}-{b}' for a in ETIQUETAS[:15] for b in ETIQUETAS[15:]]
+        resueltas = self.env['renaix.etiqueta']._resolver_nombres(nombres)
+        self.etiquetas = Pesos(sorted(set(resueltas.values())), 1.2, self.rng)
+        self.currency_id = self.env.company.currency_id.id
+
+    def preparar_imagenes(self):
+        """Escribe las imágenes plantilla en el filestore (sin registros)."""
+        from PIL import Image, ImageDraw
+
+        Attachment = self.env['ir.attachment']
+        if Attachment._storage() != 'file':
+            raise SystemExit('El generador necesita ir_attachment.location = file')
+
+        self.plantillas = []
+        for _ in range(self.args.plantillas):
+            color = tuple(self.rng.randrange(40, 230) for _ in range(3))
+            img = Image.new('RGB', (800, 600), color)
+            draw = ImageDraw.Draw(img)
+            for _ in range(6):
+                x, y = self.rng.randrange(700), self.rng.randrange(500)
+                draw.ellipse((x, y, x + self.rng.randrange(40, 200), y + self.rng.randrange(40, 200)),
+                             fill=tuple(self.rng.randrange(256) for _ in range(3)))
+            variantes = {}
+            for campo, tamano in (('imagen', None), ('imagen_small', 256)):
+                copia = img.copy()
+                if tamano:
+                    copia.thumbnail((tamano, tamano))
+                buffer = io.BytesIO()
+                copia.save(buffer, format='JPEG', quality=85)
+                data = buffer.getvalue()
+                checksum = Attachment._compute_checksum(data)
+                variantes[campo] = (Attachment._file_write(data, checksum), len(data), checksum)
+            self.plantillas.append(variantes)
+
+    # -------------------- productos y relacionados --------------------
+
+    def crear_productos(self):
+        restantes = self.args.productos
+        self.productos_populares = []
+        while restantes > 0:
+            n = min(CHUNK_PRODUCTOS, restantes)
+            self._crear_chunk_productos(n)
+            restantes -= n
+            self.cr.commit()
+            _logger.info('Productos: %s/%s', self.args.productos - restantes, self.args.productos)
+
+    def _crear_chunk_productos(self, n):
+        rng = self.rng
+        ids = reservar_ids(self.cr, 'renaix_producto', n)
+        productos, rel_etiquetas, imagenes, comentarios = [], [], [], []
+        compras, valoraciones = [], []
+        compra_ids = iter(reservar_ids(self.cr, 'renaix_compra', int(n * self.args.ratio_compras * 1.2) + 100))
+
+        for producto_id in ids:
+            propietario = self.vendedores.elegir()
+            nombre_p, email_p, phone_p = self.usuarios[propietario]
+            publicado = self.fecha_entre(self.inicio)
+            precio = round(min(5000.0, rng.lognormvariate(3.8, 1.1)), 2)
+            nombre = f'{rng.choice(ARTICULOS)} {rng.choice(ADJETIVOS)}'
+
+            # Estado de venta: compra (vendido/reservado), archivado o disponible
+            compra_id = None
+            estado_venta = 'disponible'
+            active = True
+            if rng.random() < self.args.ratio_compras:
+                compra_id = next(compra_ids)
+                estado_compra = rng.choices(['completada', 'confirmada', 'pendiente', 'cancelada'],
+                                            [80, 6, 8, 6])[0]
+                estado_venta = {'completada': 'vendido', 'cancelada': 'disponible'}.get(estado_compra, 'reservado')
+                comprador = self.compradores.elegir()
+                if comprador == propietario:
+                    comprador = self.compradores.elegir()
+                nombre_c = self.usuarios[comprador][0]
+                fecha_compra = self.fecha_entre(publicado)
+                valoro_c = estado_compra == 'completada' and rng.random() < 0.8
+                valoro_v = estado_compra == 'completada' and rng.random() < 0.6
+                compras.append((
+                    compra_id, f'BENCH{self.args.seed}-{compra_id:09d}', producto_id, comprador, propietario,
+                    fecha_compra, precio, self.currency_id, estado_compra, nombre, nombre_c, nombre_p,
+                    valoro_c, valoro_v, *meta(fecha_compra),
+                ))
+                for valoro, tipo, de, a in ((valoro_c, 'comprador_a_vendedor', comprador, propietario),
+                                            (valoro_v, 'vendedor_a_comprador', propietario, comprador)):
+                    if valoro:
+                        fecha_val = self.fecha_entre(fecha_compra)
+                        valoraciones.append((
+                            compra_id, tipo, de, a, rng.choices(range(1, 6), PESOS_PUNTUACION)[0],
+                            'Todo perfecto' if rng.random() < 0.5 else None, fecha_val,
+                            comprador, propietario, producto_id, *meta(fecha_val),
+                        ))
+            elif rng.random() < 0.05:
+                active, estado_venta = False, 'eliminado'
+            elif rng.random() < 0.03:
+                estado_venta = 'borrador'
+
+            productos.append((
+                producto_id, nombre, f'{nombre}. ' * rng.randint(1, 6), precio,
+                rng.choices(['', '6 meses', '1 año', '2 años', '5 años'])[0] or None,
+                rng.choices(ESTADOS_PRODUCTO, [10, 25, 40, 20, 5])[0], estado_venta,
+                rng.choice(CIUDADES), publicado, publicado, active, propietario,
+                self.categorias.elegir(), compra_id, email_p, phone_p, self.currency_id,
+                0, 0, False, *meta(publicado),
+            ))
+
+            for etiqueta_id in {self.etiquetas.elegir() for _ in range(rng.randint(0, 5))}:
+                rel_etiquetas.append((producto_id, etiqueta_id))
+
+            n_imagenes = 1 + min(9, int(rng.expovariate(0.4)))
+            for secuencia in range(n_imagenes):
+                plantilla = rng.randrange(len(self.plantillas))
+                imagenes.append((producto_id, secuencia, plantilla, publicado))
+
+            for _ in range(pareto(rng, self.args.media_comentarios, 300)):
+                fecha = self.fecha_entre(publicado)
+                usuario = self.compradores.elegir()
+                comentarios.append((
+                    producto_id, usuario, rng.choice(COMENTARIOS), fecha, rng.random() > 0.02,
+                    nombre, self.usuarios[usuario][0], propietario, *meta(fecha),
+                ))
+
+            if active and estado_venta != 'borrador':
+                self.productos_populares.append((producto_id, propietario, nombre, precio, publicado))
+
+        copy_rows(self.cr, 'renaix_producto', [
+            'id', 'name', 'descripcion', 'precio', 'antiguedad', 'estado_producto', 'estado_venta',
+            'ubicacion', 'fecha_publicacion', 'fecha_actualizacion', 'active', 'propietario_id',
+            'categoria_id', 'compra_id', 'propietario_email', 'propietario_phone', 'currency_id',
+            'total_comentarios', 'total_denuncias', 'posible_duplicado', *META_COLUMNS,
+        ], productos)
+        copy_rows(self.cr, 'renaix_producto_etiqueta_rel', ['producto_id', 'etiqueta_id'], rel_etiquetas)
+        copy_rows(self.cr, 'renaix_compra', [
+            'id', 'codigo', 'producto_id', 'comprador_id', 'vendedor_id', 'fecha_compra', 'precio_final',
+            'currency_id', 'estado', 'producto_nombre', 'comprador_nombre', 'vendedor_nombre',
+            'comprador_valoro', 'vendedor_valoro', *META_COLUMNS,
+        ], compras)
+        copy_rows(self.cr, 'renaix_valoracion', [
+            'compra_id', 'tipo_valoracion', 'usuario_valorador_id', 'usuario_valorado_id', 'puntuacion',
+            'comentario', 'fecha', 'comprador_id', 'vendedor_id', 'producto_id', *META_COLUMNS,
+        ], valoraciones)
+        copy_rows(self.cr, 'renaix_comentario', [
+            'producto_id', 'usuario_id', 'texto', 'fecha', 'active', 'producto_nombre', 'usuario_nombre',
+            'propietario_producto_id', *META_COLUMNS,
+        ], comentarios)
+        self._copiar_imagenes(imagenes)
+
+        for tabla, filas in (('renaix_producto', productos), ('renaix_compra', compras),
+                             ('renaix_valoracion', valoraciones), ('renaix_comentario', comentarios),
+                             ('renaix_producto_etiqueta_rel', rel_etiquetas)):
+            self._contar(tabla, len(filas))
+
+    def _copiar_imagenes(self, imagenes):
+        """Filas de renaix_producto_imagen y sus adjuntos (apuntando a las plantillas)."""
+        ids = reservar_ids(self.cr, 'renaix_producto_imagen', len(imagenes))
+        filas, adjuntos = [], []
+        for imagen_id, (producto_id, secuencia, plantilla, fecha) in zip(ids, imagenes):
+            variantes = self.plantillas[plantilla]
+            store_fname, file_size, checksum = variantes['imagen']
+            filas.append((
+                imagen_id, producto_id, (secuencia + 1) * 10, secuencia == 0, 'lista', checksum,
+                f'{self.rng.getrandbits(64):016x}', file_size // 1024, *meta(fecha),
+            ))
+            for campo, (store_fname, file_size, checksum) in variantes.items():
+                adjuntos.append((
+                    campo, 'renaix.producto.imagen', campo, imagen_id, 'binary', store_fname,
+                    file_size, checksum, 'image/jpeg', False, *meta(fecha),
+                ))
+        copy_rows(self.cr, 'renaix_producto_imagen', [
+            'id', 'producto_id', 'secuencia', 'es_principal', 'estado_procesado', 'contenido_hash',
+            'phash', 'tamano_kb', *META_COLUMNS,
+        ], filas)
+        copy_rows(self.cr, 'ir_attachment', [
+            'name', 'res_model', 'res_field', 'res_id', 'type', 'store_fname', 'file_size', 'checksum',
+            'mimetype', 'public', *META_COLUMNS,
+        ], adjuntos)
+        self._contar('renaix_producto_imagen', len(filas))
+        self._contar('ir_attachment', len(adjuntos))
+
+    # -------------------- mensajes --------------------
+
+    def crear_mensajes(self):
+        rng = self.rng
+        if not self.productos_populares:
+            return
+        productos = Pesos(self.productos_populares, 1.0, rng)
+        hilos = int(len(self.productos_populares) * self.args.ratio_hilos)
+        filas = []
+        for n_hilo in range(hilos):
+            producto_id, vendedor, nombre_producto, precio, publicado = productos.elegir()
+            comprador = self.compradores.elegir()
+            if comprador == vendedor:
+                continue
+            a, b = sorted((comprador, vendedor))
+            hilo_id = f'hilo_{a}_{b}_{producto_id}'
+            fecha = self.fecha_entre(publicado)
+            n_mensajes = 1 + pareto(rng, self.args.media_mensajes, 400)
+            no_leidos = min(n_mensajes, int(rng.expovariate(0.7)))
+            oferta_en = rng.randrange(n_mensajes) if rng.random() < 0.3 else -1
+
+            for j in range(n_mensajes):
+                emisor, receptor = (comprador, vendedor) if j % 2 == 0 else (vendedor, comprador)
+                fecha = fecha + datetime.timedelta(minutes=int(rng.expovariate(1 / 90)) + 1)
+                leido = j < n_mensajes - no_leidos
+                tipo, texto, ofertado = 'text', rng.choice(MENSAJES), None
+                if j == oferta_en:
+                    tipo = 'offer'
+                    ofertado = round(precio * rng.uniform(0.6, 0.95), 2)
+                    texto = f'Te ofrezco {ofertado}€'
+                elif oferta_en >= 0 and j == oferta_en + 1:
+                    tipo = rng.choice(['offer_accepted', 'offer_rejected', 'counter_offer'])
+                filas.append((
+                    emisor, receptor, producto_id, hilo_id, texto, fecha, leido,
+                    fecha if leido else None, tipo, ofertado, precio if tipo != 'text' else None,
+                    self.usuarios[emisor][0], self.usuarios[receptor][0], nombre_producto, *meta(fecha),
+                ))
+
+            if len(filas) >= COPY_BATCH:
+                self._copiar_mensajes(filas)
+                filas = []
+                self.cr.commit()
+                _logger.info('Hilos: %s/%s', n_hilo + 1, hilos)
+        self._copiar_mensajes(filas)
+        self.cr.commit()
+
+    def _copiar_mensajes(self, filas):
+        copy_rows(self.cr, 'renaix_mensaje', [
+            'emisor_id', 'receptor_id', 'producto_id', 'hilo_id', 'texto', 'fecha', 'leido',
+            'fecha_lectura', 'tipo_mensaje', 'precio_ofertado', 'precio_original', 'emisor_nombre',
+            'receptor_nombre', 'producto_nombre', *META_COLUMNS,
+        ], filas)
+        self._contar('renaix_mensaje', len(filas))
+
+    # -------------------- agregados --------------------
+
+    def recalcular(self):
+        """Recalcula con el ORM los campos almacenados que dependen de lo cargado por COPY."""
+        env = self.env
+        env.invalidate_all()
+
+        self.cr.execute("""
+            UPDATE renaix_producto p SET total_comentarios = c.total
+            FROM (SELECT producto_id, count(*) AS total FROM renaix_comentario
+                  WHERE active GROUP BY producto_id) c
+            WHERE p.id = c.producto_id AND p.total_comentarios IS DISTINCT FROM c.total
+        """)
+
+        recalculos = [
+            ('renaix.categoria', ['producto_count', 'producto_disponible_count'], []),
+            ('renaix.etiqueta', ['producto_count', 'producto_disponible_count'], []),
+            ('res.partner', ['productos_en_venta', 'productos_vendidos', 'productos_comprados',
+                             'total_comentarios', 'total_denuncias_realizadas'],
+             [('id', 'in', list(self.usuarios))]),
+        ]
+        for model_name, fnames, domain in recalculos:
+            Model = env[model_name].with_context(active_test=False)
+            records = Model.search(domain)
+            for lote in range(0, len(records), 5000):
+                parte = records[lote:lote + 5000]
+                for fname in fnames:
+                    env.add_to_compute(Model._fields[fname], parte)
+                Model.flush_model(fnames)
+                env.invalidate_all()
+            self.cr.commit()
+
+        # Agregados de valoraciones de los partners (una consulta agrupada)
+        env['res.partner'].init()
+        self.cr.commit()
+
+        for tabla in ('renaix_producto', 'renaix_producto_imagen', 'renaix_producto_etiqueta_rel',
+                      'renaix_comentario', 'renaix_compra', 'renaix_valoracion', 'renaix_mensaje',
+                      'ir_attachment', 'res_partner'):
+            self.cr.execute(f'ANALYZE "{tabla}"')
+
+        # La API versiona las respuestas por modelo: COPY no pasa por el ORM
+        from odoo.addons.renaix_api.models.utils import model_version
+        for model_name in ('renaix.producto', 'renaix.producto.imagen', 'renaix.etiqueta',
+                           'renaix.categoria', 'renaix.comentario', 'renaix.compra',
+                           'renaix.valoracion', 'renaix.mensaje', 'res.partner'):
+            model_version.touch(self.cr, model_name)
+        self.cr.commit()
+
+    def generar(self):
+        fases = [
+            ('usuarios', self.crear_usuarios),
+            ('catálogo', self.preparar_catalogo),
+            ('imágenes plantilla', self.preparar_imagenes),
+            ('productos', self.crear_productos),
+            ('mensajes', self.crear_mensajes),
+            ('agregados', self.recalcular),
+        ]
+        for nombre, fase in fases:
+            inicio = time.perf_counter()
+            fase()
+            self.cr.commit()
+            _logger.info('Fase %s: %.1fs', nombre, time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generador de datos sintéticos de Renaix')
+    parser.add_argument('-c', '--config', default=None, help='Fichero de configuración de Odoo')
+    parser.add_argument('-d', '--database', required=True, help='Base de datos')
+    parser.add_argument('--seed', type=int, default=42, help='Semilla (mismos datos con la misma semilla)')
+    parser.add_argument('--usuarios', type=int, default=5000, help='Usuarios a crear')
+    parser.add_argument('--productos', type=int, default=50000, help='Productos a crear')
+    parser.add_argument('--media-comentarios', type=float, default=2.0, help='Comentarios medios por producto')
+    parser.add_argument('--ratio-compras', type=float, default=0.25, help='Fracción de productos con compra')
+    parser.add_argument('--ratio-hilos', type=float, default=0.6, help='Hilos de mensajes por producto')
+    parser.add_argument('--media-mensajes', type=float, default=8.0, help='Mensajes medios por hilo')
+    parser.add_argument('--dias', type=int, default=365, help='Días de histórico')
+    parser.add_argument('--plantillas', type=int, default=40, help='Imágenes plantilla distintas')
+    parser.add_argument('--password', default='Bench1234!', help='Contraseña de los usuarios generados')
+    args = parser.parse_args()
+
+    import odoo
+    from odoo.modules.registry import Registry
+
+    odoo.tools.config.parse_config(['-d', args.database] + (['-c', args.config] if args.config else []))
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    inicio = time.perf_counter()
+    with Registry(args.database).cursor() as cr:
+        env = odoo.api.Environment(cr, odoo.SUPERUSER_ID, {})
+        generador = Generador(env, args)
+        generador.generar()
+
+    print(f'\nDatos generados en {time.perf_counter() - inicio:.0f}s (seed={args.seed}):')
+    for tabla, total in sorted(generador.conteo.items()):
+        print(f'  {tabla:32s} {total:>12,}')
+    print(f'\nContraseña de los usuarios generados: {args.password}')
+
+
+if __name__ == '__main__':
+    main()
@@ -68,6 +68,30 @@ MAX_IMAGE_SIZE_MB = 5
 # Número máximo de imágenes por producto
 MAX_IMAGES_PER_PRODUCT = 10
 
+# Subidas por partes (reanudables): tamaño de parte recomendado (bytes)
+UPLOAD_CHUNK_SIZE = 512 * 1024
+
+# Horas que se conserva una subida por partes sin completar
+UPLOAD_SESSION_TTL_HOURS = 24
+
+# Directorio de las subidas en curso (None = <data_dir>/renaix_api_uploads)
+UPLOAD_DIR = None
+
+# Cache-Control de las imágenes servidas por la API (segundos). Las URL
+# versionadas (?v=<checksum>) no cambian de contenido: se cachean un año
+IMAGE_MAX_AGE = 86400
+IMAGE_VERSIONED_MAX_AGE = 365 * 24 * 3600
+
+# ========================================
+# CONFIGURACIÓN DE IMPORTACIÓN MASIVA
+# ========================================
+
+# Número máximo de productos por petición a /productos/lote
+MAX_BULK_PRODUCTS = 1000
+
+# Productos insertados por cada create() (y por savepoint)
+BULK_CREATE_BATCH_SIZE = 200
+
 # ========================================
 # CONFIGURACIÓN DE MENSAJES
 # ========================================
@@ -77,3 +101,139 @@ MAX_MESSAGE_LENGTH = 2000
 
 # Longitud máxima de comentario
 MAX_COMMENT_LENGTH = 1000
+
+# ========================================
+# CONFIGURACIÓN DE RATE LIMITING
+# ========================================
+
+# Activar la limitación de peticiones (token bucket compartido entre workers)
+RATE_LIMIT_ENABLED = True
+
+# Límites por grupo de rutas:
+#   limit  -> capacidad del bucket (ráfaga máxima de peticiones)
+#   period -> segundos que tarda el bucket en recargarse por completo
+RATE_LIMITS = {
+    'auth': {'limit': 10, 'period': 60},         # login, registro, refresh (por IP)
+    'busqueda': {'limit': 60, 'period': 60},     # búsquedas de productos y etiquetas
+    'escritura': {'limit': 60, 'period': 60},    # POST / PUT / DELETE autenticados
+    'lectura': {'limit': 300, 'period': 60},     # GET de listados y detalles
+    'imagenes': {'limit': 600, 'period': 60},    # binarios de imágenes
+    'lote': {'limit': 10, 'period': 60},         # importaciones masivas
+}
+
+# Grupo usado cuando una ruta no indica ninguno
+RATE_LIMIT_DEFAULT_GROUP = 'lectura'
+
+# ========================================
+# CONFIGURACIÓN DE CHATTER
+# ========================================
+
+# Encolar los mensajes y seguidores del chatter de las peticiones
+# autenticadas (renaix.chatter.outbox) en lugar de crearlos en la petición
+CHATTER_DIFERIDO = True
+
+# ========================================
+# CONFIGURACIÓN DE RESPUESTAS JSON
+# ========================================
+
+# Comprimir respuestas según Accept-Encoding (brotli si está instalado, si no gzip)
+COMPRESSION_ENABLED = True
+
+# Tamaño mínimo del cuerpo (en bytes) para comprimir
+COMPRESSION_MIN_SIZE = 1024
+
+# Nivel de compresión gzip (1 = rápido, 9 = máximo)
+COMPRESSION_GZIP_LEVEL = 6
+
+# Calidad brotli (0-11; 4 es un buen equilibrio para respuestas dinámicas)
+COMPRESSION_BROTLI_QUALITY = 4
+
+# ========================================
+# CONFIGURACIÓN DE CACHÉ HTTP
+# ========================================
+
+# Añadir ETag a los GET públicos y responder 304 a If-None-Match
+ETAG_ENABLED = True
+
+# Caché de respuestas de los endpoints públicos del catálogo (por worker,
+# invalidada al escribir en los modelos de los que depende)
+RESPONSE_CACHE_ENABLED = True
+
+# Segundos que vive cada entrada, por endpoint (0 = sin caché)
+RESPONSE_CACHE_TTLS = {
+    'productos': 60,
+    'busqueda': 60,
+    'categorias': 600,
+    'etiquetas': 300,
+}
+
+# Número máximo de respuestas guardadas por worker (LRU)
+RESPONSE_CACHE_MAX_ENTRIES = 500
+
+# Tamaño máximo (bytes) de una respuesta para guardarla
+RESPONSE_CACHE_MAX_BODY = 512 * 1024
+
+# Token para los endpoints internos (/api/v1/_sistema/...). Vacío = desactivados
+INTERNAL_API_TOKEN = ''
+
+# ========================================
+# CONFIGURACIÓN DE INSTRUMENTACIÓN
+# ========================================
+
+# Medir cada petición /api/v1/ por fases (auth, serialize, encode, db, app)
+TIMING_ENABLED = True
+
+# Enviar las fases en la cabecera Server-Timing de la respuesta
+TIMING_SERVER_HEADER = True
+
+# Fracción de peticiones que se registran en el log (0.01 = 1%)
+TIMING_LOG_SAMPLE_RATE = 0.01
+
+# Las peticiones más lentas que esto (ms) se registran siempre
+TIMING_LOG_SLOW_MS = 1000
+
+# Métricas agregadas en /api/v1/_metrics (formato Prometheus)
+METRICS_ENABLED = True
+
+# Segundos entre volcados de las métricas de cada worker a la tabla compartida
+METRICS_FLUSH_INTERVAL = 10
+
+# Límites (segundos) de los buckets del histograma de latencia
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# ========================================
+# CONFIGURACIÓN DE PERFILADO
+# ========================================
+
+# Permitir perfilar peticiones (cabecera firmada o muestreo)
+PROFILING_ENABLED = True
+
+# Cabecera con el token de perfilado (se genera en el backend)
+PROFILING_HEADER = 'X-Renaix-Profile'
+
+# Validez (minutos) de los tokens de perfilado
+PROFILING_TOKEN_MINUTES = 30
+
+# Fracción de peticiones que se perfilan por ruta (plantilla de la ruta)
+# Ej: {'/api/v1/productos/buscar': 0.01}
+PROFILING_SAMPLE_RATES = {}
+
+# Los perfiles de muestreo más rápidos que esto (ms) se descartan
+PROFILING_MIN_MS = 200
+
+# Directorio de los .prof (None = <data_dir>/renaix_api_profiles)
+PROFILING_DIR = None
+
+# Perfiles que se conservan (los más antiguos se borran)
+PROFILING_MAX_PROFILES = 200
+
+# ========================================
+# CONFIGURACIÓN DE ETIQUETADO SQL
+# ========================================
+
+# application_name = 'renaix_api <MÉTODO> <ruta>' en la transacción de cada petición
+SQL_ROUTE_TAGGING = True
+
+# Fracción de peticiones cuyas sentencias se anotan por ruta (para
+# benchmarks/consultas_lentas.py)
+SQL_ROUTE_SAMPLE_RATE = 0.05
@@ -8,7 +8,7 @@ import json
 import logging
 from odoo import http
 from odoo.http import request
-from ..models.utils import jwt_utils, auth_helpers, validators, response_helpers, serializers
+from ..models.utils import jwt_utils, auth_helpers, validators, response_helpers, serializers, rate_limit
 
 _logger = logging.getLogger(__name__)
 
@@ -17,6 +17,7 @@ class AuthController(http.Controller):
     
     @http.route('/api/v1/auth/register', type='http', auth='public', 
                 methods=['POST'], csrf=False, cors='*')
+    @rate_limit.limit('auth')
     def register(self, **params):
         """
         Registro de nuevo usuario.
@@ -105,6 +106,7 @@ class AuthController(http.Controller):
     
     @http.route('/api/v1/auth/login', type='http', auth='public', 
                 methods=['POST'], csrf=False, cors='*')
+    @rate_limit.limit('auth')
     def login(self, **params):
         """
         Login de usuario.
@@ -163,6 +165,7 @@ class AuthController(http.Controller):
     
     @http.route('/api/v1/auth/refresh', type='http', auth='public', 
                 methods=['POST'], csrf=False, cors='*')
+    @rate_limit.limit('auth')
     def refresh_token(self, **params):
         """
         Renovar access token usando refresh token.
@@ -207,6 +210,7 @@ class AuthController(http.Controller):
     
     @http.route('/api/v1/auth/logout', type='http', auth='public', 
                 methods=['POST'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
     def logout(self, **params):
         """
         Logout de usuario (invalida refresh token).
@@ -4,17 +4,21 @@
 import logging
 from odoo import http
 from odoo.http import request
-from ..models.utils import response_helpers, serializers
+from ..models.utils import validators, response_helpers, serializers, rate_limit, etag, response_cache
 
 _logger = logging.getLogger(__name__)
 
 class CategoriasController(http.Controller):
     
     @http.route('/api/v1/categorias', type='http', auth='none', methods=['GET'], csrf=False, cors='*')
+    @rate_limit.limit('lectura')
+    @etag.conditional('renaix.categoria', depends=['renaix.producto'])
+    @response_cache.cached('categorias', depends=['renaix.categoria', 'renaix.producto'])
     def listar_categorias(self, **params):
         try:
             categorias = request.env['renaix.categoria'].sudo().search([], order='name ASC')
-            categorias_data = [serializers.serialize_categoria(c) for c in categorias]
+            fields = validators.parse_list_param(params.get('fields'))
+            categorias_data = [serializers.pick_fields(serializers.serialize_categoria(c), fields) for c in categorias]
 
             return response_helpers.success_response(data=categorias_data, message='Categorías recuperadas')
         except Exception as e:
@@ -7,7 +7,7 @@ import json
 import logging
 from odoo import http
 from odoo.http import request
-from ..models.utils import jwt_utils, validators, response_helpers, serializers
+from ..models.utils import jwt_utils, validators, response_helpers, serializers, rate_limit
 
 _logger = logging.getLogger(__name__)
 
@@ -16,6 +16,7 @@ class ComentariosController(http.Controller):
     
     @http.route('/api/v1/productos/<int:producto_id>/comentarios', type='http', auth='none', 
                 methods=['GET'], csrf=False, cors='*')
+    @rate_limit.limit('lectura')
     def listar_comentarios(self, producto_id, **params):
         """Listar comentarios de un producto."""
         try:
@@ -24,7 +25,8 @@ class ComentariosController(http.Controller):
                 ('active', '=', True)
             ], order='fecha DESC')
             
-            comentarios_data = [serializers.serialize_comentario(c) for c in comentarios]
+            fields = validators.parse_list_param(params.get('fields'))
+            comentarios_data = [serializers.pick_fields(serializers.serialize_comentario(c), fields) for c in comentarios]
             
             return response_helpers.success_response(
                 data=comentarios_data,
@@ -38,6 +40,7 @@ class ComentariosController(http.Controller):
     
     @http.route('/api/v1/productos/<int:producto_id>/comentarios', type='http', auth='public', 
                 methods=['POST'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
     def crear_comentario(self, producto_id, **params):
         """Crear comentario en un producto."""
         try:
@@ -75,6 +78,7 @@ class ComentariosController(http.Controller):
     
     @http.route('/api/v1/comentarios/<int:comentario_id>', type='http', auth='public', 
                 methods=['DELETE'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
     def eliminar_comentario(self, comentario_id, **params):
         """Eliminar propio comentario."""
         try:
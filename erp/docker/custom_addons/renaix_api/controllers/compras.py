@@ -8,7 +8,7 @@ import json
 import logging
 from odoo import http
 from odoo.http import request
-from ..models.utils import jwt_utils, response_helpers, serializers
+from ..models.utils import jwt_utils, response_helpers, serializers, rate_limit
 
 _logger = logging.getLogger(__name__)
 
@@ -17,6 +17,7 @@ class ComprasController(http.Controller):
     
     @http.route('/api/v1/compras', type='http', auth='public', 
                 methods=['POST'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
     def crear_compra(self, **params):
         """
         Comprar un producto.
@@ -77,6 +78,7 @@ class ComprasController(http.Controller):
     
     @http.route('/api/v1/compras/<int:compra_id>', type='http', auth='public', 
                 methods=['GET'], csrf=False, cors='*')
+    @rate_limit.limit('lectura')
     def detalle_compra(self, compra_id, **params):
         """Obtener detalle de una compra."""
         try:
@@ -101,6 +103,7 @@ class ComprasController(http.Controller):
     
     @http.route('/api/v1/compras/<int:compra_id>/confirmar', type='http', auth='public',
                 methods=['POST'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
     def confirmar_compra(self, compra_id, **params):
         """Confirmar compra (vendedor)."""
         try:
@@ -130,6 +133,7 @@ class ComprasController(http.Controller):
     
     @http.route('/api/v1/compras/<int:compra_id>/completar', type='http', auth='public',
                 methods=['POST'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
     def completar_compra(self, compra_id, **params):
         """Completar compra (comprador confirma recepción)."""
         try:
@@ -159,6 +163,7 @@ class ComprasController(http.Controller):
     
     @http.route('/api/v1/compras/<int:compra_id>/cancelar', type='http', auth='public',
                 methods=['POST'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
     def cancelar_compra(self, compra_id, **params):
         """Cancelar compra."""
         try:
@@ -5,13 +5,14 @@ import json
 import logging
 from odoo import http
 from odoo.http import request
-from ..models.utils import jwt_utils, validators, response_helpers, serializers
+from ..models.utils import jwt_utils, validators, response_helpers, serializers, rate_limit
 
 _logger = logging.getLogger(__name__)
 
 class DenunciasController(http.Controller):
     
     @http.route('/api/v1/denuncias', type='http', auth='public', methods=['POST'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
     def crear_denuncia(self, **params):
         try:
             partner = jwt_utils.verify_token(request)
@@ -41,12 +42,14 @@ class DenunciasController(http.Controller):
             return response_helpers.server_error_response(str(e))
     
     @http.route('/api/v1/denuncias/mis-denuncias', type='http', auth='public', methods=['GET'], csrf=False, cors='*')
+    @rate_limit.limit('lectura')
     def listar_mis_denuncias(self, **params):
         try:
             partner = jwt_utils.verify_token(request)
             denuncias = request.env['renaix.denuncia'].sudo().search([('usuario_reportante_id', '=', partner.id)], order='fecha_denuncia DESC')
             
-            denuncias_data = [serializers.serialize_denuncia(d) for d in denuncias]
+            fields = validators.parse_list_param(params.get('fields'))
+            denuncias_data = [serializers.pick_fields(serializers.serialize_denuncia(d), fields) for d in denuncias]
             
             return response_helpers.success_response(data=denuncias_data, message='Denuncias recuperadas')
         except Exception as e:
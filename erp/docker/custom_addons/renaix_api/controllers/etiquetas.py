@@ -5,17 +5,23 @@ import json
 import logging
 from odoo import http
 from odoo.http import request
-from ..models.utils import jwt_utils, response_helpers, serializers
+from ..models.utils import jwt_utils, validators, response_helpers, serializers, rate_limit, etag, response_cache
 
 _logger = logging.getLogger(__name__)
 
 class EtiquetasController(http.Controller):
 
     @http.route('/api/v1/etiquetas', type='http', auth='none', methods=['GET'], csrf=False, cors='*')
+    @rate_limit.limit('lectura')
+    @etag.conditional('renaix.etiqueta', depends=['renaix.producto'])
+    @response_cache.cached('etiquetas', depends=['renaix.etiqueta', 'renaix.producto'])
     def listar_etiquetas(self, **params):
         try:
-            etiquetas = request.env['renaix.etiqueta'].sudo().search([], order='producto_count DESC', limit=50)
-            etiquetas_data = [serializers.serialize_etiqueta(e) for e in etiquetas]
+            etiquetas = request.env['renaix.etiqueta'].sudo().search(
+                [], order='producto_disponible_count DESC, producto_count DESC, name', limit=50
+            )
+            fields = validators.parse_list_param(params.get('fields'))
+            etiquetas_data = [serializers.pick_fields(serializers.serialize_etiqueta(e), fields) for e in etiquetas]
 
             return response_helpers.success_response(data=etiquetas_data, message='Etiquetas populares recuperadas')
         except Exception as e:
@@ -23,6 +29,7 @@ class EtiquetasController(http.Controller):
             return response_helpers.server_error_response(str(e))
 
     @http.route('/api/v1/etiquetas', type='http', auth='public', methods=['POST'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
     def crear_etiqueta(self, **params):
         """
         Crear una nueva etiqueta.
@@ -51,18 +58,19 @@ class EtiquetasController(http.Controller):
                 return response_helpers.validation_error_response('El nombre no puede superar 30 caracteres')
 
             Etiqueta = request.env['renaix.etiqueta'].sudo()
+            normalizado = Etiqueta._normalize_name(nombre)
 
-            # Buscar si ya existe (case-insensitive)
-            existing = Etiqueta.search([('name', '=ilike', nombre.lower())], limit=1)
-            if existing:
+            # Inserta si no existe (ON CONFLICT) y si no, recupera la existente
+            creada = Etiqueta._insertar_nombres([normalizado])
+            etiqueta = Etiqueta.browse(
+                creada.get(normalizado) or Etiqueta._resolver_nombres([normalizado])[normalizado]
+            )
+            if not creada:
                 return response_helpers.success_response(
-                    data=serializers.serialize_etiqueta(existing),
+                    data=serializers.serialize_etiqueta(etiqueta),
                     message='Etiqueta ya existente'
                 )
 
-            # Crear nueva etiqueta (el modelo normaliza el nombre)
-            etiqueta = Etiqueta.create({'name': nombre})
-
             _logger.info(f'Etiqueta creada: {etiqueta.name} (ID: {etiqueta.id})')
 
             return response_helpers.success_response(
@@ -78,6 +86,8 @@ class EtiquetasController(http.Controller):
             return response_helpers.server_error_response(str(e))
 
     @http.route('/api/v1/etiquetas/buscar', type='http', auth='none', methods=['GET'], csrf=False, cors='*')
+    @rate_limit.limit('busqueda')
+    @response_cache.cached('etiquetas', depends=['renaix.etiqueta', 'renaix.producto'])
     def buscar_etiquetas(self, **params):
         try:
             query = params.get('q', '')
@@ -85,7 +95,8 @@ class EtiquetasController(http.Controller):
                 return response_helpers.validation_error_response('La búsqueda debe tener al menos 2 caracteres')
 
             etiquetas = request.env['renaix.etiqueta'].sudo().search([('name', 'ilike', query)], limit=20)
-            etiquetas_data = [serializers.serialize_etiqueta(e) for e in etiquetas]
+            fields = validators.parse_list_param(params.get('fields'))
+            etiquetas_data = [serializers.pick_fields(serializers.serialize_etiqueta(e), fields) for e in etiquetas]
 
             return response_helpers.success_response(data=etiquetas_data, message=f'Se encontraron {len(etiquetas)} etiquetas')
         except Exception as e:
@@ -5,13 +5,14 @@ import json
 import logging
 from odoo import http
 from odoo.http import request
-from ..models.utils import jwt_utils, validators, response_helpers, serializers
+from ..models.utils import jwt_utils, validators, response_helpers, serializers, rate_limit
 
 _logger = logging.getLogger(__name__)
 
 class MensajesController(http.Controller):
     
     @http.route('/api/v1/mensajes/conversaciones', type='http', auth='public', methods=['GET'], csrf=False, cors='*')
+    @rate_limit.limit('lectura')
     def listar_conversaciones(self, **params):
         try:
             partner = jwt_utils.verify_token(request)
@@ -33,6 +34,7 @@ class MensajesController(http.Controller):
             return response_helpers.server_error_response(str(e))
     
     @http.route('/api/v1/mensajes', type='http', auth='public', methods=['POST'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
     def enviar_mensaje(self, **params):
         try:
             partner = jwt_utils.verify_token(request)
@@ -59,6 +61,7 @@ class MensajesController(http.Controller):
             return response_helpers.server_error_response(str(e))
     
     @http.route('/api/v1/mensajes/conversacion/<int:user_id>', type='http', auth='public', methods=['GET'], csrf=False, cors='*')
+    @rate_limit.limit('lectura')
     def get_conversacion(self, user_id, **params):
         """
         Obtener conversacion con un usuario especifico.
@@ -98,6 +101,7 @@ class MensajesController(http.Controller):
             return response_helpers.server_error_response(str(e))
 
     @http.route('/api/v1/mensajes/no-leidos', type='http', auth='public', methods=['GET'], csrf=False, cors='*')
+    @rate_limit.limit('lectura')
     def get_no_leidos(self, **params):
         """
         Obtener mensajes no leidos del usuario autenticado.
@@ -125,6 +129,7 @@ class MensajesController(http.Controller):
             return response_helpers.server_error_response(str(e))
 
     @http.route('/api/v1/mensajes/<int:mensaje_id>/marcar-leido', type='http', auth='public', methods=['PUT'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
     def marcar_leido(self, mensaje_id, **params):
         try:
             partner = jwt_utils.verify_token(request)
@@ -146,6 +151,7 @@ class MensajesController(http.Controller):
     # ==================== SISTEMA DE OFERTAS ====================
 
     @http.route('/api/v1/mensajes/oferta', type='http', auth='public', methods=['POST'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
     def enviar_oferta(self, **params):
         """
         Enviar una oferta de precio sobre un producto.
@@ -211,6 +217,7 @@ class MensajesController(http.Controller):
             return response_helpers.server_error_response(str(e))
 
     @http.route('/api/v1/mensajes/oferta/<int:mensaje_id>/aceptar', type='http', auth='public', methods=['POST'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
     def aceptar_oferta(self, mensaje_id, **params):
         """
         Aceptar una oferta recibida. Crea una compra con el precio negociado.
@@ -272,6 +279,7 @@ class MensajesController(http.Controller):
             return response_helpers.server_error_response(str(e))
 
     @http.route('/api/v1/mensajes/oferta/<int:mensaje_id>/rechazar', type='http', auth='public', methods=['POST'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
     def rechazar_oferta(self, mensaje_id, **params):
         """
         Rechazar una oferta recibida.
@@ -319,6 +327,7 @@ class MensajesController(http.Controller):
             return response_helpers.server_error_response(str(e))
 
     @http.route('/api/v1/mensajes/contraoferta', type='http', auth='public', methods=['POST'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
     def enviar_contraoferta(self, **params):
         """
         Enviar una contraoferta sobre una oferta existente.
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 """
 Controlador de Productos
-Endpoints: listar, detalle, crear, actualizar, eliminar, buscar, publicar, imágenes
+Endpoints: listar, detalle, crear, crear en lote, actualizar, eliminar, buscar, publicar, imágenes
 """
 
 import json
@@ -9,16 +9,108 @@ import logging
 import base64
 from odoo import http
 from odoo.http import request
-from ..models.utils import jwt_utils, validators, response_helpers, serializers
+from odoo.addons.renaix.tools import imagenes
+from ..models.utils import jwt_utils, validators, response_helpers, serializers, rate_limit, etag, response_cache, uploads
 from ..config import settings
 
 _logger = logging.getLogger(__name__)
 
 
+def guardar_imagen_producto(partner, producto_id, image_bytes, es_principal=False, descripcion=''):
+    """
+    Valida y guarda una imagen subida para un producto del usuario.
+
+    Compartido por la subida en base64, la binaria y la subida por partes.
+
+    Args:
+        partner: Usuario autenticado
+        producto_id (int): ID del producto
+        image_bytes (bytes): Contenido de la imagen
+        es_principal (bool): Marcar como imagen principal
+        descripcion (str): Descripción opcional
+
+    Returns:
+        Response: JSON {imagen} (201) o el error correspondiente
+    """
+    producto = request.env['renaix.producto'].sudo().browse(producto_id)
+
+    if not producto.exists():
+        return response_helpers.not_found_response('Producto no encontrado')
+
+    # Verificar que sea el propietario
+    if producto.propietario_id.id != partner.id:
+        return response_helpers.forbidden_response('No tienes permiso')
+
+    # Verificar límite de imágenes
+    if len(producto.imagen_ids) >= settings.MAX_IMAGES_PER_PRODUCT:
+        return response_helpers.validation_error_response(f'Máximo {settings.MAX_IMAGES_PER_PRODUCT} imágenes por producto')
+
+    # Validar tamaño
+    if len(image_bytes) > settings.MAX_IMAGE_SIZE_MB * 1024 * 1024:
+        return response_helpers.validation_error_response(f'La imagen es demasiado grande. Máximo: {settings.MAX_IMAGE_SIZE_MB}MB')
+
+    if len(image_bytes) < 100:
+        return response_helpers.validation_error_response('La imagen es demasiado pequeña o está corrupta')
+
+    # Se guarda tal cual; el procesado (EXIF, tamaño, miniatura, WebP) se
+    # hace en segundo plano
+    ProductoImagen = request.env['renaix.producto.imagen'].sudo()
+    imagen = ProductoImagen.create({
+        'producto_id': producto.id,
+        'es_principal': es_principal,
+        'descripcion': descripcion or '',
+        **ProductoImagen._valores_imagen_original(image_bytes),
+    })
+
+    _logger.info(f'Imagen añadida al producto {producto.id}')
+
+    return response_helpers.success_response(
+        data=serializers.serialize_producto_imagen(imagen),
+        message='Imagen añadida exitosamente',
+        status=201
+    )
+
+
+def _leer_lote(http_request):
+    """
+    Lee el cuerpo de /productos/lote: un array JSON o NDJSON (un producto
+    por línea).
+    
+    Args:
+        http_request: Request HTTP de Odoo
+    
+    Returns:
+        list: Productos (las líneas NDJSON inválidas se devuelven como None)
+    
+    Raises:
+        json.JSONDecodeError: Si el array JSON no es válido
+    """
+    body = http_request.httprequest.get_data().decode('utf-8')
+    content_type = http_request.httprequest.mimetype or ''
+    
+    if content_type not in ('application/x-ndjson', 'application/jsonl') and body.lstrip().startswith('['):
+        return json.loads(body)
+    
+    items = []
+    for line in body.splitlines():
+        if not line.strip():
+            continue
+        try:
+            items.append(json.loads(line))
+        except json.JSONDecodeError:
+            items.append(None)
+    return items
+
+
 class ProductosController(http.Controller):
     
     @http.route('/api/v1/productos', type='http', auth='none', 
                 methods=['GET'], csrf=False, cors='*')
+    @rate_limit.limit('lectura')
+    @response_cache.cached('productos', depends=[
+        'renaix.producto', 'res.partner', 'renaix.categoria', 'renaix.etiqueta',
+        'renaix.producto.imagen', 'renaix.comentario', 'renaix.denuncia',
+    ])
     def listar_productos(self, **params):
         """
         Listar productos disponibles (público).
@@ -26,6 +118,9 @@ class ProductosController(http.Controller):
         Query params:
             page: Número de página (default: 1)
             limit: Elementos por página (default: 20)
+            fields: Campos a devolver separados por comas (ej: id,nombre,precio)
+            embed: Relaciones a incluir (propietario, categoria, etiquetas, imagenes,
+                   imagen_principal, comentarios)
             estado_venta: filtrar por estado (disponible, reservado, vendido)
         
         Returns:
@@ -37,6 +132,13 @@ class ProductosController(http.Controller):
                 params.get('page'),
                 params.get('limit')
             )
+
+            # Campos y relaciones a devolver (fields=, embed=)
+            is_valid, error_msg, fields, embed = validators.validate_fieldset_params(
+                params, serializers.PRODUCTO_FIELDS, serializers.PRODUCTO_EMBEDS
+            )
+            if not is_valid:
+                return response_helpers.validation_error_response(error_msg)
             
             # Construir dominio de búsqueda
             domain = [('active', '=', True)]
@@ -57,7 +159,7 @@ class ProductosController(http.Controller):
             productos_pagina = productos[offset:offset + limit]
             
             # Serializar
-            productos_data = [serializers.serialize_producto(p, include_images=True) for p in productos_pagina]
+            productos_data = serializers.serialize_productos(productos_pagina, fields=fields, embed=embed)
             
             return response_helpers.paginated_response(
                 items=productos_data,
@@ -74,14 +176,30 @@ class ProductosController(http.Controller):
     
     @http.route('/api/v1/productos/<int:producto_id>', type='http', auth='none', 
                 methods=['GET'], csrf=False, cors='*')
+    @rate_limit.limit('lectura')
+    @etag.conditional('renaix.producto', depends=[
+        'res.partner', 'renaix.categoria', 'renaix.etiqueta',
+        'renaix.producto.imagen', 'renaix.comentario', 'renaix.denuncia',
+    ], id_arg='producto_id')
     def detalle_producto(self, producto_id, **params):
         """
         Obtener detalle de un producto (público).
         
+        Query params:
+            fields: Campos a devolver separados por comas (ej: id,nombre,precio)
+            embed: Relaciones a incluir (por defecto todas, con comentarios)
+        
         Returns:
             JSON: {producto}
         """
         try:
+            # Campos y relaciones a devolver (fields=, embed=)
+            is_valid, error_msg, fields, embed = validators.validate_fieldset_params(
+                params, serializers.PRODUCTO_FIELDS, serializers.PRODUCTO_EMBEDS
+            )
+            if not is_valid:
+                return response_helpers.validation_error_response(error_msg)
+            
             # Buscar producto
             producto = request.env['renaix.producto'].sudo().browse(producto_id)
             
@@ -89,12 +207,14 @@ class ProductosController(http.Controller):
                 return response_helpers.not_found_response('Producto no encontrado')
             
             # Serializar con comentarios
-            producto_data = serializers.serialize_producto(
+            producto_data = serializers.serialize_productos(
                 producto, 
                 include_images=True, 
                 include_comentarios=True,
-                include_propietario_full=True
-            )
+                include_propietario_full=True,
+                fields=fields,
+                embed=embed
+            )[0]
             
             return response_helpers.success_response(
                 data=producto_data,
@@ -108,6 +228,7 @@ class ProductosController(http.Controller):
     
     @http.route('/api/v1/productos', type='http', auth='public', 
                 methods=['POST'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
     def crear_producto(self, **params):
         """
         Crear nuevo producto (requiere autenticación).
@@ -164,18 +285,8 @@ class ProductosController(http.Controller):
             etiqueta_ids = list(data.get('etiqueta_ids', []))
 
             if data.get('etiqueta_nombres'):
-                Etiqueta = request.env['renaix.etiqueta'].sudo()
-                for nombre in data['etiqueta_nombres']:
-                    nombre = nombre.strip()
-                    if not nombre:
-                        continue
-                    existing = Etiqueta.search([('name', '=ilike', nombre.lower())], limit=1)
-                    if existing:
-                        if existing.id not in etiqueta_ids:
-                            etiqueta_ids.append(existing.id)
-                    else:
-                        nueva = Etiqueta.create({'name': nombre})
-                        etiqueta_ids.append(nueva.id)
+                resueltas = request.env['renaix.etiqueta'].sudo()._resolver_nombres(data['etiqueta_nombres'])
+                etiqueta_ids += [eid for eid in resueltas.values() if eid not in etiqueta_ids]
 
             if etiqueta_ids:
                 producto.sudo().write({'etiqueta_ids': [(6, 0, etiqueta_ids)]})
@@ -196,8 +307,141 @@ class ProductosController(http.Controller):
             return response_helpers.server_error_response(str(e))
     
     
+    @http.route('/api/v1/productos/lote', type='http', auth='public',
+                methods=['POST'], csrf=False, cors='*')
+    @rate_limit.limit('lote')
+    def crear_productos_lote(self, **params):
+        """
+        Crear productos en bloque (requiere autenticación).
+        
+        Body: array JSON de productos o NDJSON (Content-Type:
+        application/x-ndjson, un producto por línea), con el mismo formato
+        que POST /productos. Máximo settings.MAX_BULK_PRODUCTS por petición.
+        Los productos se crean en borrador.
+        
+        Returns:
+            JSON: {total, creados, errores, resultados: [{indice, success, id | error}]}
+        """
+        try:
+            partner = jwt_utils.verify_token(request)
+            
+            items = _leer_lote(request)
+            if not isinstance(items, list) or not items:
+                return response_helpers.validation_error_response('Se esperaba una lista de productos')
+            if len(items) > settings.MAX_BULK_PRODUCTS:
+                return response_helpers.validation_error_response(
+                    f'No se pueden crear más de {settings.MAX_BULK_PRODUCTS} productos por petición'
+                )
+            
+            # Validación de todo el lote
+            env = request.env
+            estados_producto = [
+                valor for valor, _etiqueta in env['renaix.producto']._fields['estado_producto'].selection
+            ]
+            errores = [
+                msg if item is not None else 'JSON inválido'
+                for item, msg in zip(items, validators.validate_productos_lote(items, estados_producto))
+            ]
+            validos = [i for i, error in enumerate(errores) if not error]
+            
+            # Categorías y etiquetas referenciadas: una consulta para cada una
+            categoria_ids = set(env['renaix.categoria'].sudo().browse(
+                {items[i]['categoria_id'] for i in validos}
+            ).exists().ids)
+            etiqueta_ids_existentes = set(env['renaix.etiqueta'].sudo().browse(
+                {eid for i in validos for eid in items[i].get('etiqueta_ids') or []}
+            ).exists().ids)
+            
+            for i in validos:
+                if items[i]['categoria_id'] not in categoria_ids:
+                    errores[i] = 'Categoría no encontrada'
+                elif not set(items[i].get('etiqueta_ids') or []) <= etiqueta_ids_existentes:
+                    errores[i] = 'Etiqueta no encontrada'
+            validos = [i for i in validos if not errores[i]]
+            
+            Etiqueta = env['renaix.etiqueta'].sudo()
+            etiquetas_por_nombre = Etiqueta._resolver_nombres(
+                n for i in validos for n in items[i].get('etiqueta_nombres') or []
+            )
+            
+            # Preparar valores
+            vals_por_indice = {}
+            for i in validos:
+                data = items[i]
+                etiqueta_ids = list(dict.fromkeys(
+                    list(data.get('etiqueta_ids') or []) + [
+                        etiquetas_por_nombre[Etiqueta._normalize_name(n)]
+                        for n in data.get('etiqueta_nombres') or [] if n and n.strip()
+                    ]
+                ))
+                vals = {
+                    'name': data['nombre'],
+                    'descripcion': data.get('descripcion', ''),
+                    'precio': data['precio'],
+                    'propietario_id': partner.id,
+                    'categoria_id': data['categoria_id'],
+                    'antiguedad': data.get('antiguedad', ''),
+                    'ubicacion': data.get('ubicacion', ''),
+                    'estado_venta': 'borrador',
+                    'etiqueta_ids': [(6, 0, etiqueta_ids)],
+                }
+                # Sin estado_producto se aplica el valor por defecto del modelo
+                if 'estado_producto' in data:
+                    vals['estado_producto'] = data['estado_producto']
+                vals_por_indice[i] = vals
+            
+            # Crear por bloques; si un bloque falla se reintenta elemento a
+            # elemento para saber cuál es el problemático
+            Producto = env['renaix.producto'].sudo().with_context(
+                mail_create_nolog=True,
+                mail_create_nosubscribe=True,
+            )
+            creados = {}
+            batch_size = settings.BULK_CREATE_BATCH_SIZE
+            for start in range(0, len(validos), batch_size):
+                bloque = validos[start:start + batch_size]
+                try:
+                    with env.cr.savepoint():
+                        productos = Producto.create([vals_por_indice[i] for i in bloque])
+                    creados.update(zip(bloque, productos.ids))
+                except Exception:
+                    for i in bloque:
+                        try:
+                            with env.cr.savepoint():
+                                creados[i] = Producto.create([vals_por_indice[i]]).id
+                        except Exception as e:
+                            errores[i] = str(e)
+            
+            resultados = [
+                {'indice': i, 'success': True, 'id': creados[i]} if i in creados
+                else {'indice': i, 'success': False, 'error': errores[i]}
+                for i in range(len(items))
+            ]
+            
+            _logger.info(f'Lote de productos: {len(creados)}/{len(items)} creados por usuario {partner.id}')
+            
+            return response_helpers.success_response(
+                data={
+                    'total': len(items),
+                    'creados': len(creados),
+                    'errores': len(items) - len(creados),
+                    'resultados': resultados,
+                },
+                message=f'{len(creados)} de {len(items)} productos creados',
+                status=201 if len(creados) == len(items) else 200
+            )
+            
+        except json.JSONDecodeError:
+            return response_helpers.validation_error_response('JSON inválido')
+        
+        except Exception as e:
+            _logger.error(f'Error al crear lote de productos: {str(e)}')
+            return response_helpers.server_error_response(str(e))
+    
+    
     @http.route('/api/v1/productos/<int:producto_id>', type='http', auth='public', 
                 methods=['PUT'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
     def actualizar_producto(self, producto_id, **params):
         """
         Actualizar producto (solo el propietario).
@@ -261,18 +505,8 @@ class ProductosController(http.Controller):
             etiqueta_ids = list(data.get('etiqueta_ids', []))
 
             if data.get('etiqueta_nombres'):
-                Etiqueta = request.env['renaix.etiqueta'].sudo()
-                for nombre in data['etiqueta_nombres']:
-                    nombre = nombre.strip()
-                    if not nombre:
-                        continue
-                    existing = Etiqueta.search([('name', '=ilike', nombre.lower())], limit=1)
-                    if existing:
-                        if existing.id not in etiqueta_ids:
-                            etiqueta_ids.append(existing.id)
-                    else:
-                        nueva = Etiqueta.create({'name': nombre})
-                        etiqueta_ids.append(nueva.id)
+                resueltas = request.env['renaix.etiqueta'].sudo()._resolver_nombres(data['etiqueta_nombres'])
+                etiqueta_ids += [eid for eid in resueltas.values() if eid not in etiqueta_ids]
 
             if 'etiqueta_ids' in data or 'etiqueta_nombres' in data:
                 producto.sudo().write({'etiqueta_ids': [(6, 0, etiqueta_ids)]})
@@ -294,6 +528,7 @@ class ProductosController(http.Controller):
     
     @http.route('/api/v1/productos/<int:producto_id>', type='http', auth='public', 
                 methods=['DELETE'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
     def eliminar_producto(self, producto_id, **params):
         """
         Eliminar producto (solo el propietario).
@@ -335,6 +570,7 @@ class ProductosController(http.Controller):
     
     @http.route('/api/v1/productos/<int:producto_id>/publicar', type='http', auth='public', 
                 methods=['POST'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
     def publicar_producto(self, producto_id, **params):
         """
         Publicar producto (cambiar estado de borrador a disponible).
@@ -381,6 +617,11 @@ class ProductosController(http.Controller):
     
     @http.route('/api/v1/productos/buscar', type='http', auth='none', 
                 methods=['GET'], csrf=False, cors='*')
+    @rate_limit.limit('busqueda')
+    @response_cache.cached('busqueda', depends=[
+        'renaix.producto', 'res.partner', 'renaix.categoria', 'renaix.etiqueta',
+        'renaix.producto.imagen', 'renaix.comentario', 'renaix.denuncia',
+    ])
     def buscar_productos(self, **params):
         """
         Búsqueda avanzada de productos (público).
@@ -396,6 +637,9 @@ class ProductosController(http.Controller):
             orden: precio_asc, precio_desc, fecha_desc, fecha_asc
             page: Número de página
             limit: Elementos por página
+            fields: Campos a devolver separados por comas (ej: id,nombre,precio)
+            embed: Relaciones a incluir (propietario, categoria, etiquetas, imagenes,
+                   imagen_principal, comentarios)
         
         Returns:
             JSON: {productos} (paginado)
@@ -409,6 +653,13 @@ class ProductosController(http.Controller):
                 params.get('page'),
                 params.get('limit')
             )
+
+            # Campos y relaciones a devolver (fields=, embed=)
+            is_valid, error_msg, fields, embed = validators.validate_fieldset_params(
+                params, serializers.PRODUCTO_FIELDS, serializers.PRODUCTO_EMBEDS
+            )
+            if not is_valid:
+                return response_helpers.validation_error_response(error_msg)
             
             # Construir dominio
             domain = [
@@ -463,7 +714,7 @@ class ProductosController(http.Controller):
             productos_pagina = productos[offset:offset + limit]
             
             # Serializar
-            productos_data = [serializers.serialize_producto(p, include_images=True) for p in productos_pagina]
+            productos_data = serializers.serialize_productos(productos_pagina, fields=fields, embed=embed)
             
             return response_helpers.paginated_response(
                 items=productos_data,
@@ -480,6 +731,7 @@ class ProductosController(http.Controller):
     
     @http.route('/api/v1/productos/<int:producto_id>/imagenes', type='http', auth='public',
                 methods=['POST'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
     def agregar_imagen(self, producto_id, **params):
         """
         Agregar imagen a un producto.
@@ -498,26 +750,12 @@ class ProductosController(http.Controller):
             # Verificar token
             partner = jwt_utils.verify_token(request)
 
-            # Buscar producto
-            producto = request.env['renaix.producto'].sudo().browse(producto_id)
-
-            if not producto.exists():
-                return response_helpers.not_found_response('Producto no encontrado')
-
-            # Verificar que sea el propietario
-            if producto.propietario_id.id != partner.id:
-                return response_helpers.forbidden_response('No tienes permiso')
-
             # Obtener datos
             data = json.loads(request.httprequest.data.decode('utf-8'))
 
             if not data.get('image'):
                 return response_helpers.validation_error_response('Campo "image" requerido (base64)')
 
-            # Verificar límite de imágenes
-            if len(producto.imagen_ids) >= settings.MAX_IMAGES_PER_PRODUCT:
-                return response_helpers.validation_error_response(f'Máximo {settings.MAX_IMAGES_PER_PRODUCT} imágenes por producto')
-
             # Procesar imagen base64
             image_data = data['image']
 
@@ -532,34 +770,52 @@ class ProductosController(http.Controller):
             except (base64.binascii.Error, ValueError):
                 return response_helpers.validation_error_response('Imagen en formato base64 inválido')
 
-            # Validar tamaño
-            if len(image_bytes) > settings.MAX_IMAGE_SIZE_MB * 1024 * 1024:
-                return response_helpers.validation_error_response(f'La imagen es demasiado grande. Máximo: {settings.MAX_IMAGE_SIZE_MB}MB')
+            return guardar_imagen_producto(
+                partner, producto_id, image_bytes,
+                es_principal=data.get('es_principal', False),
+                descripcion=data.get('descripcion', ''),
+            )
+
+        except json.JSONDecodeError:
+            return response_helpers.validation_error_response('JSON inválido')
 
-            if len(image_bytes) < 100:
-                return response_helpers.validation_error_response('La imagen es demasiado pequeña o está corrupta')
+        except Exception as e:
+            _logger.error(f'Error al agregar imagen: {str(e)}')
+            return response_helpers.server_error_response(str(e))
+    
+    
+    @http.route('/api/v1/productos/<int:producto_id>/imagenes/binario', type='http', auth='public',
+                methods=['POST'], csrf=False, cors='*', upload=True)
+    @rate_limit.limit('escritura')
+    def agregar_imagen_binaria(self, producto_id, **params):
+        """
+        Agregar imagen a un producto enviando el archivo en binario.
 
-            # Crear imagen con el campo binario correcto
-            imagen_vals = {
-                'producto_id': producto.id,
-                'imagen': image_data,
-                'es_principal': data.get('es_principal', False),
-                'descripcion': data.get('descripcion', ''),
-            }
+        Body: multipart/form-data (campo "file") o el archivo tal cual
+        (Content-Type: application/octet-stream o image/*). Se rechaza con 413
+        si Content-Length supera settings.MAX_IMAGE_SIZE_MB.
 
-            imagen = request.env['renaix.producto.imagen'].sudo().create(imagen_vals)
+        Query params / campos del formulario:
+            es_principal: "true" para marcarla como principal (opcional)
+            descripcion: Descripción de la imagen (opcional)
 
-            _logger.info(f'Imagen añadida al producto {producto.id}')
+        Returns:
+            JSON: {imagen}
+        """
+        try:
+            partner = jwt_utils.verify_token(request)
 
-            return response_helpers.success_response(
-                data=serializers.serialize_producto_imagen(imagen),
-                message='Imagen añadida exitosamente',
-                status=201
+            try:
+                image_bytes = uploads.read_upload(request)
+            except uploads.UploadError as e:
+                return response_helpers.error_response(str(e), code='UPLOAD_ERROR', status=e.status)
+
+            return guardar_imagen_producto(
+                partner, producto_id, image_bytes,
+                es_principal=str(params.get('es_principal', '')).lower() in ('1', 'true'),
+                descripcion=params.get('descripcion', ''),
             )
 
-        except json.JSONDecodeError:
-            return response_helpers.validation_error_response('JSON inválido')
-
         except Exception as e:
             _logger.error(f'Error al agregar imagen: {str(e)}')
             return response_helpers.server_error_response(str(e))
@@ -567,6 +823,7 @@ class ProductosController(http.Controller):
     
     @http.route('/api/v1/productos/<int:producto_id>/imagenes/<int:imagen_id>', 
                 type='http', auth='public', methods=['DELETE'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
     def eliminar_imagen(self, producto_id, imagen_id, **params):
         """
         Eliminar imagen de un producto.
@@ -610,23 +867,36 @@ class ProductosController(http.Controller):
 
     @http.route('/api/v1/imagenes/<int:imagen_id>', type='http', auth='none',
                 methods=['GET'], csrf=False, cors='*')
+    @rate_limit.limit('imagenes')
     def get_imagen_binaria(self, imagen_id, **params):
         """
         Sirve el binario de una imagen de producto (público, sin autenticación).
         Necesario porque /web/image/ requiere sesión web, no Bearer token.
 
+        Query params:
+            variante: 'small' (miniatura 256px) o 'webp' (opcional)
+
         Returns:
             HTTP binary response con la imagen
+            (503 con Retry-After mientras se está procesando)
         """
         try:
             import base64 as b64
             imagen = request.env['renaix.producto.imagen'].sudo().browse(imagen_id)
-            if not imagen.exists() or not imagen.imagen:
+            if not imagen.exists():
+                return request.make_response('Not found', status=404)
+
+            if imagen.estado_procesado == 'procesando':
+                return request.make_response('Processing', status=503, headers=[('Retry-After', '2')])
+
+            campo = {'small': 'imagen_small', 'webp': 'imagen_webp'}.get(params.get('variante'), 'imagen')
+            contenido = imagen[campo] or imagen.imagen
+            if not contenido:
                 return request.make_response('Not found', status=404)
 
-            image_data = b64.b64decode(imagen.imagen)
+            image_data = b64.b64decode(contenido)
             headers = [
-                ('Content-Type', 'image/jpeg'),
+                ('Content-Type', imagenes.detectar_mimetype(image_data)),
                 ('Cache-Control', 'public, max-age=86400'),
             ]
             return request.make_response(image_data, headers=headers)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Controlador de Sistema
+Endpoints internos de operación (protegidos con settings.INTERNAL_API_TOKEN)
+"""
+
+import hmac
+import logging
+from odoo import http
+from odoo.http import request
+from ..models.utils import response_helpers, response_cache, metrics
+from ..config import settings
+
+_logger = logging.getLogger(__name__)
+
+
+def _check_internal_token():
+    """
+    Comprueba la cabecera X-Internal-Token (o Authorization: Bearer, que
+    es lo que envía Prometheus con bearer_token).
+
+    Returns:
+        bool: True si el token es correcto (y está configurado)
+    """
+    headers = request.httprequest.headers
+    token = headers.get('X-Internal-Token') or ''
+    if not token:
+        parts = (headers.get('Authorization') or '').split()
+        if len(parts) == 2 and parts[0].lower() == 'bearer':
+            token = parts[1]
+    return bool(settings.INTERNAL_API_TOKEN) and hmac.compare_digest(token, settings.INTERNAL_API_TOKEN)
+
+
+class SistemaController(http.Controller):
+
+    @http.route('/api/v1/_sistema/cache', type='http', auth='none', methods=['GET'], csrf=False, cors='*')
+    def estadisticas_cache(self, **params):
+        """
+        Estadísticas de la caché de respuestas del worker que atiende la
+        petición (hits, misses, invalidaciones, entradas...).
+
+        Headers:
+            X-Internal-Token: settings.INTERNAL_API_TOKEN
+
+        Returns:
+            JSON: {pid, hits, misses, hit_ratio, entries, ...}
+        """
+        if not _check_internal_token():
+            return response_helpers.not_found_response('Recurso no encontrado')
+
+        return response_helpers.success_response(
+            data=response_cache.get_stats(),
+            message='Estadísticas de caché'
+        )
+
+    @http.route('/api/v1/_metrics', type='http', auth='none', methods=['GET'], csrf=False)
+    def metricas(self, **params):
+        """
+        Métricas agregadas de todos los workers en formato Prometheus:
+        peticiones, histograma de latencia y tiempo en SQL por ruta, errores
+        por código y aciertos de la caché de respuestas.
+
+        Headers:
+            X-Internal-Token o Authorization: Bearer <settings.INTERNAL_API_TOKEN>
+
+        Returns:
+            text/plain: Formato de exposición de Prometheus
+        """
+        if not _check_internal_token():
+            return response_helpers.not_found_response('Recurso no encontrado')
+
+        try:
+            body = metrics.render(request.db)
+        except Exception as e:
+            _logger.error(f'Error al generar métricas: {str(e)}')
+            return response_helpers.server_error_response(str(e))
+
+        return request.make_response(body, headers=[
+            ('Content-Type', 'text/plain; version=0.0.4; charset=utf-8'),
+            ('Cache-Control', 'no-store'),
+        ])
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Controlador de Subidas por partes
+Endpoints: iniciar, estado, enviar parte, completar (imagen de producto o de perfil)
+"""
+
+import json
+import logging
+from odoo import http
+from odoo.http import request
+from ..models.utils import jwt_utils, response_helpers, rate_limit, uploads
+from .productos import guardar_imagen_producto
+from .usuarios import guardar_imagen_perfil
+
+_logger = logging.getLogger(__name__)
+
+
+def _upload_error_response(error):
+    """
+    Convierte un UploadError en respuesta JSON (con el byte recibido en los 409).
+
+    Args:
+        error (uploads.UploadError): Error de subida
+
+    Returns:
+        Response: Respuesta HTTP JSON
+    """
+    if error.status == 409:
+        response = response_helpers.conflict_response(str(error))
+        if 'recibido' in error.extra:
+            response.headers['Upload-Offset'] = str(error.extra['recibido'])
+        return response
+    if error.status == 413:
+        return response_helpers.payload_too_large_response(str(error))
+    if error.status == 404:
+        return response_helpers.not_found_response(str(error))
+    return response_helpers.error_response(str(error), code='UPLOAD_ERROR', status=error.status)
+
+
+class SubidasController(http.Controller):
+
+    @http.route('/api/v1/subidas', type='http', auth='public', methods=['POST'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
+    def iniciar_subida(self, **params):
+        """
+        Inicia una subida por partes (reanudable).
+
+        Body JSON:
+        {
+            "tamano": 4718592  # tamaño total del archivo en bytes
+        }
+
+        Returns:
+            JSON: {id, tamano, recibido, completa, chunk_size, expira}
+        """
+        try:
+            partner = jwt_utils.verify_token(request)
+            data = json.loads(request.httprequest.data.decode('utf-8'))
+
+            try:
+                info = uploads.create_session(request.env.cr.dbname, partner.id, data.get('tamano'))
+            except uploads.UploadError as e:
+                return _upload_error_response(e)
+
+            return response_helpers.success_response(data=info, message='Subida iniciada', status=201)
+
+        except json.JSONDecodeError:
+            return response_helpers.validation_error_response('JSON inválido')
+        except Exception as e:
+            _logger.error(f'Error al iniciar subida: {str(e)}')
+            return response_helpers.server_error_response(str(e))
+
+    @http.route('/api/v1/subidas/<string:subida_id>', type='http', auth='public',
+                methods=['GET', 'PUT'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
+    def parte_subida(self, subida_id, **params):
+        """
+        GET - Estado de la subida (cuántos bytes se han recibido), para
+              reanudar tras un corte.
+        PUT - Envía una parte. Body binario con la cabecera
+              Content-Range: bytes <inicio>-<fin>/<total>. Si <inicio> no
+              coincide con lo recibido se responde 409 con Upload-Offset.
+
+        Returns:
+            JSON: {id, tamano, recibido, completa, chunk_size, expira}
+        """
+        try:
+            partner = jwt_utils.verify_token(request)
+
+            try:
+                meta = uploads.load_session(subida_id, request.env.cr.dbname, partner.id)
+                if request.httprequest.method == 'PUT':
+                    uploads.append_chunk(request, subida_id, meta)
+                info = uploads.session_info(subida_id, meta)
+            except uploads.UploadError as e:
+                return _upload_error_response(e)
+
+            response = response_helpers.success_response(data=info, message='Estado de la subida')
+            response.headers['Upload-Offset'] = str(info['recibido'])
+            return response
+
+        except Exception as e:
+            _logger.error(f'Error en subida {subida_id}: {str(e)}')
+            return response_helpers.server_error_response(str(e))
+
+    @http.route('/api/v1/subidas/<string:subida_id>/completar', type='http', auth='public',
+                methods=['POST'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
+    def completar_subida(self, subida_id, **params):
+        """
+        Completa la subida y guarda la imagen en su destino.
+
+        Body JSON:
+        {
+            "destino": "producto",      # "producto" o "perfil"
+            "producto_id": 5,           # si destino = producto
+            "es_principal": false,      # opcional
+            "descripcion": "Vista frontal"  # opcional
+        }
+
+        Returns:
+            JSON: {imagen} (producto) o {user} (perfil)
+        """
+        try:
+            partner = jwt_utils.verify_token(request)
+            data = json.loads(request.httprequest.data.decode('utf-8'))
+
+            destino = data.get('destino')
+            if destino not in ('producto', 'perfil'):
+                return response_helpers.validation_error_response('Campo "destino" debe ser "producto" o "perfil"')
+            if destino == 'producto' and not isinstance(data.get('producto_id'), int):
+                return response_helpers.validation_error_response('Campo "producto_id" requerido')
+
+            try:
+                meta = uploads.load_session(subida_id, request.env.cr.dbname, partner.id)
+                image_bytes = uploads.read_session(subida_id, meta)
+            except uploads.UploadError as e:
+                return _upload_error_response(e)
+
+            if destino == 'producto':
+                response = guardar_imagen_producto(
+                    partner, data['producto_id'], image_bytes,
+                    es_principal=data.get('es_principal', False),
+                    descripcion=data.get('descripcion', ''),
+                )
+            else:
+                response = guardar_imagen_perfil(partner, image_bytes)
+
+            # Solo se descarta la subida si la imagen se ha guardado
+            if response.status_code < 400:
+                uploads.delete_session(subida_id)
+            return response
+
+        except json.JSONDecodeError:
+            return response_helpers.validation_error_response('JSON inválido')
+        except Exception as e:
+            _logger.error(f'Error al completar subida {subida_id}: {str(e)}')
+            return response_helpers.server_error_response(str(e))
@@ -8,14 +8,52 @@ import json
 import logging
 from odoo import http
 from odoo.http import request
-from ..models.utils import jwt_utils, auth_helpers, validators, response_helpers, serializers
+from odoo.addons.renaix.tools import imagenes
+from ..models.utils import jwt_utils, auth_helpers, validators, response_helpers, serializers, rate_limit, etag, uploads
+from ..config import settings
 
 _logger = logging.getLogger(__name__)
 
+
+def guardar_imagen_perfil(partner, image_bytes):
+    """
+    Valida y guarda la imagen de perfil del usuario.
+
+    Compartido por la subida en base64, la binaria y la subida por partes.
+
+    Args:
+        partner: Usuario autenticado
+        image_bytes (bytes): Contenido de la imagen
+
+    Returns:
+        Response: JSON {user} o el error de validación
+    """
+    # Validar tamaño
+    if len(image_bytes) > settings.MAX_IMAGE_SIZE_MB * 1024 * 1024:
+        return response_helpers.validation_error_response(
+            f'La imagen es demasiado grande. Tamaño máximo: {settings.MAX_IMAGE_SIZE_MB}MB'
+        )
+
+    # Validar que tenga un tamaño mínimo razonable (al menos 100 bytes)
+    if len(image_bytes) < 100:
+        return response_helpers.validation_error_response(
+            'La imagen es demasiado pequeña o está corrupta'
+        )
+
+    # Guardar la imagen tal cual; se procesa en segundo plano
+    partner.sudo().write(partner._valores_imagen_original(image_bytes))
+
+    return response_helpers.success_response(
+        data=serializers.serialize_partner(partner, full=True),
+        message='Imagen de perfil actualizada'
+    )
+
+
 class UsuariosController(http.Controller):
     
     @http.route('/api/v1/usuarios/perfil', type='http', auth='public', 
                 methods=['GET'], csrf=False, cors='*')
+    @rate_limit.limit('lectura')
     def get_perfil(self, **params):
         """
         Obtener perfil del usuario autenticado.
@@ -42,6 +80,7 @@ class UsuariosController(http.Controller):
     
     @http.route('/api/v1/usuarios/perfil', type='http', auth='public',
                 methods=['PUT'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
     def update_perfil(self, **params):
         """
         Actualizar perfil del usuario autenticado.
@@ -85,7 +124,7 @@ class UsuariosController(http.Controller):
 
                 # Si es una cadena vacía, eliminar la imagen
                 if not image_data:
-                    update_vals['image_1920'] = False
+                    update_vals.update({'image_1920': False, 'imagen_original': False, 'estado_procesado': 'lista'})
                 else:
                     # Validar que sea base64 válido
                     try:
@@ -115,8 +154,8 @@ class UsuariosController(http.Controller):
                                 'La imagen es demasiado pequeña o está corrupta'
                             )
 
-                        # Guardar la imagen en base64 (Odoo valida internamente el formato)
-                        update_vals['image_1920'] = image_data
+                        # Guardar la imagen tal cual; se procesa en segundo plano
+                        update_vals.update(partner._valores_imagen_original(image_data))
 
                     except (base64.binascii.Error, ValueError) as b64_error:
                         _logger.error(f'Error al decodificar base64: {str(b64_error)}')
@@ -144,6 +183,7 @@ class UsuariosController(http.Controller):
     
     @http.route('/api/v1/usuarios/perfil/imagen', type='http', auth='public',
                 methods=['POST', 'DELETE'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
     def update_imagen_perfil(self, **params):
         """
         Actualizar o eliminar la imagen de perfil del usuario autenticado.
@@ -166,7 +206,7 @@ class UsuariosController(http.Controller):
 
             # DELETE - Eliminar imagen
             if request.httprequest.method == 'DELETE':
-                partner.sudo().write({'image_1920': False})
+                partner.sudo().write({'image_1920': False, 'imagen_original': False, 'estado_procesado': 'lista'})
                 return response_helpers.success_response(
                     data=serializers.serialize_partner(partner, full=True),
                     message='Imagen de perfil eliminada'
@@ -199,25 +239,7 @@ class UsuariosController(http.Controller):
                 # Intentar decodificar para validar formato base64
                 image_bytes = base64.b64decode(image_data, validate=True)
 
-                # Validar tamaño (máximo 5MB)
-                if len(image_bytes) > 5 * 1024 * 1024:
-                    return response_helpers.validation_error_response(
-                        'La imagen es demasiado grande. Tamaño máximo: 5MB'
-                    )
-
-                # Validar que tenga un tamaño mínimo razonable (al menos 100 bytes)
-                if len(image_bytes) < 100:
-                    return response_helpers.validation_error_response(
-                        'La imagen es demasiado pequeña o está corrupta'
-                    )
-
-                # Guardar la imagen (Odoo valida internamente el formato)
-                partner.sudo().write({'image_1920': image_data})
-
-                return response_helpers.success_response(
-                    data=serializers.serialize_partner(partner, full=True),
-                    message='Imagen de perfil actualizada'
-                )
+                return guardar_imagen_perfil(partner, image_bytes)
 
             except (base64.binascii.Error, ValueError) as b64_error:
                 _logger.error(f'Error al decodificar base64: {str(b64_error)}')
@@ -234,8 +256,38 @@ class UsuariosController(http.Controller):
             return response_helpers.server_error_response(str(e))
 
 
+    @http.route('/api/v1/usuarios/perfil/imagen/binario', type='http', auth='public',
+                methods=['POST'], csrf=False, cors='*', upload=True)
+    @rate_limit.limit('escritura')
+    def update_imagen_perfil_binaria(self, **params):
+        """
+        Subir la imagen de perfil en binario.
+
+        Body: multipart/form-data (campo "file") o el archivo tal cual
+        (Content-Type: application/octet-stream o image/*). Se rechaza con 413
+        si Content-Length supera settings.MAX_IMAGE_SIZE_MB.
+
+        Returns:
+            JSON: {user}
+        """
+        try:
+            partner = jwt_utils.verify_token(request)
+
+            try:
+                image_bytes = uploads.read_upload(request)
+            except uploads.UploadError as e:
+                return response_helpers.error_response(str(e), code='UPLOAD_ERROR', status=e.status)
+
+            return guardar_imagen_perfil(partner, image_bytes)
+
+        except Exception as e:
+            _logger.error(f'Error al actualizar imagen de perfil: {str(e)}')
+            return response_helpers.server_error_response(str(e))
+
+
     @http.route('/api/v1/usuarios/perfil/password', type='http', auth='public',
                 methods=['PUT'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
     def cambiar_password(self, **params):
         """
         Cambiar contraseña del usuario autenticado.
@@ -289,6 +341,10 @@ class UsuariosController(http.Controller):
 
     @http.route('/api/v1/usuarios/<int:user_id>', type='http', auth='public',
                 methods=['GET'], csrf=False, cors='*')
+    @rate_limit.limit('lectura')
+    @etag.conditional('res.partner', depends=[
+        'renaix.producto', 'renaix.compra', 'renaix.valoracion', 'renaix.comentario',
+    ], id_arg='user_id')
     def get_usuario_publico(self, user_id, **params):
         """
         Obtener perfil público de un usuario.
@@ -316,6 +372,7 @@ class UsuariosController(http.Controller):
     
     @http.route('/api/v1/usuarios/perfil/productos', type='http', auth='public', 
                 methods=['GET'], csrf=False, cors='*')
+    @rate_limit.limit('lectura')
     def get_mis_productos(self, **params):
         """
         Obtener productos del usuario autenticado.
@@ -323,6 +380,9 @@ class UsuariosController(http.Controller):
         Query params:
             page: Número de página (default: 1)
             limit: Elementos por página (default: 20)
+            fields: Campos a devolver separados por comas (ej: id,nombre,precio)
+            embed: Relaciones a incluir (propietario, categoria, etiquetas, imagenes,
+                   imagen_principal, comentarios)
         
         Returns:
             JSON: {productos} (paginado)
@@ -336,6 +396,13 @@ class UsuariosController(http.Controller):
                 params.get('page'),
                 params.get('limit')
             )
+
+            # Campos y relaciones a devolver (fields=, embed=)
+            is_valid, error_msg, fields, embed = validators.validate_fieldset_params(
+                params, serializers.PRODUCTO_FIELDS, serializers.PRODUCTO_EMBEDS
+            )
+            if not is_valid:
+                return response_helpers.validation_error_response(error_msg)
             
             # Buscar productos
             productos = request.env['renaix.producto'].sudo().search([
@@ -347,7 +414,7 @@ class UsuariosController(http.Controller):
             productos_pagina = productos[offset:offset + limit]
             
             # Serializar
-            productos_data = [serializers.serialize_producto(p, include_images=True) for p in productos_pagina]
+            productos_data = serializers.serialize_productos(productos_pagina, fields=fields, embed=embed)
             
             return response_helpers.paginated_response(
                 items=productos_data,
@@ -364,6 +431,7 @@ class UsuariosController(http.Controller):
     
     @http.route('/api/v1/usuarios/perfil/compras', type='http', auth='public', 
                 methods=['GET'], csrf=False, cors='*')
+    @rate_limit.limit('lectura')
     def get_mis_compras(self, **params):
         """
         Obtener compras del usuario autenticado.
@@ -381,7 +449,8 @@ class UsuariosController(http.Controller):
             ], order='fecha_compra DESC')
             
             # Serializar
-            compras_data = [serializers.serialize_compra(c) for c in compras]
+            fields = validators.parse_list_param(params.get('fields'))
+            compras_data = [serializers.pick_fields(serializers.serialize_compra(c), fields) for c in compras]
             
             return response_helpers.success_response(
                 data=compras_data,
@@ -395,6 +464,7 @@ class UsuariosController(http.Controller):
     
     @http.route('/api/v1/usuarios/perfil/ventas', type='http', auth='public', 
                 methods=['GET'], csrf=False, cors='*')
+    @rate_limit.limit('lectura')
     def get_mis_ventas(self, **params):
         """
         Obtener ventas del usuario autenticado.
@@ -412,7 +482,8 @@ class UsuariosController(http.Controller):
             ], order='fecha_compra DESC')
             
             # Serializar
-            ventas_data = [serializers.serialize_compra(v) for v in ventas]
+            fields = validators.parse_list_param(params.get('fields'))
+            ventas_data = [serializers.pick_fields(serializers.serialize_compra(v), fields) for v in ventas]
             
             return response_helpers.success_response(
                 data=ventas_data,
@@ -426,6 +497,7 @@ class UsuariosController(http.Controller):
     
     @http.route('/api/v1/usuarios/perfil/valoraciones', type='http', auth='public', 
                 methods=['GET'], csrf=False, cors='*')
+    @rate_limit.limit('lectura')
     def get_mis_valoraciones(self, **params):
         """
         Obtener valoraciones recibidas del usuario autenticado.
@@ -443,7 +515,8 @@ class UsuariosController(http.Controller):
             ], order='fecha DESC')
             
             # Serializar
-            valoraciones_data = [serializers.serialize_valoracion(v) for v in valoraciones]
+            fields = validators.parse_list_param(params.get('fields'))
+            valoraciones_data = [serializers.pick_fields(serializers.serialize_valoracion(v), fields) for v in valoraciones]
             
             return response_helpers.success_response(
                 data=valoraciones_data,
@@ -457,6 +530,7 @@ class UsuariosController(http.Controller):
     
     @http.route('/api/v1/usuarios/perfil/estadisticas', type='http', auth='public', 
                 methods=['GET'], csrf=False, cors='*')
+    @rate_limit.limit('lectura')
     def get_estadisticas(self, **params):
         """
         Obtener estadísticas del usuario autenticado.
@@ -473,6 +547,7 @@ class UsuariosController(http.Controller):
                 'productos_vendidos': partner.productos_vendidos,
                 'productos_comprados': partner.productos_comprados,
                 'valoracion_promedio': round(partner.valoracion_promedio, 2),
+                'total_valoraciones': partner.valoracion_count,
                 'total_comentarios': partner.total_comentarios,
                 'total_denuncias_realizadas': partner.total_denuncias_realizadas,
             }
@@ -489,6 +564,7 @@ class UsuariosController(http.Controller):
 
     @http.route('/api/v1/usuarios/<int:user_id>/productos', type='http', auth='none',
                 methods=['GET'], csrf=False, cors='*')
+    @rate_limit.limit('lectura')
     def get_productos_usuario_publico(self, user_id, **params):
         """
         Obtener productos disponibles de un usuario público.
@@ -499,6 +575,9 @@ class UsuariosController(http.Controller):
         Query params:
             page: Número de página (default: 1)
             limit: Elementos por página (default: 20)
+            fields: Campos a devolver separados por comas (ej: id,nombre,precio)
+            embed: Relaciones a incluir (propietario, categoria, etiquetas, imagenes,
+                   imagen_principal, comentarios)
 
         Returns:
             JSON: {productos} (paginado)
@@ -516,6 +595,13 @@ class UsuariosController(http.Controller):
                 params.get('limit')
             )
 
+            # Campos y relaciones a devolver (fields=, embed=)
+            is_valid, error_msg, fields, embed = validators.validate_fieldset_params(
+                params, serializers.PRODUCTO_FIELDS, serializers.PRODUCTO_EMBEDS
+            )
+            if not is_valid:
+                return response_helpers.validation_error_response(error_msg)
+
             # Buscar productos disponibles del usuario
             productos = request.env['renaix.producto'].sudo().search([
                 ('propietario_id', '=', user_id),
@@ -527,7 +613,7 @@ class UsuariosController(http.Controller):
             offset = (page - 1) * limit
             productos_pagina = productos[offset:offset + limit]
 
-            productos_data = [serializers.serialize_producto(p, include_images=True) for p in productos_pagina]
+            productos_data = serializers.serialize_productos(productos_pagina, fields=fields, embed=embed)
 
             return response_helpers.paginated_response(
                 items=productos_data,
@@ -544,25 +630,37 @@ class UsuariosController(http.Controller):
 
     @http.route('/api/v1/usuarios/<int:partner_id>/imagen', type='http', auth='none',
                 methods=['GET'], csrf=False, cors='*')
+    @rate_limit.limit('imagenes')
     def get_imagen_usuario(self, partner_id, **params):
         """
         Sirve la imagen de perfil de un usuario (público, sin autenticación).
         Necesario porque /web/image/ requiere sesión web, no Bearer token.
 
+        La presencia y la versión se comprueban con has_image/image_checksum
+        sin leer el binario; con ?v=<checksum> (la URL que devuelve la API)
+        la respuesta se cachea como inmutable.
+
         Returns:
-            HTTP binary response con la imagen de perfil
+            HTTP binary response con la imagen de perfil (304 si no ha cambiado)
         """
         try:
             import base64 as b64
             partner = request.env['res.partner'].sudo().browse(partner_id)
-            if not partner.exists() or not partner.image_1920:
+            if not partner.exists() or not partner.has_image:
                 return request.make_response('Not found', status=404)
 
+            image_etag = f'"{partner.image_checksum}"'
+            if params.get('v') == partner.image_checksum:
+                cache_control = f'public, max-age={settings.IMAGE_VERSIONED_MAX_AGE}, immutable'
+            else:
+                cache_control = f'public, max-age={settings.IMAGE_MAX_AGE}'
+            headers = [('ETag', image_etag), ('Cache-Control', cache_control)]
+
+            if etag.etag_matches(request.httprequest.headers.get('If-None-Match'), image_etag):
+                return request.make_response(b'', headers=headers, status=304)
+
             image_data = b64.b64decode(partner.image_1920)
-            headers = [
-                ('Content-Type', 'image/jpeg'),
-                ('Cache-Control', 'public, max-age=86400'),
-            ]
+            headers.append(('Content-Type', imagenes.detectar_mimetype(image_data)))
             return request.make_response(image_data, headers=headers)
 
         except Exception as e:
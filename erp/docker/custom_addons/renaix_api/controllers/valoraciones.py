@@ -7,7 +7,7 @@ import json
 import logging
 from odoo import http
 from odoo.http import request
-from ..models.utils import jwt_utils, validators, response_helpers, serializers
+from ..models.utils import jwt_utils, validators, response_helpers, serializers, rate_limit
 
 _logger = logging.getLogger(__name__)
 
@@ -16,6 +16,7 @@ class ValoracionesController(http.Controller):
     
     @http.route('/api/v1/compras/<int:compra_id>/valorar', type='http', auth='public', 
                 methods=['POST'], csrf=False, cors='*')
+    @rate_limit.limit('escritura')
     def valorar_transaccion(self, compra_id, **params):
         """Valorar una transacción."""
         try:
@@ -74,6 +75,7 @@ class ValoracionesController(http.Controller):
     
     @http.route('/api/v1/usuarios/<int:user_id>/valoraciones', type='http', auth='public', 
                 methods=['GET'], csrf=False, cors='*')
+    @rate_limit.limit('lectura')
     def listar_valoraciones(self, user_id, **params):
         """Listar valoraciones de un usuario."""
         try:
@@ -81,7 +83,8 @@ class ValoracionesController(http.Controller):
                 ('usuario_valorado_id', '=', user_id)
             ], order='fecha DESC')
             
-            valoraciones_data = [serializers.serialize_valoracion(v) for v in valoraciones]
+            fields = validators.parse_list_param(params.get('fields'))
+            valoraciones_data = [serializers.pick_fields(serializers.serialize_valoracion(v), fields) for v in valoraciones]
             
             return response_helpers.success_response(
                 data=valoraciones_data,
@@ -1,3 +1,6 @@
 # -*- coding: utf-8 -*-
 
 from . import utils
+from . import model_version_mixin
+from . import ir_http
+from . import perfil
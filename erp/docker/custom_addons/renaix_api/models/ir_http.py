@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+Medición de tiempos (utils/timing.py), perfilado bajo demanda
+(utils/profiler.py), etiquetado de SQL (utils/sql_tagging.py), foto de
+la caché de respuestas (utils/response_cache.py) y límite del cuerpo de
+las subidas (utils/uploads.py) de las rutas de la API
+"""
+
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from odoo import models
+from odoo.http import request
+from .utils import timing, profiler, sql_tagging, response_cache, uploads, response_helpers
+
+
+class IrHttp(models.AbstractModel):
+    _inherit = 'ir.http'
+
+    @classmethod
+    def _pre_dispatch(cls, rule, args):
+        # Antes de cualquier sentencia en el cursor de la petición
+        response_cache.start()
+        timing.start(rule)
+        profiler.prepare(rule)
+        sql_tagging.start(rule)
+        try:
+            uploads.check_route_body(rule, request)
+        except uploads.UploadError as e:
+            raise RequestEntityTooLarge(response=response_helpers.payload_too_large_response(str(e)))
+        super()._pre_dispatch(rule, args)
+
+    @classmethod
+    def _dispatch(cls, endpoint):
+        with profiler.profiling() as result, sql_tagging.recording():
+            result['response'] = super()._dispatch(endpoint)
+        return result['response']
+
+    @classmethod
+    def _post_dispatch(cls, response):
+        super()._post_dispatch(response)
+        sql_tagging.finish()
+        timing.finish(response)
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Mixin que incrementa la versión del modelo en cada escritura
+
+Se aplica a los modelos cuyo contenido aparece en respuestas de la API,
+para que las ETags (y la caché de respuestas) detecten los cambios.
+"""
+
+from odoo import models, api
+from .utils import model_version
+
+
+class RenaixApiModelVersionMixin(models.AbstractModel):
+    _name = 'renaix_api.model.version.mixin'
+    _description = 'Versión de modelo para caché de la API'
+
+    # Campos cuya escritura no cambia ninguna respuesta de la API
+    _renaix_api_version_ignored_fields = ()
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        model_version.touch(self.env.cr, self._name)
+        return records
+
+    def write(self, vals):
+        result = super().write(vals)
+        if not set(vals) <= set(self._renaix_api_version_ignored_fields):
+            model_version.touch(self.env.cr, self._name)
+        return result
+
+    def unlink(self):
+        model_version.touch(self.env.cr, self._name)
+        return super().unlink()
+
+
+class ResPartner(models.Model):
+    _name = 'res.partner'
+    _inherit = ['res.partner', 'renaix_api.model.version.mixin']
+
+    # Se escriben en cada login / petición autenticada
+    _renaix_api_version_ignored_fields = ('api_token', 'fecha_ultima_actividad')
+
+    # Los contadores almacenados se recalculan sin pasar por write(), y el
+    # backfill los actualiza por SQL: el perfil que se ve en la API cambia
+    def _compute_estadisticas_productos(self):
+        super()._compute_estadisticas_productos()
+        model_version.touch(self.env.cr, self._name)
+
+    def _compute_estadisticas_actividad(self):
+        super()._compute_estadisticas_actividad()
+        model_version.touch(self.env.cr, self._name)
+
+    @api.model
+    def _backfill_estadisticas_mercado(self, partner_ids=None):
+        actualizados = super()._backfill_estadisticas_mercado(partner_ids)
+        if actualizados:
+            model_version.touch(self.env.cr, self._name)
+        return actualizados
+
+
+class RenaixProducto(models.Model):
+    _name = 'renaix.producto'
+    _inherit = ['renaix.producto', 'renaix_api.model.version.mixin']
+
+
+class RenaixProductoImagen(models.Model):
+    _name = 'renaix.producto.imagen'
+    _inherit = ['renaix.producto.imagen', 'renaix_api.model.version.mixin']
+
+
+class RenaixCategoria(models.Model):
+    _name = 'renaix.categoria'
+    _inherit = ['renaix.categoria', 'renaix_api.model.version.mixin']
+
+
+class RenaixEtiqueta(models.Model):
+    _name = 'renaix.etiqueta'
+    _inherit = ['renaix.etiqueta', 'renaix_api.model.version.mixin']
+
+    @api.model
+    def _insertar_nombres(self, nombres):
+        # Inserción por SQL: no pasa por create()
+        insertadas = super()._insertar_nombres(nombres)
+        if insertadas:
+            model_version.touch(self.env.cr, self._name)
+        return insertadas
+
+
+class RenaixComentario(models.Model):
+    _name = 'renaix.comentario'
+    _inherit = ['renaix.comentario', 'renaix_api.model.version.mixin']
+
+
+class RenaixValoracion(models.Model):
+    _name = 'renaix.valoracion'
+    _inherit = ['renaix.valoracion', 'renaix_api.model.version.mixin']
+
+    def _aplicar_agregados(self, signo):
+        # UPDATE directo de la media y el histograma de res_partner
+        super()._aplicar_agregados(signo)
+        if self:
+            model_version.touch(self.env.cr, 'res.partner')
+
+
+class RenaixCompra(models.Model):
+    _name = 'renaix.compra'
+    _inherit = ['renaix.compra', 'renaix_api.model.version.mixin']
+
+
+class RenaixDenuncia(models.Model):
+    _name = 'renaix.denuncia'
+    _inherit = ['renaix.denuncia', 'renaix_api.model.version.mixin']
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+import base64
+import logging
+import os
+
+from odoo import models, fields, api
+from odoo.exceptions import AccessError
+from ..config import settings
+from .utils import profiler
+
+_logger = logging.getLogger(__name__)
+
+
+class RenaixApiPerfil(models.Model):
+    """
+    Modelo: Perfil de petición de la API
+    Descripción: Índice de los perfiles (cProfile + SQL) guardados en disco
+                 por utils/profiler.py. Al borrar un registro se borra su
+                 archivo .prof.
+    """
+    _name = 'renaix_api.perfil'
+    _description = 'Perfil de petición de la API'
+    _order = 'duracion_ms desc'
+    _rec_name = 'ruta'
+
+    ruta = fields.Char(string='Ruta', required=True, index=True, readonly=True)
+    metodo = fields.Char(string='Método', readonly=True)
+    url = fields.Char(string='URL', readonly=True)
+    estado_http = fields.Integer(string='Estado HTTP', readonly=True)
+
+    motivo = fields.Selection([
+        ('cabecera', 'Cabecera firmada'),
+        ('muestreo', 'Muestreo'),
+    ], string='Motivo', readonly=True)
+
+    fecha = fields.Datetime(string='Fecha', default=fields.Datetime.now, readonly=True, index=True)
+    # Al agrupar por ruta se muestra el peor caso
+    duracion_ms = fields.Float(string='Duración (ms)', digits=(10, 1), readonly=True, aggregator='max')
+    consultas = fields.Integer(string='Consultas SQL', readonly=True, aggregator='max')
+    tiempo_sql_ms = fields.Float(string='Tiempo SQL (ms)', digits=(10, 1), readonly=True, aggregator='max')
+
+    partner_id = fields.Many2one('res.partner', string='Usuario', readonly=True, ondelete='set null')
+
+    archivo = fields.Char(string='Archivo', readonly=True, help='Ruta del .prof en el servidor')
+    resumen = fields.Text(string='Funciones (tiempo acumulado)', readonly=True)
+    sql_log = fields.Text(string='Consultas SQL', readonly=True)
+
+    archivo_prof = fields.Binary(string='Perfil (.prof)', compute='_compute_archivo_prof', attachment=False)
+    archivo_nombre = fields.Char(compute='_compute_archivo_prof')
+
+    def _archivo_valido(self):
+        """El archivo existe y está dentro del directorio de perfiles"""
+        if not self.archivo:
+            return False
+        directorio = os.path.realpath(profiler.profile_dir(self.env.cr.dbname))
+        archivo = os.path.realpath(self.archivo)
+        return archivo.startswith(directorio + os.sep) and os.path.isfile(archivo)
+
+    @api.depends('archivo')
+    def _compute_archivo_prof(self):
+        """Contenido del .prof para descargarlo (pstats, snakeviz...)"""
+        for record in self:
+            record.archivo_nombre = os.path.basename(record.archivo or '') or False
+            record.archivo_prof = False
+            if record._archivo_valido():
+                with open(record.archivo, 'rb') as f:
+                    record.archivo_prof = base64.b64encode(f.read())
+
+    def unlink(self):
+        archivos = [r.archivo for r in self if r._archivo_valido()]
+        result = super().unlink()
+        for archivo in archivos:
+            try:
+                os.remove(archivo)
+            except OSError as e:
+                _logger.warning(f'No se ha podido borrar el perfil {archivo}: {str(e)}')
+        return result
+
+    def _rotar(self):
+        """Borra los perfiles más antiguos por encima de PROFILING_MAX_PROFILES"""
+        antiguos = self.sudo().search([], order='fecha desc, id desc', offset=settings.PROFILING_MAX_PROFILES)
+        if antiguos:
+            antiguos.unlink()
+
+    @api.model
+    def action_generar_token(self):
+        """
+        Genera un token de perfilado para la cabecera de la API.
+
+        Solo para administradores: el token hace que se perfilen y guarden
+        todas las peticiones que lo lleven.
+
+        Returns:
+            dict: Notificación con el token y su validez
+
+        Raises:
+            AccessError: Si el usuario no es administrador
+        """
+        if not self.env.user.has_group('base.group_system'):
+            raise AccessError('Solo los administradores pueden generar tokens de perfilado.')
+        token = profiler.generate_token()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'Token de perfilado',
+                'message': f'{settings.PROFILING_HEADER}: {token} '
+                           f'(válido {settings.PROFILING_TOKEN_MINUTES} minutos)',
+                'sticky': True,
+                'type': 'info',
+            },
+        }
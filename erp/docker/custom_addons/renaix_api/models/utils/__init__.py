@@ -1,7 +1,19 @@
 # -*- coding: utf-8 -*-
 
+from . import shared_tables
+from . import sql_normalize
+from . import metrics
+from . import timing
 from . import jwt_utils
 from . import auth_helpers
 from . import validators
 from . import serializers
+from . import json_encoder
 from . import response_helpers
+from . import model_version
+from . import etag
+from . import response_cache
+from . import rate_limit
+from . import uploads
+from . import profiler
+from . import sql_tagging
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+ETags y peticiones condicionales (If-None-Match)
+
+La ETag se calcula sin serializar la respuesta: a partir de la ruta, los
+query params, el write_date (y el número de registros) del modelo
+principal y las versiones de los modelos de los que depende el JSON.
+"""
+
+import functools
+import hashlib
+import logging
+
+from odoo import fields
+from odoo.http import request
+from ...config import settings
+from . import model_version, response_helpers
+
+_logger = logging.getLogger(__name__)
+
+
+def build_etag(*parts):
+    """
+    Construye una ETag débil a partir de una lista de valores.
+
+    Es débil (W/) porque el mismo JSON puede enviarse comprimido o no.
+
+    Args:
+        *parts: Valores que identifican el contenido
+
+    Returns:
+        str: ETag (ej: 'W/"3f2a..."')
+    """
+    digest = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Compara la cabecera If-None-Match con una ETag (comparación débil).
+
+    Args:
+        if_none_match (str): Valor de la cabecera
+        etag (str): ETag actual
+
+    Returns:
+        bool: True si el cliente ya tiene esta versión
+    """
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    current = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == current:
+            return True
+    return False
+
+
+def table_signature(cr, table, record_id=None):
+    """
+    Obtiene la huella de una tabla o de un registro.
+
+    Args:
+        cr: Cursor de base de datos
+        table (str): Tabla SQL del modelo
+        record_id (int): ID del registro (None = toda la tabla)
+
+    Returns:
+        tuple: Huella, o None si el registro no existe
+    """
+    if record_id is None:
+        cr.execute(f'SELECT count(*), max(write_date) FROM "{table}"')
+        return cr.fetchone()
+    cr.execute(f'SELECT write_date FROM "{table}" WHERE id = %s', [record_id])
+    row = cr.fetchone()
+    return (record_id, row[0]) if row else None
+
+
+def compute_etag(model, depends=(), record_id=None):
+    """
+    Calcula la ETag de la petición actual.
+
+    Args:
+        model (str): Modelo principal del endpoint
+        depends (iterable): Otros modelos que aparecen en el JSON
+        record_id (int): ID del registro (endpoints de detalle)
+
+    Returns:
+        str: ETag, o None si el registro no existe
+    """
+    cr = request.env.cr
+    signature = table_signature(cr, request.env[model]._table, record_id)
+    if signature is None:
+        return None
+
+    versions = model_version.get_versions(cr, [model, *depends])
+    httprequest = request.httprequest
+    query = sorted(httprequest.args.items(multi=True))
+
+    # La fecha entra en la ETag porque hay campos relativos a hoy (dias_publicado)
+    return build_etag(
+        httprequest.path, query, signature, sorted(versions.items()),
+        fields.Date.today().isoformat(),
+    )
+
+
+def conditional(model, depends=(), id_arg=None):
+    """
+    Decorador que añade ETag y responde 304 a If-None-Match.
+
+    Si la ETag coincide se devuelve 304 sin ejecutar el endpoint (ni
+    serializar nada). Debe colocarse debajo de @http.route.
+
+    Args:
+        model (str): Modelo principal del endpoint
+        depends (iterable): Otros modelos que aparecen en el JSON
+        id_arg (str): Nombre del argumento de la ruta con el ID del registro
+
+    Returns:
+        function: Ruta decorada
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not settings.ETAG_ENABLED or request.httprequest.method != 'GET':
+                return func(*args, **kwargs)
+
+            try:
+                with request.env.cr.savepoint(flush=False):
+                    etag = compute_etag(model, depends, kwargs.get(id_arg) if id_arg else None)
+            except Exception as e:
+                _logger.warning(f'No se pudo calcular la ETag ({model}): {str(e)}')
+                etag = None
+
+            if etag and etag_matches(request.httprequest.headers.get('If-None-Match'), etag):
+                return response_helpers.not_modified_response(etag)
+
+            response = func(*args, **kwargs)
+            if etag and getattr(response, 'status_code', None) == 200:
+                response.headers['ETag'] = etag
+                response.headers['Cache-Control'] = 'no-cache'
+            return response
+
+        return wrapper
+    return decorator
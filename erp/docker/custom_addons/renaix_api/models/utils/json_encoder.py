@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Codificación JSON y compresión de respuestas
+
+Usa orjson si está instalado (mucho más rápido y sin pasar por str) y
+json de la librería estándar como alternativa. La compresión se negocia
+con la cabecera Accept-Encoding (brotli si está disponible, si no gzip).
+
+Este módulo no depende de Odoo para poder medirlo fuera del servidor
+(ver benchmarks/bench_response_encoding.py).
+"""
+
+import gzip
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _default(value):
+    """
+    Serializa tipos que JSON no soporta de forma nativa.
+
+    Args:
+        value: Valor no serializable (fechas, Decimal, sets, etc.)
+
+    Returns:
+        Valor serializable
+    """
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return str(value)
+
+
+def dumps(data):
+    """
+    Codifica datos a JSON (UTF-8).
+
+    Args:
+        data: Datos a codificar (dict, list, etc.)
+
+    Returns:
+        bytes: JSON codificado
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        data, ensure_ascii=False, separators=(',', ':'), default=_default
+    ).encode('utf-8')
+
+
+def get_backend():
+    """
+    Devuelve el nombre del codificador JSON activo.
+
+    Returns:
+        str: 'orjson' o 'json'
+    """
+    return 'orjson' if orjson is not None else 'json'
+
+
+def parse_accept_encoding(header):
+    """
+    Parsea la cabecera Accept-Encoding.
+
+    Args:
+        header (str): Valor de la cabecera (ej: 'gzip, br;q=0.8')
+
+    Returns:
+        dict: {codificación: calidad}
+    """
+    encodings = {}
+    for part in (header or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, params = part.partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        encodings[name.strip().lower()] = quality
+    return encodings
+
+
+def select_encoding(header):
+    """
+    Elige la mejor compresión soportada por cliente y servidor.
+
+    Args:
+        header (str): Valor de la cabecera Accept-Encoding
+
+    Returns:
+        str: 'br', 'gzip' o None si no se debe comprimir
+    """
+    accepted = parse_accept_encoding(header)
+    candidates = []
+    if brotli is not None:
+        candidates.append('br')
+    candidates.append('gzip')
+
+    best, best_quality = None, 0.0
+    for encoding in candidates:
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body, encoding, gzip_level=6, brotli_quality=4):
+    """
+    Comprime un cuerpo con la codificación indicada.
+
+    Args:
+        body (bytes): Cuerpo sin comprimir
+        encoding (str): 'br' o 'gzip'
+        gzip_level (int): Nivel de compresión gzip (1-9)
+        brotli_quality (int): Calidad brotli (0-11)
+
+    Returns:
+        bytes: Cuerpo comprimido
+    """
+    if encoding == 'br':
+        return brotli.compress(body, quality=brotli_quality)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+    return body
+
+
+def encode_body(data, accept_encoding=None, min_size=1024, gzip_level=6, brotli_quality=4):
+    """
+    Codifica y, si compensa, comprime una respuesta JSON.
+
+    Args:
+        data: Datos a codificar
+        accept_encoding (str): Cabecera Accept-Encoding del cliente
+        min_size (int): Tamaño mínimo (bytes) a partir del cual se comprime
+        gzip_level (int): Nivel de compresión gzip
+        brotli_quality (int): Calidad brotli
+
+    Returns:
+        tuple: (bytes, str) - (cuerpo, Content-Encoding o None)
+    """
+    body = dumps(data)
+    if len(body) < min_size:
+        return body, None
+
+    encoding = select_encoding(accept_encoding)
+    if not encoding:
+        return body, None
+
+    return compress(body, encoding, gzip_level, brotli_quality), encoding
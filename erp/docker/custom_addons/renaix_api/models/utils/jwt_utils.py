@@ -9,6 +9,7 @@ from datetime import datetime, timedelta
 from odoo.http import request
 from odoo.exceptions import AccessDenied
 from ...config import settings
+from . import timing
 
 _logger = logging.getLogger(__name__)
 
@@ -85,6 +86,7 @@ def generate_refresh_token(partner):
     return token
 
 
+@timing.timed('auth')
 def verify_token(http_request):
     """
     Verifica el token JWT del header Authorization y devuelve el usuario.
@@ -149,6 +151,11 @@ def verify_token(http_request):
             'fecha_ultima_actividad': datetime.now()
         })
         
+        # El chatter de lo que haga la petición se materializa en segundo plano
+        if settings.CHATTER_DIFERIDO:
+            http_request.update_context(renaix_diferir_chatter=True)
+        
+        timing.set_partner(partner.id)
         return partner
         
     except jwt.ExpiredSignatureError:
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Métricas agregadas de la API en formato Prometheus
+
+Cada worker acumula en memoria lo que mide timing.py (peticiones por ruta
+y estado, histograma de latencia, tiempo en SQL, errores por código y
+aciertos de la caché de respuestas) y cada settings.METRICS_FLUSH_INTERVAL
+segundos suma esos incrementos en una tabla UNLOGGED compartida. Así
+/api/v1/_metrics devuelve el total de todos los workers prefork.
+
+Los incrementos que aún no se han volcado cuando un worker termina se
+pierden (como mucho METRICS_FLUSH_INTERVAL segundos). La tabla se vacía
+si PostgreSQL se cae; Prometheus lo trata como un reinicio de contadores.
+"""
+
+import collections
+import logging
+import threading
+import time
+
+from odoo.sql_db import db_connect
+from ...config import settings
+from . import shared_tables
+
+_logger = logging.getLogger(__name__)
+
+TABLE_NAME = 'renaix_api_metrics'
+TABLE_COLUMNS = '''
+    metric VARCHAR NOT NULL,
+    labels VARCHAR NOT NULL,
+    value DOUBLE PRECISION NOT NULL DEFAULT 0,
+    PRIMARY KEY (metric, labels)
+'''
+
+# Prefijo de los nombres de métrica
+PREFIX = 'renaix_api'
+
+# Tipo y ayuda de cada familia de métricas
+FAMILIES = {
+    'requests_total': ('counter', 'Peticiones atendidas por ruta, método y estado HTTP'),
+    'request_duration_seconds': ('histogram', 'Duración de las peticiones por ruta y método'),
+    'db_seconds_total': ('counter', 'Segundos en PostgreSQL por ruta y método'),
+    'db_queries_total': ('counter', 'Consultas SQL por ruta y método'),
+    'errors_total': ('counter', 'Respuestas de error por ruta y código (response_helpers.error_response)'),
+    'response_cache_total': ('counter', 'Consultas a la caché de respuestas por ruta y resultado (hit/miss)'),
+}
+
+_lock = threading.Lock()
+_pending = collections.Counter()
+_last_flush = {}
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+# ==================== REGISTRO ====================
+
+def observe(dbname, route, method, status, duration_ms, db_ms, queries, error_code=None, cache=None):
+    """
+    Registra una petición terminada.
+
+    Args:
+        dbname (str): Base de datos de la petición
+        route (str): Plantilla de la ruta (ej: /api/v1/productos/<int:producto_id>)
+        method (str): Método HTTP
+        status (int): Estado HTTP de la respuesta
+        duration_ms (float): Duración total
+        db_ms (float): Tiempo en SQL
+        queries (int): Número de consultas
+        error_code (str): Código de response_helpers.error_response, si lo hay
+        cache (str): Cabecera X-Cache de la respuesta (HIT/MISS), si la hay
+    """
+    base = _labels(route=route, method=method)
+    seconds = duration_ms / 1000.0
+    with _lock:
+        _pending[(dbname, 'requests_total', _labels(route=route, method=method, status=status))] += 1
+        # Todos los buckets de la serie, aunque sea con 0
+        for bucket in settings.METRICS_BUCKETS:
+            _pending[(dbname, 'request_duration_seconds_bucket', f'{base},le="{bucket:g}"')] += seconds <= bucket
+        _pending[(dbname, 'request_duration_seconds_bucket', f'{base},le="+Inf"')] += 1
+        _pending[(dbname, 'request_duration_seconds_sum', base)] += seconds
+        _pending[(dbname, 'request_duration_seconds_count', base)] += 1
+        _pending[(dbname, 'db_seconds_total', base)] += db_ms / 1000.0
+        _pending[(dbname, 'db_queries_total', base)] += queries
+        if error_code:
+            _pending[(dbname, 'errors_total', _labels(route=route, code=error_code))] += 1
+        if cache:
+            _pending[(dbname, 'response_cache_total', _labels(route=route, result=cache.lower()))] += 1
+
+    if time.monotonic() - _last_flush.get(dbname, 0) >= settings.METRICS_FLUSH_INTERVAL:
+        flush(dbname)
+
+
+def flush(dbname):
+    """
+    Suma en la tabla compartida los incrementos pendientes de este worker.
+
+    Si la tabla no está disponible los incrementos se conservan para el
+    siguiente intento.
+
+    Args:
+        dbname (str): Base de datos
+    """
+    with _lock:
+        _last_flush[dbname] = time.monotonic()
+        rows = sorted((metric, labels, value) for (db, metric, labels), value in _pending.items() if db == dbname)
+        for metric, labels, _value in rows:
+            del _pending[(dbname, metric, labels)]
+    if not rows:
+        return
+
+    try:
+        with db_connect(dbname).cursor() as cr:
+            shared_tables.ensure_table(cr, TABLE_NAME, TABLE_COLUMNS)
+            # Filas ordenadas: dos workers nunca se bloquean en orden cruzado
+            cr.execute(f"""
+                INSERT INTO {TABLE_NAME} AS m (metric, labels, value)
+                SELECT * FROM unnest(%s::varchar[], %s::varchar[], %s::float8[])
+                ON CONFLICT (metric, labels) DO UPDATE SET value = m.value + EXCLUDED.value
+            """, [[r[0] for r in rows], [r[1] for r in rows], [r[2] for r in rows]])
+    except Exception as e:
+        _logger.warning(f'No se han podido volcar las métricas: {str(e)}')
+        with _lock:
+            for metric, labels, value in rows:
+                _pending[(dbname, metric, labels)] += value
+
+
+# ==================== EXPOSICIÓN ====================
+
+def _family(metric):
+    for suffix in ('_bucket', '_sum', '_count'):
+        if metric.endswith(suffix) and metric[:-len(suffix)] in FAMILIES:
+            return metric[:-len(suffix)]
+    return metric
+
+
+def render(dbname):
+    """
+    Vuelca lo pendiente de este worker y devuelve todas las métricas.
+
+    Args:
+        dbname (str): Base de datos
+
+    Returns:
+        str: Texto en formato de exposición de Prometheus (0.0.4)
+    """
+    flush(dbname)
+    with db_connect(dbname).cursor() as cr:
+        shared_tables.ensure_table(cr, TABLE_NAME, TABLE_COLUMNS)
+        cr.execute(f'SELECT metric, labels, value FROM {TABLE_NAME}')
+        rows = cr.fetchall()
+
+    by_family = collections.defaultdict(list)
+    for metric, labels, value in rows:
+        by_family[_family(metric)].append((metric, labels, value))
+
+    lines = []
+    for family, (kind, help_text) in FAMILIES.items():
+        samples = by_family.get(family)
+        if not samples:
+            continue
+        lines.append(f'# HELP {PREFIX}_{family} {help_text}')
+        lines.append(f'# TYPE {PREFIX}_{family} {kind}')
+        for metric, labels, value in sorted(samples, key=_sample_order):
+            value = int(value) if float(value).is_integer() else value
+            lines.append(f'{PREFIX}_{metric}{{{labels}}} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def _sample_order(sample):
+    """Ordena los buckets de cada serie por su límite (le)"""
+    metric, labels, _value = sample
+    base, _sep, le = labels.partition(',le="')
+    if not le:
+        return (metric, labels, 0.0)
+    le = le.rstrip('"')
+    return (metric, base, float('inf') if le == '+Inf' else float(le))
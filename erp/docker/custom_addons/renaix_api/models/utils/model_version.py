@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Contadores de versión por modelo
+
+Cada create/write/unlink de un modelo expuesto por la API incrementa su
+versión. El incremento se hace después del commit (en un cursor propio),
+así nadie puede ver la versión nueva con los datos antiguos. Las ETags y la
+caché de respuestas usan estas versiones para saber si algo ha cambiado.
+"""
+
+import functools
+import logging
+
+from odoo.sql_db import db_connect
+from . import shared_tables
+
+_logger = logging.getLogger(__name__)
+
+TABLE_NAME = 'renaix_api_model_version'
+TABLE_COLUMNS = '''
+    model VARCHAR PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+'''
+
+# Clave en cr.postcommit.data con los modelos pendientes de incrementar
+PENDING_KEY = 'renaix_api.model_version'
+
+# Funciones a llamar tras incrementar versiones: func(dbname, model_names)
+_listeners = []
+
+
+def register_listener(func):
+    """
+    Registra una función a llamar cuando cambian versiones de modelos.
+
+    Args:
+        func: Función func(dbname, model_names)
+
+    Returns:
+        function: La misma función (usable como decorador)
+    """
+    if func not in _listeners:
+        _listeners.append(func)
+    return func
+
+
+def touch(cr, model_name):
+    """
+    Marca un modelo como modificado en la transacción actual.
+
+    La versión se incrementa una sola vez por modelo y transacción, y solo
+    si la transacción llega a confirmarse.
+
+    Args:
+        cr: Cursor de la transacción que modifica los datos
+        model_name (str): Nombre técnico del modelo (ej: 'renaix.producto')
+    """
+    pending = cr.postcommit.data.get(PENDING_KEY)
+    if pending is None:
+        pending = cr.postcommit.data[PENDING_KEY] = set()
+        cr.postcommit.add(functools.partial(_bump_versions, cr.dbname, pending))
+    pending.add(model_name)
+
+
+def _bump_versions(dbname, model_names):
+    """
+    Incrementa las versiones de los modelos (tras el commit).
+
+    Args:
+        dbname (str): Base de datos
+        model_names (set): Modelos modificados
+    """
+    if not model_names:
+        return
+    model_names = sorted(model_names)
+    try:
+        with db_connect(dbname).cursor() as cr:
+            shared_tables.ensure_table(cr, TABLE_NAME, TABLE_COLUMNS, unlogged=False)
+            cr.execute(f"""
+                INSERT INTO {TABLE_NAME} AS v (model, version)
+                SELECT unnest(%s::varchar[]), 1
+                ON CONFLICT (model) DO UPDATE SET version = v.version + 1
+            """, [model_names])
+    except Exception as e:
+        _logger.warning(f'No se pudieron incrementar versiones {model_names}: {str(e)}')
+        return
+
+    for listener in _listeners:
+        try:
+            listener(dbname, model_names)
+        except Exception as e:
+            _logger.warning(f'Error notificando cambio de versiones: {str(e)}')
+
+
+def get_versions(cr, model_names):
+    """
+    Devuelve la versión actual de cada modelo.
+
+    Args:
+        cr: Cursor de base de datos
+        model_names (iterable): Modelos a consultar
+
+    Returns:
+        dict: {modelo: versión} (0 si nunca se ha modificado)
+    """
+    model_names = sorted(set(model_names))
+    shared_tables.ensure_table(cr, TABLE_NAME, TABLE_COLUMNS, unlogged=False)
+    cr.execute(
+        f'SELECT model, version FROM {TABLE_NAME} WHERE model = ANY(%s)',
+        [model_names]
+    )
+    versions = dict.fromkeys(model_names, 0)
+    versions.update(cr.fetchall())
+    return versions
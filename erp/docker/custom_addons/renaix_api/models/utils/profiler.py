@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+Perfilado bajo demanda de peticiones de la API (cProfile + log de SQL)
+
+Una petición se perfila si:
+
+- Lleva la cabecera settings.PROFILING_HEADER con un token de perfilado
+  firmado (lo genera un administrador desde Renaix > Configuración >
+  Perfiles de la API; caduca a los PROFILING_TOKEN_MINUTES minutos).
+- O cae en el muestreo de settings.PROFILING_SAMPLE_RATES para su ruta.
+  Los perfiles de muestreo solo se guardan si la petición tarda al menos
+  PROFILING_MIN_MS.
+
+El resultado (pstats) se guarda en disco y se indexa en renaix_api.perfil
+con las consultas SQL ejecutadas. Se conservan como mucho
+PROFILING_MAX_PROFILES perfiles; los más antiguos se borran.
+"""
+
+import contextlib
+import cProfile
+import io
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import jwt
+from odoo.http import request
+from odoo.tools import config
+from ...config import settings
+from . import timing
+
+_logger = logging.getLogger(__name__)
+
+# Funciones que se incluyen en el resumen de texto
+SUMMARY_LINES = 40
+
+_state = threading.local()
+
+
+def profile_dir(dbname):
+    """
+    Returns:
+        str: Directorio de los perfiles de la BD (se crea si no existe)
+    """
+    base = settings.PROFILING_DIR or os.path.join(config['data_dir'], 'renaix_api_profiles')
+    path = os.path.join(base, dbname)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def generate_token(minutes=None):
+    """
+    Genera un token de perfilado firmado con la clave JWT.
+
+    Args:
+        minutes (int): Validez (por defecto settings.PROFILING_TOKEN_MINUTES)
+
+    Returns:
+        str: Token para la cabecera settings.PROFILING_HEADER
+    """
+    minutes = minutes or settings.PROFILING_TOKEN_MINUTES
+    payload = {
+        'type': 'profile',
+        'exp': datetime.utcnow() + timedelta(minutes=minutes),
+        'iat': datetime.utcnow(),
+    }
+    return jwt.encode(payload, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+
+def _valid_token(token):
+    try:
+        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+    except jwt.InvalidTokenError:
+        return False
+    return payload.get('type') == 'profile'
+
+
+def prepare(rule=None):
+    """
+    Decide si la petición actual se perfila (se llama en _pre_dispatch).
+
+    Args:
+        rule: Regla de werkzeug de la ruta despachada
+    """
+    _state.reason = None
+    if not settings.PROFILING_ENABLED or not request.httprequest.path.startswith(timing.API_PREFIX):
+        return
+    route = rule.rule if rule is not None else request.httprequest.path
+    token = request.httprequest.headers.get(settings.PROFILING_HEADER)
+    if token and _valid_token(token):
+        _state.reason = 'cabecera'
+    elif random.random() < settings.PROFILING_SAMPLE_RATES.get(route, 0):
+        _state.reason = 'muestreo'
+    _state.route = route
+
+
+@contextlib.contextmanager
+def profiling():
+    """
+    Perfila el bloque si prepare() lo ha decidido.
+
+    Yields:
+        dict: El llamador guarda la respuesta en ['response']
+    """
+    reason = getattr(_state, 'reason', None)
+    _state.reason = None
+    result = {'response': None}
+    if not reason:
+        yield result
+        return
+
+    queries = []
+
+    def query_hook(cr, query, params, start, delay):
+        queries.append((str(getattr(query, 'code', query)), delay * 1000))
+
+    thread = threading.current_thread()
+    previous_hooks = getattr(thread, 'query_hooks', None)
+    thread.query_hooks = list(previous_hooks or ()) + [query_hook]
+
+    profile = cProfile.Profile()
+    t0 = time.perf_counter()
+    try:
+        profile.enable()
+    except ValueError as e:
+        # Otro perfilador activo en el hilo (depurador, Odoo profiler...)
+        _logger.warning(f'No se puede perfilar la petición: {str(e)}')
+        profile = None
+    try:
+        yield result
+    finally:
+        if profile is not None:
+            profile.disable()
+        duration_ms = (time.perf_counter() - t0) * 1000
+        if previous_hooks is None:
+            del thread.query_hooks
+        else:
+            thread.query_hooks = previous_hooks
+
+        if profile is not None and (reason == 'cabecera' or duration_ms >= settings.PROFILING_MIN_MS):
+            try:
+                _store(profile, queries, reason, duration_ms, result['response'])
+            except Exception as e:
+                _logger.error(f'Error al guardar el perfil: {str(e)}')
+
+
+def _summary(profile):
+    stream = io.StringIO()
+    pstats.Stats(profile, stream=stream).strip_dirs().sort_stats('cumulative').print_stats(SUMMARY_LINES)
+    return stream.getvalue()
+
+
+def _sql_log(queries):
+    lines = [f'{len(queries)} consultas, {sum(ms for _sql, ms in queries):.1f} ms']
+    for sql, ms in sorted(queries, key=lambda q: -q[1]):
+        lines.append(f'{ms:9.2f} ms  {" ".join(sql.split())[:1000]}')
+    return '\n'.join(lines)
+
+
+def _store(profile, queries, reason, duration_ms, response):
+    """Guarda el .prof en disco y lo indexa (en un cursor propio)"""
+    dbname = request.db
+    path = os.path.join(
+        profile_dir(dbname), f'{datetime.utcnow():%Y%m%d%H%M%S}_{uuid.uuid4().hex[:8]}.prof'
+    )
+    profile.dump_stats(path)
+
+    with request.env.registry.cursor() as cr:
+        env = request.env(cr=cr, su=True)
+        env['renaix_api.perfil'].create({
+            'ruta': _state.route,
+            'metodo': request.httprequest.method,
+            'url': request.httprequest.full_path[:2000],
+            'estado_http': getattr(response, 'status_code', 500),
+            'motivo': reason,
+            'duracion_ms': duration_ms,
+            'consultas': len(queries),
+            'tiempo_sql_ms': sum(ms for _sql, ms in queries),
+            'partner_id': timing.get_partner_id(),
+            'archivo': path,
+            'resumen': _summary(profile),
+            'sql_log': _sql_log(queries),
+        })._rotar()
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Rate limiting por usuario o IP (token bucket compartido entre workers)
+
+El estado de cada bucket vive en una tabla UNLOGGED de PostgreSQL, de modo
+que todos los workers prefork comparten los mismos contadores. Se usa un
+cursor propio con una transacción corta para no bloquear la fila durante
+toda la transacción de la petición.
+"""
+
+import functools
+import logging
+import math
+import random
+
+import jwt
+from odoo.http import request
+from odoo.sql_db import db_connect
+from ...config import settings
+from . import response_helpers, shared_tables
+
+_logger = logging.getLogger(__name__)
+
+TABLE_NAME = 'renaix_api_rate_limit'
+TABLE_COLUMNS = '''
+    bucket_key VARCHAR PRIMARY KEY,
+    tokens DOUBLE PRECISION NOT NULL,
+    allowed BOOLEAN NOT NULL DEFAULT TRUE,
+    updated_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'UTC')
+'''
+
+
+def _consume_token(cr, bucket_key, limit, period):
+    """
+    Recarga el bucket según el tiempo transcurrido y consume un token.
+
+    Todo se resuelve en un único UPSERT atómico, por lo que dos workers
+    que atienden al mismo cliente nunca ven un estado intermedio.
+
+    Args:
+        cr: Cursor de base de datos (transacción propia)
+        bucket_key (str): Clave del bucket (grupo + usuario/IP)
+        limit (int): Capacidad del bucket
+        period (int): Segundos para recargar el bucket completo
+
+    Returns:
+        tuple: (bool, float) - (permitida, tokens_restantes)
+    """
+    rate = float(limit) / period
+    refill = (
+        "LEAST(%(limit)s::float, b.tokens + GREATEST("
+        "EXTRACT(EPOCH FROM ((now() AT TIME ZONE 'UTC') - b.updated_at)), 0) * %(rate)s::float)"
+    )
+    cr.execute(f"""
+        INSERT INTO {TABLE_NAME} AS b (bucket_key, tokens, allowed, updated_at)
+        VALUES (%(key)s, %(limit)s - 1, TRUE, now() AT TIME ZONE 'UTC')
+        ON CONFLICT (bucket_key) DO UPDATE SET
+            tokens = CASE WHEN {refill} >= 1 THEN {refill} - 1 ELSE {refill} END,
+            allowed = {refill} >= 1,
+            updated_at = now() AT TIME ZONE 'UTC'
+        RETURNING allowed, tokens
+    """, {'key': bucket_key, 'limit': limit, 'rate': rate})
+    allowed, tokens = cr.fetchone()
+
+    # Limpieza ocasional de buckets inactivos (ya estarían llenos)
+    if random.random() < 0.001:
+        cr.execute(
+            f"DELETE FROM {TABLE_NAME} WHERE updated_at < (now() AT TIME ZONE 'UTC') - interval '1 day'"
+        )
+
+    return allowed, tokens
+
+
+def get_client_key(http_request, group):
+    """
+    Obtiene la clave del cliente: ID de usuario del JWT o IP remota.
+
+    El token solo se decodifica (firma y expiración), sin consultar la BD:
+    la verificación completa la sigue haciendo cada endpoint.
+
+    Args:
+        http_request: Request HTTP de Odoo
+        group (str): Grupo de rutas
+
+    Returns:
+        str: Clave del cliente ('user:<id>' o 'ip:<dirección>')
+    """
+    # En las rutas de autenticación se limita siempre por IP (fuerza bruta)
+    if group != 'auth':
+        auth_header = http_request.httprequest.headers.get('Authorization') or ''
+        parts = auth_header.split()
+        if len(parts) == 2 and parts[0].lower() == 'bearer':
+            try:
+                payload = jwt.decode(
+                    parts[1],
+                    settings.JWT_SECRET_KEY,
+                    algorithms=[settings.JWT_ALGORITHM]
+                )
+                if payload.get('type') == 'access' and payload.get('user_id'):
+                    return f"user:{payload['user_id']}"
+            except jwt.InvalidTokenError:
+                pass
+
+    return f'ip:{http_request.httprequest.remote_addr or "unknown"}'
+
+
+def _apply_headers(response, limit, period, remaining, retry_after=None):
+    """
+    Añade las cabeceras estándar RateLimit-* a la respuesta.
+
+    Args:
+        response: Respuesta HTTP
+        limit (int): Capacidad del bucket
+        period (int): Periodo de recarga en segundos
+        remaining (float): Tokens restantes
+        retry_after (int): Segundos a esperar (solo en 429)
+    """
+    rate = float(limit) / period
+    remaining = max(0.0, remaining)
+    reset = int(math.ceil((limit - remaining) / rate)) if remaining < limit else 0
+
+    response.headers['RateLimit-Limit'] = str(limit)
+    response.headers['RateLimit-Remaining'] = str(int(remaining))
+    response.headers['RateLimit-Reset'] = str(reset)
+    response.headers['RateLimit-Policy'] = f'{limit};w={period}'
+    if retry_after is not None:
+        response.headers['Retry-After'] = str(retry_after)
+
+
+def limit(group=None):
+    """
+    Decorador que aplica rate limiting a una ruta de la API.
+
+    Debe colocarse debajo de @http.route. Si la tabla compartida no está
+    disponible la petición se deja pasar (fail-open) y se registra un aviso.
+
+    Args:
+        group (str): Grupo de límites definido en settings.RATE_LIMITS
+
+    Returns:
+        function: Ruta decorada
+    """
+    group = group or settings.RATE_LIMIT_DEFAULT_GROUP
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            config = settings.RATE_LIMITS.get(group)
+            if not settings.RATE_LIMIT_ENABLED or not config:
+                return func(*args, **kwargs)
+
+            limit_value = config['limit']
+            period = config['period']
+            bucket_key = f'{group}:{get_client_key(request, group)}'
+
+            try:
+                with db_connect(request.env.cr.dbname).cursor() as cr:
+                    shared_tables.ensure_table(cr, TABLE_NAME, TABLE_COLUMNS)
+                    allowed, remaining = _consume_token(cr, bucket_key, limit_value, period)
+            except Exception as e:
+                _logger.warning(f'Rate limit no disponible ({bucket_key}): {str(e)}')
+                return func(*args, **kwargs)
+
+            if not allowed:
+                retry_after = int(math.ceil((1 - remaining) * period / float(limit_value)))
+                _logger.warning(f'Rate limit excedido: {bucket_key}')
+                response = response_helpers.too_many_requests_response(
+                    f'Demasiadas peticiones. Inténtalo de nuevo en {retry_after} segundos'
+                )
+                _apply_headers(response, limit_value, period, remaining, retry_after=retry_after)
+                return response
+
+            response = func(*args, **kwargs)
+            if hasattr(response, 'headers'):
+                _apply_headers(response, limit_value, period, remaining)
+            return response
+
+        return wrapper
+    return decorator
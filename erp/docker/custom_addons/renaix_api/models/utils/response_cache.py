@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+"""
+Caché de respuestas para endpoints públicos del catálogo
+
+Cada worker guarda en memoria (LRU + TTL) las respuestas ya codificadas y
+comprimidas, con la ruta y los query params normalizados como clave. Las
+entradas se invalidan cuando cambia la versión de alguno de los modelos de
+los que dependen (ver model_version.py):
+
+- En el worker que hace la escritura, justo después del commit.
+- En el resto de workers, mediante LISTEN/NOTIFY de PostgreSQL.
+
+El TTL acota el tiempo que una entrada puede quedar obsoleta si se pierde
+alguna notificación (por ejemplo, al reconectar el listener).
+"""
+
+import collections
+import functools
+import json
+import logging
+import os
+import select
+import threading
+import time
+
+from odoo.http import request
+from odoo.sql_db import db_connect
+from ...config import settings
+from . import json_encoder, model_version, timing
+
+_logger = logging.getLogger(__name__)
+
+# Canal de notificación (en la BD 'postgres', como el bus de Odoo)
+CHANNEL = 'renaix_api_cache'
+
+# Cabeceras de la respuesta que se guardan junto al cuerpo
+CACHED_HEADERS = ('Content-Type', 'Content-Encoding', 'Vary', 'ETag', 'Cache-Control')
+
+
+class ResponseCache:
+    """
+    Caché LRU con TTL e invalidación por modelo (segura entre hilos).
+    """
+
+    def __init__(self, max_entries=500):
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._lock = threading.RLock()
+        # Generación por (bd, modelo): cambia en cada invalidación
+        self._generations = collections.defaultdict(int)
+        self.stats = collections.Counter()
+
+    def get(self, key):
+        """
+        Devuelve una entrada vigente o None.
+
+        Args:
+            key (tuple): Clave normalizada
+
+        Returns:
+            dict: Entrada {'body', 'headers', 'status', 'models', 'expires'}
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            if entry['expires'] < time.monotonic():
+                del self._entries[key]
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry
+
+    def set(self, key, entry):
+        """
+        Guarda una entrada, expulsando las menos usadas si no caben.
+
+        Args:
+            key (tuple): Clave normalizada
+            entry (dict): Entrada a guardar
+        """
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self.stats['stores'] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: Copia de las generaciones de todos los modelos
+        """
+        with self._lock:
+            return dict(self._generations)
+
+    def generation(self, dbname, model_names, snapshot=None):
+        """
+        Generaciones de unos modelos, actuales o de una foto anterior.
+
+        Sirve para no guardar una respuesta calculada mientras otro
+        worker invalidaba alguno de sus modelos.
+
+        Args:
+            dbname (str): Base de datos
+            model_names (iterable): Modelos de los que depende la respuesta
+            snapshot (dict): Foto tomada con snapshot() (None = actuales)
+
+        Returns:
+            tuple: Generaciones
+        """
+        with self._lock:
+            generations = self._generations if snapshot is None else snapshot
+            return tuple(generations.get((dbname, m), 0) for m in model_names)
+
+    def invalidate(self, dbname, model_names):
+        """
+        Elimina las entradas que dependen de alguno de los modelos.
+
+        Args:
+            dbname (str): Base de datos
+            model_names (iterable): Modelos modificados
+        """
+        model_names = set(model_names)
+        with self._lock:
+            for model in model_names:
+                self._generations[(dbname, model)] += 1
+            stale = [
+                key for key, entry in self._entries.items()
+                if key[0] == dbname and entry['models'] & model_names
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.stats['invalidations'] += len(stale)
+
+    def clear(self):
+        """Vacía la caché e invalida todo lo que se esté calculando."""
+        with self._lock:
+            self._entries.clear()
+            for key in self._generations:
+                self._generations[key] += 1
+
+    def get_stats(self):
+        """
+        Contadores de uso de la caché en este worker.
+
+        Returns:
+            dict: hits, misses, stores, evictions, invalidations, entries...
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            lookups = stats.get('hits', 0) + stats.get('misses', 0)
+            stats.update({
+                'pid': os.getpid(),
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hit_ratio': round(stats.get('hits', 0) / lookups, 4) if lookups else None,
+            })
+            return stats
+
+
+_cache = ResponseCache(settings.RESPONSE_CACHE_MAX_ENTRIES)
+
+# Foto de las generaciones al empezar la petición (ver start())
+_state = threading.local()
+
+
+# ==================== INVALIDACIÓN ENTRE WORKERS ====================
+
+_listener_lock = threading.Lock()
+_listener_pid = None
+
+
+def _handle_notification(payload):
+    """
+    Procesa una notificación de cambio recibida de otro worker.
+
+    Args:
+        payload (str): JSON {'db', 'models', 'pid'}
+    """
+    try:
+        message = json.loads(payload)
+    except ValueError:
+        return
+    if message.get('pid') == os.getpid():
+        return  # Ya invalidado localmente
+    _cache.invalidate(message.get('db'), message.get('models') or [])
+
+
+def _listen_loop():
+    """
+    Hilo que escucha el canal de invalidación (reconecta si se cae).
+    """
+    while True:
+        try:
+            with db_connect('postgres').cursor() as cr:
+                conn = cr._cnx
+                cr.execute(f'LISTEN {CHANNEL}')
+                cr.commit()
+                # Lo cacheado mientras no escuchábamos puede estar obsoleto
+                _cache.clear()
+                while True:
+                    if select.select([conn], [], [], 60) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        _handle_notification(conn.notifies.pop(0).payload)
+        except Exception as e:
+            _logger.warning(f'Listener de caché desconectado: {str(e)}')
+            _cache.clear()
+            time.sleep(5)
+
+
+def _ensure_listener():
+    """
+    Arranca el hilo listener en este proceso (una vez por worker).
+    """
+    global _listener_pid
+    if _listener_pid == os.getpid():
+        return
+    with _listener_lock:
+        if _listener_pid == os.getpid():
+            return
+        # Tras un fork el caché heredado del padre no está escuchando
+        _cache.clear()
+        thread = threading.Thread(target=_listen_loop, name='renaix_api.cache_listener', daemon=True)
+        thread.start()
+        _listener_pid = os.getpid()
+
+
+@model_version.register_listener
+def _on_versions_changed(dbname, model_names):
+    """
+    Invalida la caché local y avisa al resto de workers.
+
+    Args:
+        dbname (str): Base de datos
+        model_names (list): Modelos modificados
+    """
+    _cache.invalidate(dbname, model_names)
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return
+    payload = json.dumps({'db': dbname, 'models': list(model_names), 'pid': os.getpid()})
+    with db_connect('postgres').cursor() as cr:
+        cr.execute('SELECT pg_notify(%s, %s)', [CHANNEL, payload])
+
+
+# ==================== DECORADOR ====================
+
+def start():
+    """
+    Toma la foto de las generaciones antes de la primera sentencia de la
+    petición (se llama al principio de _pre_dispatch).
+
+    La respuesta se calcula con la foto de la BD (REPEATABLE READ) que
+    toma esa primera sentencia. Si la foto de las generaciones se tomara
+    después, una invalidación llegada entre ambas no se detectaría y se
+    guardaría una respuesta obsoleta durante todo el TTL.
+    """
+    _state.generations = None
+    if not settings.RESPONSE_CACHE_ENABLED or not request.db:
+        return
+    if not request.httprequest.path.startswith(timing.API_PREFIX):
+        return
+    _ensure_listener()
+    _state.generations = _cache.snapshot()
+
+
+def make_key(http_request, encoding):
+    """
+    Construye la clave de caché de una petición.
+
+    Args:
+        http_request: Request HTTP de Odoo
+        encoding (str): Compresión que se usará en la respuesta
+
+    Returns:
+        tuple: (bd, ruta, params normalizados, compresión)
+    """
+    query = tuple(sorted(
+        (name, value.strip())
+        for name, value in http_request.httprequest.args.items(multi=True)
+        if value.strip()
+    ))
+    return (http_request.env.cr.dbname, http_request.httprequest.path, query, encoding)
+
+
+def cached(name, depends):
+    """
+    Decorador que cachea la respuesta de un GET público.
+
+    Debe colocarse debajo de @http.route (y de etag.conditional si se usa,
+    para que los 304 no pasen por la caché).
+
+    Args:
+        name (str): Nombre del endpoint en settings.RESPONSE_CACHE_TTLS
+        depends (iterable): Modelos de los que depende la respuesta
+
+    Returns:
+        function: Ruta decorada
+    """
+    depends = tuple(depends)
+    depends_set = frozenset(depends)
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            ttl = settings.RESPONSE_CACHE_TTLS.get(name)
+            if not settings.RESPONSE_CACHE_ENABLED or not ttl or request.httprequest.method != 'GET':
+                return func(*args, **kwargs)
+
+            _ensure_listener()
+
+            encoding = None
+            if settings.COMPRESSION_ENABLED:
+                encoding = json_encoder.select_encoding(request.httprequest.headers.get('Accept-Encoding'))
+            key = make_key(request, encoding)
+
+            entry = _cache.get(key)
+            if entry is not None:
+                response = request.make_response(entry['body'], headers=entry['headers'], status=entry['status'])
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            generation = _cache.generation(key[0], depends, getattr(_state, 'generations', None))
+            response = func(*args, **kwargs)
+
+            if getattr(response, 'status_code', None) == 200:
+                body = response.get_data()
+                if len(body) <= settings.RESPONSE_CACHE_MAX_BODY and _cache.generation(key[0], depends) == generation:
+                    _cache.set(key, {
+                        'body': body,
+                        'headers': [(h, response.headers[h]) for h in CACHED_HEADERS if h in response.headers],
+                        'status': 200,
+                        'models': depends_set,
+                        'expires': time.monotonic() + ttl,
+                    })
+                response.headers['X-Cache'] = 'MISS'
+            return response
+
+        return wrapper
+    return decorator
+
+
+def get_stats():
+    """
+    Contadores de la caché de este worker.
+
+    Returns:
+        dict: Estadísticas de uso
+    """
+    return _cache.get_stats()
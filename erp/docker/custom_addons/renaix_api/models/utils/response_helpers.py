@@ -3,8 +3,45 @@
 Helpers para respuestas HTTP estandarizadas
 """
 
-import json
 from odoo.http import request
+from ...config import settings
+from . import json_encoder, timing
+
+
+def json_response(data, status=200):
+    """
+    Construye una respuesta HTTP JSON (orjson si está disponible) y la
+    comprime con gzip/brotli cuando el cliente lo acepta y el cuerpo
+    supera settings.COMPRESSION_MIN_SIZE.
+    
+    Args:
+        data: Datos a devolver (dict, list, etc.)
+        status: Código HTTP (default: 200)
+    
+    Returns:
+        Response: Respuesta HTTP JSON
+    """
+    accept_encoding = None
+    if settings.COMPRESSION_ENABLED:
+        accept_encoding = request.httprequest.headers.get('Accept-Encoding')
+    
+    with timing.phase('encode'):
+        body, encoding = json_encoder.encode_body(
+            data,
+            accept_encoding=accept_encoding,
+            min_size=settings.COMPRESSION_MIN_SIZE,
+            gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+            brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        )
+    
+    headers = [
+        ('Content-Type', 'application/json; charset=utf-8'),
+        ('Vary', 'Accept-Encoding'),
+    ]
+    if encoding:
+        headers.append(('Content-Encoding', encoding))
+    
+    return request.make_response(body, headers=headers, status=status)
 
 
 def success_response(data=None, message='Operación exitosa', status=200):
@@ -27,7 +64,7 @@ def success_response(data=None, message='Operación exitosa', status=200):
     if data is not None:
         response_data['data'] = data
     
-    return request.make_json_response(response_data, status=status)
+    return json_response(response_data, status=status)
 
 
 def error_response(error='Error en la operación', code='ERROR', status=400):
@@ -48,7 +85,8 @@ def error_response(error='Error en la operación', code='ERROR', status=400):
         'code': code
     }
     
-    return request.make_json_response(response_data, status=status)
+    timing.set_error_code(code)
+    return json_response(response_data, status=status)
 
 
 def paginated_response(items, total, page=1, limit=20, message='Datos recuperados'):
@@ -81,7 +119,25 @@ def paginated_response(items, total, page=1, limit=20, message='Datos recuperado
         }
     }
     
-    return request.make_json_response(response_data, status=200)
+    return json_response(response_data, status=200)
+
+
+def not_modified_response(etag):
+    """
+    Respuesta 304 Not Modified (sin cuerpo).
+    
+    Args:
+        etag: ETag vigente del recurso
+    
+    Returns:
+        Response: Respuesta 304
+    """
+    headers = [
+        ('ETag', etag),
+        ('Cache-Control', 'no-cache'),
+        ('Vary', 'Accept-Encoding'),
+    ]
+    return request.make_response(b'', headers=headers, status=304)
 
 
 def unauthorized_response(message='No autorizado'):
@@ -167,3 +223,54 @@ def server_error_response(message='Error interno del servidor'):
         code='INTERNAL_ERROR',
         status=500
     )
+
+
+def too_many_requests_response(message='Demasiadas peticiones'):
+    """
+    Respuesta HTTP 429 Too Many Requests.
+    
+    Args:
+        message: Mensaje de error
+    
+    Returns:
+        Response: Respuesta HTTP JSON 429
+    """
+    return error_response(
+        error=message,
+        code='RATE_LIMITED',
+        status=429
+    )
+
+
+def payload_too_large_response(message='El cuerpo de la petición es demasiado grande'):
+    """
+    Respuesta HTTP 413 Payload Too Large.
+    
+    Args:
+        message: Mensaje de error
+    
+    Returns:
+        Response: Respuesta HTTP JSON 413
+    """
+    return error_response(
+        error=message,
+        code='PAYLOAD_TOO_LARGE',
+        status=413
+    )
+
+
+def conflict_response(message='Conflicto con el estado actual del recurso'):
+    """
+    Respuesta HTTP 409 Conflict.
+    
+    Args:
+        message: Mensaje de error
+    
+    Returns:
+        Response: Respuesta HTTP JSON 409
+    """
+    return error_response(
+        error=message,
+        code='CONFLICT',
+        status=409
+    )
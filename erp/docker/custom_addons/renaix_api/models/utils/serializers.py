@@ -30,12 +30,22 @@ def serialize_partner(partner, full=False):
             'mobile': partner.mobile or '',
             'partner_gid': partner.partner_gid,
             'valoracion_promedio': round(partner.valoracion_promedio, 2),
+            'total_valoraciones': partner.valoracion_count,
+            # Histograma de estrellas (columnas del propio partner, sin consultas extra)
+            'distribucion_valoraciones': {
+                '1': partner.valoraciones_1,
+                '2': partner.valoraciones_2,
+                '3': partner.valoraciones_3,
+                '4': partner.valoraciones_4,
+                '5': partner.valoraciones_5,
+            },
             'productos_en_venta': partner.productos_en_venta,
             'productos_vendidos': partner.productos_vendidos,
             'productos_comprados': partner.productos_comprados,
             'total_comentarios': partner.total_comentarios,
             'fecha_registro_app': partner.fecha_registro_app.isoformat() if partner.fecha_registro_app else None,
-            'image_url': f'/api/v1/usuarios/{partner.id}/imagen' if partner.image_1920 else None,
+            'image_url': f'/api/v1/usuarios/{partner.id}/imagen?v={partner.image_checksum}' if partner.has_image else None,
+            'imagen_estado': partner.estado_procesado,
         })
     
     return data
@@ -59,8 +69,10 @@ def serialize_categoria(categoria):
         'nombre': categoria.name,
         'descripcion': categoria.descripcion or '',
         'producto_count': categoria.producto_count,
-        # URL de la imagen
-        'imagen_url': f'/web/image/renaix.categoria/{categoria.id}/image' if categoria.image else None,
+        'producto_disponible_count': categoria.producto_disponible_count,
+        # URL de la imagen (versionada: cambia con cada imagen nueva)
+        'imagen_url': f'/web/image/renaix.categoria/{categoria.id}/image?unique={categoria.image_checksum}'
+                      if categoria.has_image else None,
     }
 
 
@@ -81,6 +93,7 @@ def serialize_etiqueta(etiqueta):
         'id': etiqueta.id,
         'nombre': etiqueta.name,
         'producto_count': etiqueta.producto_count,
+        'producto_disponible_count': etiqueta.producto_disponible_count,
         'color': etiqueta.color,
     }
 
@@ -104,10 +117,127 @@ def serialize_producto_imagen(imagen):
         'es_principal': imagen.es_principal,
         'descripcion': imagen.descripcion or '',
         'secuencia': imagen.secuencia,
+        'estado': imagen.estado_procesado,  # procesando | lista | error
     }
 
 
-def serialize_producto(producto, include_images=True, include_comentarios=False, include_propietario_full=False):
+# ==================== FIELDSETS DE PRODUCTO ====================
+
+# Campos simples: clave JSON -> (campos ORM que hay que leer, valor)
+PRODUCTO_FIELDS = {
+    'id': ((), lambda p: p.id),
+    'nombre': (('name',), lambda p: p.name),
+    'descripcion': (('descripcion',), lambda p: p.descripcion or ''),
+    'precio': (('precio',), lambda p: p.precio),
+    'estado_producto': (('estado_producto',), lambda p: p.estado_producto),
+    'estado_venta': (('estado_venta',), lambda p: p.estado_venta),
+    'antiguedad': (('antiguedad',), lambda p: p.antiguedad or ''),
+    'ubicacion': (('ubicacion',), lambda p: p.ubicacion or ''),
+    'fecha_publicacion': (('fecha_publicacion',), lambda p: p.fecha_publicacion.isoformat() if p.fecha_publicacion else None),
+    'fecha_actualizacion': (('fecha_actualizacion',), lambda p: p.fecha_actualizacion.isoformat() if p.fecha_actualizacion else None),
+    'dias_publicado': (('fecha_publicacion',), lambda p: p.dias_publicado),
+    'total_comentarios': (('total_comentarios',), lambda p: p.total_comentarios),
+    'total_denuncias': (('total_denuncias',), lambda p: p.total_denuncias),
+}
+
+# Relaciones que se pueden embeber: nombre -> campo ORM
+PRODUCTO_EMBEDS = {
+    'propietario': 'propietario_id',
+    'categoria': 'categoria_id',
+    'etiquetas': 'etiqueta_ids',
+    'imagenes': 'imagen_ids',
+    'imagen_principal': 'imagen_ids',
+    'comentarios': 'comentario_ids',
+}
+
+# Campos ORM que leen los serializers de las relaciones
+PARTNER_BASIC_FIELDS = ['name', 'email']
+PARTNER_FULL_FIELDS = PARTNER_BASIC_FIELDS + [
+    'phone', 'mobile', 'partner_gid', 'valoracion_promedio', 'valoracion_count',
+    'valoraciones_1', 'valoraciones_2', 'valoraciones_3', 'valoraciones_4', 'valoraciones_5',
+    'productos_en_venta', 'productos_vendidos', 'productos_comprados', 'total_comentarios',
+    'fecha_registro_app', 'estado_procesado', 'has_image', 'image_checksum',
+]
+CATEGORIA_FIELDS = ['name', 'descripcion', 'producto_count', 'producto_disponible_count',
+                    'has_image', 'image_checksum']
+ETIQUETA_FIELDS = ['name', 'producto_count', 'producto_disponible_count', 'color']
+IMAGEN_FIELDS = ['es_principal', 'descripcion', 'secuencia', 'estado_procesado']
+COMENTARIO_FIELDS = ['texto', 'fecha', 'active', 'usuario_id', 'producto_id', 'producto_nombre']
+
+
+def resolve_producto_fieldset(fields=None, embed=None, include_images=True, include_comentarios=False):
+    """
+    Calcula qué campos y relaciones se serializan de un producto.
+    
+    Sin fields ni embed se devuelve la salida completa de siempre. Con
+    fields solo se incluyen esos campos (los nombres de relación que
+    aparezcan en fields se tratan como embed). Con embed se incluyen
+    exactamente esas relaciones.
+    
+    Args:
+        fields (list): Claves JSON pedidas (None = todas)
+        embed (list): Relaciones a embeber (None = según include_*)
+        include_images: Embeber imágenes por defecto
+        include_comentarios: Embeber comentarios por defecto
+    
+    Returns:
+        tuple: (list, list) - (campos, relaciones) en el orden de salida
+    """
+    if fields is None and embed is None:
+        embeds = {'propietario', 'categoria', 'etiquetas'}
+        if include_images:
+            embeds.add('imagenes')
+        if include_comentarios:
+            embeds.add('comentarios')
+        return list(PRODUCTO_FIELDS), [e for e in PRODUCTO_EMBEDS if e in embeds]
+    
+    requested = set(fields or ())
+    embeds = set(embed or ()) | (requested & set(PRODUCTO_EMBEDS))
+    campos = list(PRODUCTO_FIELDS) if fields is None else [c for c in PRODUCTO_FIELDS if c in requested]
+    return campos, [e for e in PRODUCTO_EMBEDS if e in embeds]
+
+
+def prefetch_productos(productos, fields=None, embed=None, include_images=True,
+                       include_comentarios=False, include_propietario_full=False):
+    """
+    Lee de una vez solo las columnas que se van a serializar.
+    
+    El prefetch se limita a los productos recibidos (normalmente una
+    página) para no cargar columnas de todo el resultado de la búsqueda.
+    
+    Args:
+        productos: Recordset de renaix.producto
+        fields, embed, include_*: Igual que en serialize_producto
+    
+    Returns:
+        Recordset: Los mismos productos, listos para serializar
+    """
+    productos = productos.with_prefetch()
+    if not productos:
+        return productos
+    
+    campos, embeds = resolve_producto_fieldset(fields, embed, include_images, include_comentarios)
+    fnames = {fname for campo in campos for fname in PRODUCTO_FIELDS[campo][0]}
+    fnames.update(PRODUCTO_EMBEDS[e] for e in embeds)
+    productos.fetch(list(fnames))
+    
+    if 'propietario' in embeds:
+        productos.propietario_id.fetch(PARTNER_FULL_FIELDS if include_propietario_full else PARTNER_BASIC_FIELDS)
+    if 'categoria' in embeds:
+        productos.categoria_id.fetch(CATEGORIA_FIELDS)
+    if 'etiquetas' in embeds:
+        productos.etiqueta_ids.fetch(ETIQUETA_FIELDS)
+    if 'imagenes' in embeds or 'imagen_principal' in embeds:
+        productos.imagen_ids.fetch(IMAGEN_FIELDS)
+    if 'comentarios' in embeds:
+        productos.comentario_ids.fetch(COMENTARIO_FIELDS)
+        productos.comentario_ids.usuario_id.fetch(PARTNER_BASIC_FIELDS)
+    
+    return productos
+
+
+def serialize_producto(producto, include_images=True, include_comentarios=False, include_propietario_full=False,
+                       fields=None, embed=None):
     """
     Serializa un producto a JSON.
     
@@ -116,6 +246,8 @@ def serialize_producto(producto, include_images=True, include_comentarios=False,
         include_images: Si True, incluye las imágenes
         include_comentarios: Si True, incluye los comentarios
         include_propietario_full: Si True, incluye info completa del propietario
+        fields (list): Claves a incluir (ver resolve_producto_fieldset)
+        embed (list): Relaciones a embeber (ver PRODUCTO_EMBEDS)
     
     Returns:
         dict: Producto serializado
@@ -123,34 +255,72 @@ def serialize_producto(producto, include_images=True, include_comentarios=False,
     if not producto:
         return None
     
-    data = {
-        'id': producto.id,
-        'nombre': producto.name,
-        'descripcion': producto.descripcion or '',
-        'precio': producto.precio,
-        'estado_producto': producto.estado_producto,
-        'estado_venta': producto.estado_venta,
-        'antiguedad': producto.antiguedad or '',
-        'ubicacion': producto.ubicacion or '',
-        'fecha_publicacion': producto.fecha_publicacion.isoformat() if producto.fecha_publicacion else None,
-        'fecha_actualizacion': producto.fecha_actualizacion.isoformat() if producto.fecha_actualizacion else None,
-        'dias_publicado': producto.dias_publicado,
-        'total_comentarios': producto.total_comentarios,
-        'total_denuncias': producto.total_denuncias,
-        'propietario': serialize_partner(producto.propietario_id, full=include_propietario_full),
-        'categoria': serialize_categoria(producto.categoria_id),
-        'etiquetas': [serialize_etiqueta(e) for e in producto.etiqueta_ids],
-    }
+    campos, embeds = resolve_producto_fieldset(fields, embed, include_images, include_comentarios)
+    
+    data = {campo: PRODUCTO_FIELDS[campo][1](producto) for campo in campos}
+    
+    if 'propietario' in embeds:
+        data['propietario'] = serialize_partner(producto.propietario_id, full=include_propietario_full)
     
-    if include_images:
+    if 'categoria' in embeds:
+        data['categoria'] = serialize_categoria(producto.categoria_id)
+    
+    if 'etiquetas' in embeds:
+        data['etiquetas'] = [serialize_etiqueta(e) for e in producto.etiqueta_ids]
+    
+    if 'imagenes' in embeds:
         data['imagenes'] = [serialize_producto_imagen(img) for img in producto.imagen_ids.sorted('secuencia')]
     
-    if include_comentarios:
+    if 'imagen_principal' in embeds:
+        imagenes = producto.imagen_ids.sorted('secuencia')
+        principal = imagenes.filtered('es_principal')[:1] or imagenes[:1]
+        data['imagen_principal'] = serialize_producto_imagen(principal)
+    
+    if 'comentarios' in embeds:
         data['comentarios'] = [serialize_comentario(c) for c in producto.comentario_ids.filtered(lambda x: x.active)]
     
     return data
 
 
+def serialize_productos(productos, include_images=True, include_comentarios=False, include_propietario_full=False,
+                        fields=None, embed=None):
+    """
+    Serializa una lista de productos leyendo solo las columnas necesarias.
+    
+    Args:
+        productos: Recordset de renaix.producto
+        (resto de argumentos igual que serialize_producto)
+    
+    Returns:
+        list: Productos serializados
+    """
+    options = {
+        'include_images': include_images,
+        'include_comentarios': include_comentarios,
+        'include_propietario_full': include_propietario_full,
+        'fields': fields,
+        'embed': embed,
+    }
+    productos = prefetch_productos(productos, **options)
+    return [serialize_producto(p, **options) for p in productos]
+
+
+def pick_fields(data, fields=None):
+    """
+    Reduce un dict serializado a las claves pedidas (fields=).
+    
+    Args:
+        data (dict): Objeto serializado
+        fields (list): Claves a conservar (None = todas)
+    
+    Returns:
+        dict: Objeto con solo las claves pedidas
+    """
+    if not data or fields is None:
+        return data
+    return {key: value for key, value in data.items() if key in fields}
+
+
 def serialize_comentario(comentario):
     """
     Serializa un comentario a JSON.
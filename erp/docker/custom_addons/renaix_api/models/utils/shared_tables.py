@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""
+Tablas de PostgreSQL compartidas entre los workers de la API
+
+rate_limit, metrics, sql_tagging y model_version guardan su estado en
+tablas propias que se crean la primera vez que se usan, desde un cursor
+con transacción corta. Las de estado descartable (buckets, métricas,
+sentencias por ruta) son UNLOGGED: no generan WAL y PostgreSQL las vacía
+tras una caída.
+"""
+
+# (BD, tabla) ya comprobadas en este proceso
+_tablas_creadas = set()
+
+
+def ensure_table(cr, name, columns, unlogged=True):
+    """
+    Crea la tabla si no existe (una vez por proceso, BD y tabla).
+
+    Args:
+        cr: Cursor de base de datos
+        name (str): Nombre de la tabla
+        columns (str): Columnas y restricciones de CREATE TABLE
+        unlogged (bool): Crearla UNLOGGED
+    """
+    if (cr.dbname, name) in _tablas_creadas:
+        return
+    cr.execute(f'CREATE {"UNLOGGED " if unlogged else ""}TABLE IF NOT EXISTS {name} ({columns})')
+    _tablas_creadas.add((cr.dbname, name))
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Normalización de sentencias SQL
+
+Quita comentarios, literales y parámetros para agrupar las sentencias que
+solo difieren en valores. La usan sql_tagging.py (sentencias por ruta),
+benchmarks/consultas_lentas.py (cruce con pg_stat_statements) y el
+contador de consultas de los tests.
+"""
+
+import re
+
+_COMENTARIOS = re.compile(r'/\*.*?\*/|--[^\n]*', re.S)
+_CADENAS = re.compile(r"'(?:[^']|'')*'")
+_LISTAS = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+_PARAMETROS = re.compile(r'%\(\w+\)s|%s|\$\d+')
+_NUMEROS = re.compile(r'(?<![\w"])-?\d+(?:\.\d+)?\b')
+_ESPACIOS = re.compile(r'\s+')
+# `IN %s` (tupla de psycopg2) llega a PostgreSQL como `IN ($1, $2, ...)`
+_IN_LISTA = re.compile(r'\bIN \(\?\)', re.I)
+
+
+def normalize_sql(query):
+    """
+    Normaliza una sentencia SQL para agrupar las que solo difieren en valores.
+
+    Da el mismo resultado para la sentencia que recibe cursor.execute
+    (%s) y para su texto en pg_stat_statements ($1).
+
+    Args:
+        query (str|SQL|bytes): Sentencia tal como llega a cursor.execute
+
+    Returns:
+        str: Sentencia sin comentarios, literales ni parámetros
+    """
+    query = getattr(query, 'code', query)
+    if isinstance(query, bytes):
+        query = query.decode('utf-8', 'replace')
+    query = _COMENTARIOS.sub(' ', query)
+    query = _CADENAS.sub('?', query)
+    query = _PARAMETROS.sub('?', query)
+    query = _NUMEROS.sub('?', query)
+    query = _LISTAS.sub('(?)', query)
+    query = _ESPACIOS.sub(' ', query).strip()
+    return _IN_LISTA.sub('IN ?', query)
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Etiquetado de las consultas SQL con la ruta de la API
+
+- Cada petición /api/v1/ pone application_name = 'renaix_api <MÉTODO> <ruta>'
+  en su transacción (set_config local: se restablece al hacer commit). Así
+  la ruta aparece en pg_stat_activity y en el log de consultas lentas de
+  PostgreSQL (con %a en log_line_prefix) o en auto_explain.
+- Una muestra de las peticiones (settings.SQL_ROUTE_SAMPLE_RATE) anota sus
+  sentencias normalizadas, con llamadas y tiempo, en la tabla UNLOGGED
+  renaix_api_sql_route. pg_stat_statements no distingue por
+  application_name, así que benchmarks/consultas_lentas.py usa esta tabla
+  para repartir sus sentencias entre las rutas.
+"""
+
+import contextlib
+import logging
+import random
+import threading
+import time
+
+from odoo.http import request
+from odoo.sql_db import db_connect
+from ...config import settings
+from . import shared_tables, timing
+from .sql_normalize import normalize_sql
+
+_logger = logging.getLogger(__name__)
+
+TABLE_NAME = 'renaix_api_sql_route'
+TABLE_COLUMNS = '''
+    route VARCHAR NOT NULL,
+    statement TEXT NOT NULL,
+    calls BIGINT NOT NULL DEFAULT 0,
+    total_ms DOUBLE PRECISION NOT NULL DEFAULT 0,
+    max_ms DOUBLE PRECISION NOT NULL DEFAULT 0,
+    PRIMARY KEY (route, statement)
+'''
+
+# Longitud máxima de application_name en PostgreSQL (NAMEDATALEN - 1)
+APPLICATION_NAME_MAX = 63
+
+_state = threading.local()
+_lock = threading.Lock()
+_pending = {}
+_last_flush = {}
+
+
+def _remove_hook():
+    hook = getattr(_state, 'hook', None)
+    _state.hook = None
+    if hook is None:
+        return
+    thread = threading.current_thread()
+    hooks = getattr(thread, 'query_hooks', None)
+    if hooks and hook in hooks:
+        hooks.remove(hook)
+
+
+def start(rule=None):
+    """
+    Etiqueta la transacción de la petición y decide si se anotan sus
+    sentencias (se llama en _pre_dispatch).
+
+    Args:
+        rule: Regla de werkzeug de la ruta despachada
+    """
+    _remove_hook()
+    _state.queries = None
+    if not request.db or not request.httprequest.path.startswith(timing.API_PREFIX):
+        return
+
+    route = f'{request.httprequest.method} {rule.rule if rule is not None else request.httprequest.path}'
+
+    if settings.SQL_ROUTE_TAGGING:
+        request.env.cr.execute(
+            "SELECT set_config('application_name', %s, true)",
+            [f'renaix_api {route}'[:APPLICATION_NAME_MAX]]
+        )
+
+    if random.random() < settings.SQL_ROUTE_SAMPLE_RATE:
+        _state.queries = []
+        _state.route = route
+
+
+@contextlib.contextmanager
+def recording():
+    """
+    Anota las sentencias del bloque si start() lo ha decidido (envuelve
+    IrHttp._dispatch).
+
+    Odoo no llama a _post_dispatch si el endpoint lanza una excepción: el
+    hook se quita aquí pase lo que pase, para que no siga anotando lo que
+    ejecute después el hilo (otras peticiones, crons).
+    """
+    queries = getattr(_state, 'queries', None)
+    if queries is None:
+        yield
+        return
+
+    def hook(cr, query, params, start, delay):
+        queries.append((getattr(query, 'code', query), delay * 1000))
+
+    thread = threading.current_thread()
+    thread.query_hooks = list(getattr(thread, 'query_hooks', None) or ()) + [hook]
+    _state.hook = hook
+    try:
+        yield
+    except BaseException:
+        _state.queries = None
+        raise
+    finally:
+        _remove_hook()
+
+
+def finish():
+    """Acumula las sentencias anotadas de la petición (en _post_dispatch)"""
+    queries = getattr(_state, 'queries', None)
+    _state.queries = None
+    if not queries:
+        return
+    dbname = request.db
+    with _lock:
+        for query, ms in queries:
+            key = (dbname, _state.route, normalize_sql(query))
+            calls, total, maximum = _pending.get(key, (0, 0.0, 0.0))
+            _pending[key] = (calls + 1, total + ms, max(maximum, ms))
+
+    if time.monotonic() - _last_flush.get(dbname, 0) >= settings.METRICS_FLUSH_INTERVAL:
+        flush(dbname)
+
+
+def flush(dbname):
+    """
+    Suma en la tabla compartida las sentencias pendientes de este worker.
+
+    Si la tabla no está disponible las sentencias se conservan para el
+    siguiente intento.
+
+    Args:
+        dbname (str): Base de datos
+    """
+    with _lock:
+        _last_flush[dbname] = time.monotonic()
+        rows = sorted((key[1], key[2]) + value for key, value in _pending.items() if key[0] == dbname)
+        for row in rows:
+            del _pending[(dbname, row[0], row[1])]
+    if not rows:
+        return
+
+    try:
+        with db_connect(dbname).cursor() as cr:
+            shared_tables.ensure_table(cr, TABLE_NAME, TABLE_COLUMNS)
+            cr.execute(f"""
+                INSERT INTO {TABLE_NAME} AS s (route, statement, calls, total_ms, max_ms)
+                SELECT * FROM unnest(%s::varchar[], %s::text[], %s::bigint[], %s::float8[], %s::float8[])
+                ON CONFLICT (route, statement) DO UPDATE SET
+                    calls = s.calls + EXCLUDED.calls,
+                    total_ms = s.total_ms + EXCLUDED.total_ms,
+                    max_ms = GREATEST(s.max_ms, EXCLUDED.max_ms)
+            """, [list(column) for column in zip(*rows)])
+    except Exception as e:
+        _logger.warning(f'No se han podido volcar las sentencias por ruta: {str(e)}')
+        with _lock:
+            for route, statement, calls, total, maximum in rows:
+                key = (dbname, route, statement)
+                prev_calls, prev_total, prev_max = _pending.get(key, (0, 0.0, 0.0))
+                _pending[key] = (prev_calls + calls, prev_total + total, max(prev_max, maximum))
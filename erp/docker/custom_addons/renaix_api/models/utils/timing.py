@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+Tiempos por petición de la API (Server-Timing y log estructurado)
+
+ir_http.py abre la medición al despachar una ruta /api/v1/ y la cierra
+con la respuesta. Entre medias, cada fase suma su duración:
+
+- auth:      verificación del JWT (jwt_utils.verify_token)
+- serialize: serializers (modelo -> dict), incluidas sus lecturas
+- encode:    codificación JSON y compresión (response_helpers.json_response)
+- db:        tiempo en PostgreSQL de toda la petición (solapa con las demás)
+- app:       el resto (controlador, ORM fuera de los serializers, decoradores)
+
+La respuesta lleva una cabecera Server-Timing con esas fases. Además, una
+muestra de las peticiones (y todas las lentas o con error 5xx) se registra
+como una línea JSON en el logger de este módulo, y todas se agregan en
+metrics.py.
+"""
+
+import contextlib
+import functools
+import json
+import logging
+import random
+import threading
+import time
+
+from odoo.http import request
+from ...config import settings
+from . import metrics
+
+_logger = logging.getLogger(__name__)
+
+# Prefijo de las rutas que se miden
+API_PREFIX = '/api/v1/'
+
+# Fases que se suman explícitamente (el resto es 'app')
+PHASES = ('auth', 'serialize', 'encode')
+
+_state = threading.local()
+
+
+def _current():
+    return getattr(_state, 'timing', None)
+
+
+def _thread_queries():
+    """
+    Consultas y segundos en SQL del hilo (contadores que mantiene Odoo por
+    petición; si no existen se usa el contador del cursor).
+    """
+    thread = threading.current_thread()
+    if hasattr(thread, 'query_count'):
+        return thread.query_count, getattr(thread, 'query_time', 0.0)
+    return request.env.cr.sql_log_count, 0.0
+
+
+def start(rule=None):
+    """
+    Abre la medición de la petición actual (o la descarta si no es de la API).
+
+    Args:
+        rule: Regla de werkzeug de la ruta despachada (para el log)
+    """
+    _state.timing = None
+    if not (settings.TIMING_ENABLED or settings.METRICS_ENABLED):
+        return
+    if not request.httprequest.path.startswith(API_PREFIX):
+        return
+    queries, query_time = _thread_queries()
+    _state.timing = {
+        't0': time.perf_counter(),
+        'queries': queries,
+        'query_time': query_time,
+        'phases': dict.fromkeys(PHASES, 0.0),
+        'depth': dict.fromkeys(PHASES, 0),
+        'partner_id': None,
+        'error_code': None,
+        'route': rule.rule if rule is not None else request.httprequest.path,
+    }
+
+
+def set_partner(partner_id):
+    """Anota el usuario autenticado de la petición"""
+    timing = _current()
+    if timing is not None:
+        timing['partner_id'] = partner_id
+
+
+def get_partner_id():
+    """
+    Returns:
+        int: Usuario autenticado de la petición (o False)
+    """
+    timing = _current()
+    return (timing or {}).get('partner_id') or False
+
+
+def set_error_code(code):
+    """Anota el código de error de la respuesta (response_helpers.error_response)"""
+    timing = _current()
+    if timing is not None:
+        timing['error_code'] = code
+
+
+@contextlib.contextmanager
+def phase(name):
+    """
+    Suma la duración del bloque a la fase `name`.
+
+    Las llamadas anidadas a la misma fase (un serializer que llama a otro)
+    solo cuentan una vez.
+
+    Args:
+        name (str): Una de PHASES
+    """
+    timing = _current()
+    if timing is None or timing['depth'][name]:
+        yield
+        return
+    timing['depth'][name] += 1
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing['phases'][name] += time.perf_counter() - t0
+        timing['depth'][name] -= 1
+
+
+def timed(name):
+    """
+    Decorador equivalente a envolver la función en phase(name).
+
+    Args:
+        name (str): Una de PHASES
+
+    Returns:
+        function: Función decorada
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _server_timing(durations, queries):
+    parts = []
+    for name, ms in durations.items():
+        part = f'{name};dur={ms:.1f}'
+        if name == 'db':
+            part += f';desc="{queries} queries"'
+        parts.append(part)
+    return ', '.join(parts)
+
+
+def finish(response):
+    """
+    Cierra la medición: añade Server-Timing a la respuesta y registra la
+    línea de log si toca.
+
+    Args:
+        response (Response): Respuesta de la ruta
+    """
+    timing = _current()
+    _state.timing = None
+    if timing is None:
+        return
+
+    total = (time.perf_counter() - timing['t0']) * 1000
+    queries, query_time = _thread_queries()
+    queries -= timing['queries']
+    durations = {name: seconds * 1000 for name, seconds in timing['phases'].items()}
+    durations['db'] = (query_time - timing['query_time']) * 1000
+    durations['app'] = max(0.0, total - sum(durations[name] for name in PHASES))
+    durations['total'] = total
+
+    status = getattr(response, 'status_code', 200)
+    headers = getattr(response, 'headers', None)
+
+    if settings.METRICS_ENABLED:
+        metrics.observe(
+            request.db, timing['route'], request.httprequest.method, status,
+            total, durations['db'], queries,
+            error_code=timing['error_code'],
+            cache=headers.get('X-Cache') if headers is not None else None,
+        )
+
+    if not settings.TIMING_ENABLED:
+        return
+
+    if settings.TIMING_SERVER_HEADER and headers is not None:
+        headers['Server-Timing'] = _server_timing(durations, queries)
+
+    slow = total >= settings.TIMING_LOG_SLOW_MS
+    if slow or status >= 500 or random.random() < settings.TIMING_LOG_SAMPLE_RATE:
+        _logger.info('api_timing %s', json.dumps({
+            'method': request.httprequest.method,
+            'route': timing['route'],
+            'partner_id': timing['partner_id'],
+            'status': status,
+            'queries': queries,
+            'slow': slow,
+            **{f'{name}_ms': round(ms, 1) for name, ms in durations.items()},
+        }, separators=(',', ':')))
+
+
+def instrument(module, name, prefixes):
+    """
+    Envuelve en phase(name) las funciones públicas de un módulo cuyo nombre
+    empieza por alguno de los prefijos. Las llamadas internas del módulo
+    también pasan por la versión envuelta (se resuelven como globales).
+
+    Args:
+        module: Módulo a instrumentar
+        name (str): Una de PHASES
+        prefixes (tuple): Prefijos de las funciones
+    """
+    for attr in dir(module):
+        func = getattr(module, attr)
+        if attr.startswith(prefixes) and callable(func) and not hasattr(func, '__wrapped__'):
+            setattr(module, attr, timed(name)(func))
+
+
+# serializers.py no importa este módulo para seguir cargándose sin Odoo
+# (benchmarks/bench_serializers.py); se instrumenta desde aquí
+from . import serializers  # noqa: E402
+instrument(serializers, 'serialize', ('serialize_', 'prefetch_'))
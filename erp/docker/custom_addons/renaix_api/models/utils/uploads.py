@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+Subida de imágenes en binario
+
+- Subida directa: multipart/form-data (campo 'file') o cuerpo binario
+  (application/octet-stream, image/*). El cuerpo se vuelca por bloques a un
+  fichero temporal y se rechaza por Content-Length antes de leerlo: las
+  rutas de subida se declaran con upload=True en @http.route y
+  IrHttp._pre_dispatch las comprueba antes de que Odoo parsee el multipart.
+- Subida por partes reanudable: el cliente abre una sesión, envía partes
+  con Content-Range y puede consultar cuántos bytes se han recibido para
+  continuar tras un corte de red. Las partes se guardan en disco, así que
+  cualquier worker puede atender la siguiente.
+"""
+
+import fcntl
+import json
+import os
+import re
+import secrets
+import tempfile
+import time
+
+from odoo.tools import config
+from ...config import settings
+
+# Tamaño de bloque al copiar del socket al fichero temporal
+READ_BLOCK_SIZE = 64 * 1024
+
+# Margen para las cabeceras de las partes del multipart
+MULTIPART_MARGIN = 64 * 1024
+
+# Tipos de contenido aceptados como cuerpo binario
+RAW_CONTENT_TYPES = ('application/octet-stream', 'image/jpeg', 'image/png', 'image/webp', 'image/gif')
+
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+SESSION_ID_RE = re.compile(r'^[A-Za-z0-9_-]{20,64}$')
+
+
+class UploadError(Exception):
+    """
+    Error de subida con el código HTTP que le corresponde.
+    """
+
+    def __init__(self, message, status=400, **extra):
+        super().__init__(message)
+        self.status = status
+        self.extra = extra
+
+
+def max_image_size():
+    """
+    Returns:
+        int: Tamaño máximo de imagen en bytes
+    """
+    return settings.MAX_IMAGE_SIZE_MB * 1024 * 1024
+
+
+def check_content_length(http_request, max_size):
+    """
+    Rechaza la petición por su Content-Length antes de leer el cuerpo.
+
+    Args:
+        http_request: Request HTTP de Odoo
+        max_size (int): Tamaño máximo en bytes
+
+    Raises:
+        UploadError: 413 si el cuerpo anunciado es demasiado grande
+    """
+    length = http_request.httprequest.content_length
+    if length is not None and length > max_size:
+        raise UploadError(f'El archivo es demasiado grande. Máximo: {max_size // (1024 * 1024)}MB', status=413)
+
+
+def check_route_body(rule, http_request):
+    """
+    Limita el cuerpo de las rutas de subida (upload=True en @http.route).
+
+    Se llama en _pre_dispatch: después, el dispatcher de Odoo lee y parsea
+    el multipart entero para obtener los params de la ruta.
+
+    Args:
+        rule: Regla de werkzeug de la ruta despachada
+        http_request: Request HTTP de Odoo
+
+    Raises:
+        UploadError: 413 si el cuerpo anunciado es demasiado grande
+    """
+    if not rule.endpoint.routing.get('upload'):
+        return
+    max_size = max_image_size() + MULTIPART_MARGIN
+    # Sin Content-Length (chunked) Werkzeug corta al leer el formulario
+    http_request.httprequest.max_content_length = max_size
+    check_content_length(http_request, max_size)
+
+
+def copy_stream(stream, fileobj, max_size):
+    """
+    Copia un stream a un fichero por bloques, cortando al superar max_size.
+
+    Args:
+        stream: Stream de entrada
+        fileobj: Fichero de salida
+        max_size (int): Bytes máximos
+
+    Returns:
+        int: Bytes copiados
+
+    Raises:
+        UploadError: 413 si el stream supera max_size
+    """
+    total = 0
+    while True:
+        block = stream.read(READ_BLOCK_SIZE)
+        if not block:
+            return total
+        total += len(block)
+        if total > max_size:
+            raise UploadError(f'El archivo es demasiado grande. Máximo: {max_size // (1024 * 1024)}MB', status=413)
+        fileobj.write(block)
+
+
+def read_upload(http_request, max_size=None):
+    """
+    Lee una imagen enviada como multipart/form-data o como cuerpo binario.
+
+    Args:
+        http_request: Request HTTP de Odoo
+        max_size (int): Tamaño máximo (por defecto settings.MAX_IMAGE_SIZE_MB)
+
+    Returns:
+        bytes: Contenido de la imagen
+
+    Raises:
+        UploadError: Si falta el archivo, el tipo no es válido o es demasiado grande
+    """
+    max_size = max_size or max_image_size()
+    httprequest = http_request.httprequest
+    check_content_length(http_request, max_size + MULTIPART_MARGIN)
+
+    with tempfile.TemporaryFile() as tmp:
+        if httprequest.mimetype == 'multipart/form-data':
+            # Odoo ya ha parseado el formulario para obtener los params de la
+            # ruta (con el tamaño ya limitado por check_route_body); Werkzeug
+            # vuelca a disco los archivos grandes al hacerlo
+            upload = httprequest.files.get('file') or httprequest.files.get('image')
+            if not upload:
+                raise UploadError('Campo "file" requerido')
+            size = copy_stream(upload.stream, tmp, max_size)
+        elif httprequest.mimetype in RAW_CONTENT_TYPES:
+            size = copy_stream(httprequest.stream, tmp, max_size)
+        else:
+            raise UploadError('Content-Type no soportado. Use multipart/form-data o application/octet-stream', status=415)
+
+        if size < 100:
+            raise UploadError('La imagen es demasiado pequeña o está corrupta')
+
+        tmp.seek(0)
+        return tmp.read()
+
+
+# ==================== SUBIDAS POR PARTES ====================
+
+def _upload_dir():
+    path = settings.UPLOAD_DIR or os.path.join(config['data_dir'], 'renaix_api_uploads')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _paths(session_id):
+    if not SESSION_ID_RE.match(session_id or ''):
+        raise UploadError('Subida no encontrada', status=404)
+    base = os.path.join(_upload_dir(), session_id)
+    return base + '.json', base + '.part'
+
+
+def _cleanup_expired():
+    """Borra las subidas sin completar más antiguas que el TTL."""
+    limit = time.time() - settings.UPLOAD_SESSION_TTL_HOURS * 3600
+    directory = _upload_dir()
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            if os.path.getmtime(path) < limit:
+                os.unlink(path)
+        except OSError:
+            pass
+
+
+def create_session(dbname, partner_id, total_size):
+    """
+    Abre una subida por partes.
+
+    Args:
+        dbname (str): Base de datos
+        partner_id (int): Usuario propietario de la subida
+        total_size (int): Tamaño total del archivo en bytes
+
+    Returns:
+        dict: Sesión {id, tamano, recibido, chunk_size, expira}
+
+    Raises:
+        UploadError: Si el tamaño no es válido
+    """
+    if not isinstance(total_size, int) or total_size < 100:
+        raise UploadError('Campo "tamano" inválido')
+    if total_size > max_image_size():
+        raise UploadError(f'El archivo es demasiado grande. Máximo: {settings.MAX_IMAGE_SIZE_MB}MB', status=413)
+
+    _cleanup_expired()
+    session_id = secrets.token_urlsafe(24)
+    meta_path, part_path = _paths(session_id)
+    meta = {'db': dbname, 'partner_id': partner_id, 'tamano': total_size, 'creada': time.time()}
+    with open(meta_path, 'x') as f:
+        json.dump(meta, f)
+    open(part_path, 'xb').close()
+    return session_info(session_id, meta)
+
+
+def load_session(session_id, dbname, partner_id):
+    """
+    Carga una sesión comprobando que pertenece al usuario.
+
+    Args:
+        session_id (str): ID de la subida
+        dbname (str): Base de datos
+        partner_id (int): Usuario autenticado
+
+    Returns:
+        dict: Metadatos de la sesión
+
+    Raises:
+        UploadError: 404 si no existe o no es del usuario
+    """
+    meta_path, _part_path = _paths(session_id)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        raise UploadError('Subida no encontrada', status=404)
+    if meta.get('db') != dbname or meta.get('partner_id') != partner_id:
+        raise UploadError('Subida no encontrada', status=404)
+    return meta
+
+
+def received_bytes(session_id):
+    """
+    Returns:
+        int: Bytes recibidos hasta ahora
+    """
+    _meta_path, part_path = _paths(session_id)
+    try:
+        return os.path.getsize(part_path)
+    except OSError:
+        raise UploadError('Subida no encontrada', status=404)
+
+
+def session_info(session_id, meta):
+    """
+    Estado público de una subida.
+
+    Returns:
+        dict: {id, tamano, recibido, completa, chunk_size, expira}
+    """
+    received = received_bytes(session_id)
+    return {
+        'id': session_id,
+        'tamano': meta['tamano'],
+        'recibido': received,
+        'completa': received == meta['tamano'],
+        'chunk_size': settings.UPLOAD_CHUNK_SIZE,
+        'expira': int(meta['creada'] + settings.UPLOAD_SESSION_TTL_HOURS * 3600),
+    }
+
+
+def append_chunk(http_request, session_id, meta):
+    """
+    Añade una parte a la subida.
+
+    La parte debe empezar exactamente en el byte recibido hasta ahora
+    (Content-Range: bytes <inicio>-<fin>/<total>); si no, se responde 409
+    con el desplazamiento correcto para que el cliente continúe desde ahí.
+
+    Args:
+        http_request: Request HTTP de Odoo
+        session_id (str): ID de la subida
+        meta (dict): Metadatos de la sesión
+
+    Returns:
+        int: Bytes recibidos tras añadir la parte
+
+    Raises:
+        UploadError: Si el rango no es válido o no coincide
+    """
+    match = CONTENT_RANGE_RE.match(http_request.httprequest.headers.get('Content-Range', ''))
+    if not match:
+        raise UploadError('Cabecera Content-Range requerida (bytes inicio-fin/total)')
+    start, end, total = (int(g) for g in match.groups())
+    if total != meta['tamano'] or end < start or end >= total:
+        raise UploadError('Content-Range no válido para esta subida')
+
+    length = end - start + 1
+    check_content_length(http_request, length)
+
+    _meta_path, part_path = _paths(session_id)
+    with open(part_path, 'r+b') as f:
+        # Dos partes a la vez de la misma subida se serializan
+        fcntl.flock(f, fcntl.LOCK_EX)
+        received = os.fstat(f.fileno()).st_size
+        if start != received:
+            raise UploadError('La parte no empieza en el byte esperado', status=409, recibido=received)
+        try:
+            f.seek(received)
+            written = copy_stream(http_request.httprequest.stream, f, length)
+            if written != length:
+                raise UploadError('La parte recibida no coincide con Content-Range', recibido=received)
+        except BaseException:
+            # Parte incompleta, demasiado larga o conexión cortada: se
+            # descartan los bloques ya escritos para reintentarla
+            f.truncate(received)
+            raise
+    return received + length
+
+
+def read_session(session_id, meta):
+    """
+    Devuelve el contenido de una subida completa.
+
+    Args:
+        session_id (str): ID de la subida
+        meta (dict): Metadatos de la sesión
+
+    Returns:
+        bytes: Contenido del archivo
+
+    Raises:
+        UploadError: 409 si aún faltan partes
+    """
+    received = received_bytes(session_id)
+    if received != meta['tamano']:
+        raise UploadError('La subida no está completa', status=409, recibido=received)
+    _meta_path, part_path = _paths(session_id)
+    with open(part_path, 'rb') as f:
+        return f.read()
+
+
+def delete_session(session_id):
+    """Borra los ficheros de una subida."""
+    for path in _paths(session_id):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
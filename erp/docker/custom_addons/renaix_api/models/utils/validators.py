@@ -108,6 +108,57 @@ def validate_producto_data(data):
     return True, ''
 
 
+def validate_productos_lote(items, estados_producto):
+    """
+    Valida un lote de productos en una sola pasada.
+    
+    Además de las reglas de validate_producto_data, comprueba que cada
+    elemento sea un objeto, que estado_producto (opcional) sea uno de los
+    del modelo y que entre etiqueta_ids y etiqueta_nombres no pase de 5
+    etiquetas (para que un elemento no haga fallar al lote entero).
+    
+    Args:
+        items (list): Productos a validar
+        estados_producto (list): Valores válidos de estado_producto
+    
+    Returns:
+        list: Mensaje de error por elemento ('' si es válido)
+    """
+    errores = []
+    for item in items:
+        if not isinstance(item, dict):
+            errores.append('Cada producto debe ser un objeto JSON')
+            continue
+        
+        is_valid, error_msg = validate_producto_data(item)
+        if not is_valid:
+            errores.append(error_msg)
+            continue
+        
+        if not isinstance(item['categoria_id'], int):
+            errores.append('categoria_id debe ser un ID numérico')
+            continue
+        
+        if 'estado_producto' in item and item['estado_producto'] not in estados_producto:
+            errores.append(f'Estado de producto inválido. Debe ser uno de: {", ".join(estados_producto)}')
+            continue
+        
+        etiqueta_ids = item.get('etiqueta_ids') or []
+        etiqueta_nombres = item.get('etiqueta_nombres') or []
+        if not isinstance(etiqueta_ids, list) or not all(isinstance(e, int) for e in etiqueta_ids):
+            errores.append('etiqueta_ids debe ser una lista de IDs')
+        elif not isinstance(etiqueta_nombres, list) or not all(isinstance(n, str) for n in etiqueta_nombres):
+            errores.append('etiqueta_nombres debe ser una lista de textos')
+        elif len(set(etiqueta_ids)) + len(etiqueta_nombres) > 5:
+            errores.append('Un producto no puede tener más de 5 etiquetas')
+        elif any(not 2 <= len(' '.join(n.split())) <= 30 for n in etiqueta_nombres if n.strip()):
+            errores.append('Las etiquetas deben tener entre 2 y 30 caracteres')
+        else:
+            errores.append('')
+    
+    return errores
+
+
 def validate_comentario_data(data):
     """
     Valida datos de comentario.
@@ -285,3 +336,47 @@ def validate_search_filters(filters):
         validated['orden'] = 'fecha_desc'  # Por defecto
     
     return validated
+
+
+def parse_list_param(value):
+    """
+    Parsea un parámetro de query separado por comas.
+    
+    Args:
+        value (str): Valor del parámetro (ej: 'id,nombre,precio')
+    
+    Returns:
+        list: Valores limpios, o None si el parámetro no se envió
+    """
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [v.strip() for v in str(value).split(',') if v.strip()]
+
+
+def validate_fieldset_params(params, allowed_fields, allowed_embeds=()):
+    """
+    Valida los parámetros fields= y embed= de un endpoint de listado.
+    
+    Args:
+        params (dict): Query params de la petición
+        allowed_fields (iterable): Claves que admite fields=
+        allowed_embeds (iterable): Relaciones que admite embed=
+    
+    Returns:
+        tuple: (bool, str, list, list) - (es_válido, mensaje_error, fields, embed)
+    """
+    fields = parse_list_param(params.get('fields'))
+    embed = parse_list_param(params.get('embed'))
+    
+    allowed_fields = set(allowed_fields) | set(allowed_embeds)
+    unknown = [f for f in (fields or []) if f not in allowed_fields]
+    if unknown:
+        return False, f'Campos desconocidos en fields: {", ".join(unknown)}', None, None
+    
+    unknown = [e for e in (embed or []) if e not in allowed_embeds]
+    if unknown:
+        return False, f'Relaciones desconocidas en embed: {", ".join(unknown)}', None, None
+    
+    return True, '', fields, embed
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+Contador de consultas SQL para los tests (detección de N+1)
+
+QueryCounter cuenta las consultas que se ejecutan mientras está activo,
+agrupadas por sentencia normalizada (sin literales ni parámetros), y
+señala las que se repiten una vez por elemento serializado.
+
+QueryCounterMixin se añade a un odoo.tests.HttpCase y compara el número
+de consultas de un endpoint con distintos tamaños de página: si crece con
+el tamaño de página, el test falla indicando qué sentencias han crecido.
+
+    class TestProductos(QueryCounterMixin, HttpCase):
+        def test_listado_sin_n_mas_1(self):
+            self.assertQueryCountStable('/api/v1/productos', sizes=(5, 50))
+
+Solo parchea odoo.sql_db.Cursor.execute mientras hay un contador activo.
+Vive en tests/ para que no se cargue en los workers del servidor.
+"""
+
+import collections
+import contextlib
+import logging
+import threading
+from unittest import mock
+
+from odoo import sql_db
+from ..config import settings
+from ..models.utils import jwt_utils
+from ..models.utils.sql_normalize import normalize_sql
+
+_logger = logging.getLogger(__name__)
+
+# Ajustes que se desactivan al medir: la ETag y la caché de respuestas
+# evitan consultas, y el rate limit cortaría los tests
+QUERY_COUNT_SETTINGS = {
+    'ETAG_ENABLED': False,
+    'RESPONSE_CACHE_ENABLED': False,
+    'RATE_LIMIT_ENABLED': False,
+}
+
+
+# ==================== CONTADOR ====================
+
+_activos = []
+_lock = threading.Lock()
+_execute_original = None
+
+
+def _execute_contado(self, query, *args, **kwargs):
+    for contador in list(_activos):
+        contador.record(query)
+    return _execute_original(self, query, *args, **kwargs)
+
+
+class QueryCounter:
+    """
+    Context manager que cuenta las consultas SQL de todos los hilos
+    (incluido el servidor HTTP de los HttpCase).
+
+    Attributes:
+        statements (Counter): Número de ejecuciones por sentencia normalizada
+        items (int): Elementos serializados en la respuesta (si se conoce)
+    """
+
+    def __init__(self):
+        self.statements = collections.Counter()
+        self.items = 0
+
+    @property
+    def total(self):
+        return sum(self.statements.values())
+
+    def record(self, query):
+        self.statements[normalize_sql(query)] += 1
+
+    def __enter__(self):
+        global _execute_original
+        with _lock:
+            if not _activos:
+                _execute_original = sql_db.Cursor.execute
+                sql_db.Cursor.execute = _execute_contado
+            _activos.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        with _lock:
+            _activos.remove(self)
+            if not _activos:
+                sql_db.Cursor.execute = _execute_original
+        return False
+
+    def per_item_statements(self, items=None):
+        """
+        Sentencias ejecutadas al menos una vez por elemento serializado.
+
+        Args:
+            items (int): Número de elementos (por defecto self.items)
+
+        Returns:
+            list: [(sentencia, veces)] de más a menos repetida
+        """
+        items = self.items if items is None else items
+        if items < 2:
+            return []
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= items]
+
+    def grown_since(self, other):
+        """
+        Sentencias que se ejecutan más veces que en otro contador.
+
+        Args:
+            other (QueryCounter): Medición de referencia
+
+        Returns:
+            list: [(sentencia, veces_antes, veces_ahora)]
+        """
+        return [
+            (sql, other.statements.get(sql, 0), n)
+            for sql, n in self.statements.most_common()
+            if n > other.statements.get(sql, 0)
+        ]
+
+    def report(self, limit=20):
+        """
+        Returns:
+            str: Sentencias más ejecutadas, una por línea
+        """
+        lines = [f'{self.total} consultas, {len(self.statements)} distintas, {self.items} elementos']
+        for sql, n in self.statements.most_common(limit):
+            lines.append(f'  {n:5d}  {sql[:200]}')
+        return '\n'.join(lines)
+
+
+# ==================== MIXIN PARA HTTPCASE ====================
+
+def _count_items(response):
+    """Número de elementos de `data` si es una lista"""
+    try:
+        data = response.json().get('data')
+    except ValueError:
+        return 0
+    return len(data) if isinstance(data, list) else 0
+
+
+class QueryCounterMixin:
+    """
+    Asserts de número de consultas para odoo.tests.HttpCase.
+    """
+
+    def api_headers(self, partner):
+        """
+        Args:
+            partner (res.partner): Usuario autenticado
+
+        Returns:
+            dict: Cabecera Authorization con un access token válido
+        """
+        return {'Authorization': f'Bearer {jwt_utils.generate_access_token(partner)}'}
+
+    @contextlib.contextmanager
+    def _query_count_settings(self):
+        with contextlib.ExitStack() as stack:
+            for name, value in QUERY_COUNT_SETTINGS.items():
+                stack.enter_context(mock.patch.object(settings, name, value))
+            yield
+
+    def count_queries(self, path, headers=None):
+        """
+        Hace un GET y cuenta sus consultas.
+
+        Args:
+            path (str): Ruta con query params
+            headers (dict): Cabeceras adicionales
+
+        Returns:
+            QueryCounter: Consultas de la petición (con items rellenado)
+        """
+        with self._query_count_settings(), QueryCounter() as counter:
+            response = self.url_open(path, headers=headers)
+        self.assertLess(response.status_code, 400, f'{path}: HTTP {response.status_code}')
+        counter.items = _count_items(response)
+        return counter
+
+    def assertQueryCountStable(self, path, param='limit', sizes=(5, 50), margin=0, headers=None):
+        """
+        Falla si el número de consultas crece con el tamaño de página.
+
+        Antes de medir se hace una petición de calentamiento (ormcache,
+        registro, etc.). Las sentencias ejecutadas una vez por elemento se
+        registran como aviso aunque el total no crezca.
+
+        Los listados sin paginación (param=None) se comparan con usuarios
+        con distinto número de elementos: headers(size) devuelve las
+        cabeceras del usuario de cada tamaño.
+
+        Args:
+            path (str): Ruta del listado (con o sin query params)
+            param (str): Parámetro del tamaño de página (None: sin parámetro)
+            sizes (tuple): Tamaños a comparar, de menor a mayor
+            margin (int): Consultas extra toleradas en la página más grande
+            headers (dict|callable): Cabeceras adicionales (ej: self.api_headers(partner)),
+                o función que las devuelve para cada tamaño
+
+        Returns:
+            list: QueryCounter de cada tamaño
+        """
+        if param:
+            separator = '&' if '?' in path else '?'
+            urls = [f'{path}{separator}{param}={size}' for size in sizes]
+        else:
+            urls = [path] * len(sizes)
+        cabeceras = [headers(size) if callable(headers) else headers for size in sizes]
+
+        self.count_queries(urls[0], cabeceras[0])
+        counters = [self.count_queries(url, h) for url, h in zip(urls, cabeceras)]
+        small, big = counters[0], counters[-1]
+
+        self.assertGreater(
+            big.items, small.items,
+            f'{path}: no hay datos suficientes para comparar ({small.items} vs {big.items} elementos)'
+        )
+
+        for sql, n in big.per_item_statements():
+            _logger.warning('%s: %d ejecuciones con %d elementos: %s', path, n, big.items, sql)
+
+        if big.total - small.total > margin:
+            grown = '\n'.join(
+                f'  {before} -> {after}  {sql[:200]}' for sql, before, after in big.grown_since(small)
+            )
+            self.fail(
+                f'{path}: las consultas crecen con el tamaño de página '
+                f'({small.total} con {small.items} elementos, {big.total} con {big.items})\n{grown}'
+            )
+        return counters
+
+    def assertMaxQueries(self, path, maximum, headers=None):
+        """
+        Falla si una petición ejecuta más de `maximum` consultas.
+
+        Returns:
+            QueryCounter: Consultas de la petición
+        """
+        self.count_queries(path, headers)
+        counter = self.count_queries(path, headers)
+        if counter.total > maximum:
+            self.fail(f'{path}: {counter.total} consultas (máximo {maximum})\n{counter.report()}')
+        return counter
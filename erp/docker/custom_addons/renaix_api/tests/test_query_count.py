@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+from odoo import Command
+from odoo.tests import HttpCase, tagged
+
+from .query_counter import QueryCounterMixin
+
+# Tamaños de página (o de listado) que se comparan
+TAMANOS = (5, 50)
+
+
+@tagged('post_install', '-at_install')
+class TestQueryCount(QueryCounterMixin, HttpCase):
+    """
+    Los listados de la API no ejecutan más consultas con más elementos (N+1)
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        Partner = cls.env['res.partner']
+        valores_usuario = {'es_usuario_app': True, 'cuenta_activa': True}
+
+        vendedor = Partner.create({'name': 'Vendedor N+1', 'email': 'vendedor.n1@example.com', **valores_usuario})
+        categoria = cls.env['renaix.categoria'].create({'name': 'Categoría N+1'})
+        etiquetas = cls.env['renaix.etiqueta'].create([{'name': f'etiqueta n1 {i}'} for i in range(3)])
+        cls.env['renaix.producto'].create([{
+            'name': f'Producto N+1 {i}',
+            'descripcion': 'Producto para contar consultas',
+            'precio': 10 + i,
+            'categoria_id': categoria.id,
+            'propietario_id': vendedor.id,
+            'estado_venta': 'disponible',
+            'etiqueta_ids': [Command.set(etiquetas.ids)],
+            'imagen_ids': [Command.create({'descripcion': 'Frontal', 'es_principal': True})],
+        } for i in range(max(TAMANOS) + 10)])
+
+        # Un usuario por tamaño, con ese número de conversaciones
+        interlocutores = Partner.create([
+            {'name': f'Interlocutor N+1 {i}', 'email': f'interlocutor.n1.{i}@example.com', **valores_usuario}
+            for i in range(max(TAMANOS))
+        ])
+        cls.usuarios = {}
+        for tamano in TAMANOS:
+            usuario = Partner.create({
+                'name': f'Usuario N+1 {tamano}', 'email': f'usuario.n1.{tamano}@example.com', **valores_usuario
+            })
+            for interlocutor in interlocutores[:tamano]:
+                cls.env['renaix.mensaje'].create({
+                    'emisor_id': interlocutor.id,
+                    'receptor_id': usuario.id,
+                    'texto': '¿Sigue disponible?',
+                })
+            cls.usuarios[tamano] = usuario
+
+    def test_listado_productos(self):
+        self.assertQueryCountStable('/api/v1/productos', sizes=TAMANOS)
+
+    def test_busqueda_productos(self):
+        self.assertQueryCountStable('/api/v1/productos/buscar?query=N%2B1', sizes=TAMANOS)
+
+    def test_conversaciones(self):
+        self.assertQueryCountStable(
+            '/api/v1/mensajes/conversaciones', param=None, sizes=TAMANOS,
+            headers=lambda tamano: self.api_headers(self.usuarios[tamano]),
+        )